@@ -0,0 +1,50 @@
+from PIL import Image
+
+
+class VirtualDisplay:
+    """
+    虚拟显示设备
+
+    与 luma.oled 设备接口兼容（display/show/hide/clear/contrast），
+    不依赖硬件，用于无屏幕运行、延迟回放和基准测试
+    """
+
+    def __init__(self, width=128, height=64, mode="1", on_display=None):
+        """
+        Args:
+            width: 显示宽度
+            height: 显示高度
+            mode: 图像模式
+            on_display: 每次刷新后的回调 on_display(image)
+        """
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.size = (width, height)
+        self.image = Image.new(mode, self.size, 0)
+        self.on_display = on_display
+        self.frames = 0  # 已刷新帧数
+        self.visible = True
+        self.level = 255
+
+    def display(self, image):
+        """刷新画面（保存副本，调用方会继续复用同一张图像）"""
+        self.image = image.copy()
+        self.frames += 1
+        if self.on_display:
+            self.on_display(self.image)
+
+    def show(self):
+        self.visible = True
+
+    def hide(self):
+        self.visible = False
+
+    def clear(self):
+        self.display(Image.new(self.mode, self.size, 0))
+
+    def contrast(self, level):
+        self.level = level
+
+    def cleanup(self):
+        pass
@@ -0,0 +1,81 @@
+"""
+动画引擎微基准
+
+测量 Animation.tick() 在大量活动补间动画下的每帧开销
+
+用法:
+    python example/animation_bench.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.animation import Animation, Operator
+from until.clock import SimulatedClock, set_clock
+
+FRAMES = 600
+TWEEN_COUNTS = (100, 200, 500, 1000)
+# 查找表只对计算量大的缓动（如 elastic）有收益，廉价缓动直接计算更快
+OPERATORS = (Operator.ease_out_cubic, Operator.ease_out_bounce, Operator.ease_in_out_elastic)
+
+
+class Sprite:
+    __slots__ = ("x",)
+
+    def __init__(self):
+        self.x = 0.0
+
+
+def bench(count, lut, operator=Operator.ease_out_bounce):
+    clock = set_clock(SimulatedClock())
+    anim = Animation(duration=3600.0, lut=lut)  # 足够长，保证整个测量期间都在运行
+    sprites = [Sprite() for _ in range(count)]
+    for i, sprite in enumerate(sprites):
+        anim.start(i, sprite, "x", 128.0, operator=operator)
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        clock.advance(1 / 60.0)
+        Animation.tick(clock.tick())
+    elapsed = time.perf_counter() - start
+
+    anim.clear()
+    return elapsed / FRAMES * 1e6
+
+
+def bench_finish(count):
+    """验证结束的动画会被移除：全部结束后 tick 几乎没有开销"""
+    clock = set_clock(SimulatedClock())
+    anim = Animation(duration=0.01)
+    sprites = [Sprite() for _ in range(count)]
+    for i, sprite in enumerate(sprites):
+        anim.start(i, sprite, "x", 1.0)
+
+    clock.advance(1.0)
+    Animation.tick(clock.tick())
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        Animation.tick(clock.tick())
+    elapsed = time.perf_counter() - start
+    return elapsed / FRAMES * 1e6, len(anim.animation_list)
+
+
+def main():
+    for operator in OPERATORS:
+        print(operator.__name__)
+        print(f"{'tweens':>8} {'direct us/frame':>16} {'lut us/frame':>14} {'us/tween':>10}")
+        for count in TWEEN_COUNTS:
+            direct = bench(count, lut=False, operator=operator)
+            lut = bench(count, lut=True, operator=operator)
+            print(f"{count:>8} {direct:>16.1f} {lut:>14.1f} {min(direct, lut) / count:>10.3f}")
+        print()
+
+    idle, remaining = bench_finish(1000)
+    print(f"after 1000 tweens finished: {idle:.2f} us/frame, {remaining} tweens left")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+输入延迟基准
+
+用管道模拟 evdev 设备，比较旧的 select 轮询循环和新的 epoll KeyListener
+从事件写入到回调执行的延迟（direct 回调），主线程队列对自动重复/轴事件的合并效果，
+以及手柄摇杆噪声经过事件过滤和死区后的回调次数
+
+两种循环交替运行 ROUNDS 轮后合并统计。单事件的唤醒延迟（跨线程的 mean/p50/p99）epoll 与 select 持平，
+并不稳定优于 select：p50 相同或略低，mean 和 p99 每次运行互有高低，差异在线程调度抖动范围内。
+稳定的收益是批量读取的吞吐（burst 约 1.6 vs 2.4 us/事件）和同线程内到回调的开销（mean/p50 略低）。
+没有主线程回调时事件曾照样入队，从不 drain() 的队列让 GC 变慢，epoll 的 mean/p99 因此明显差于 select，
+现在这种情况不再入队。
+
+用法:
+    python example/input_latency_bench.py
+"""
+
+import os
+import random
+import select
+import struct
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evdev import AbsInfo, InputEvent, ecodes
+
+from until.device.input import KeyListener
+from until.log import LOGGER
+
+EVENT_FORMAT = "llHHi"  # struct input_event
+EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+EVENTS = 3000
+ROUNDS = 6  # 两种循环交替运行的轮数，样本合并统计，减少先后顺序和系统负载波动的影响
+BURST = 3  # 每次写入 EV_KEY + EV_MSC + EV_SYN，与真实键盘一致
+
+
+class PipeDevice:
+    """用非阻塞管道模拟的输入设备"""
+
+    def __init__(self, name, caps=None):
+        self.name = name
+        self.path = f"/dev/input/{name}"
+        self.caps = caps
+        self.fd, self.write_fd = os.pipe()
+        os.set_blocking(self.fd, False)
+
+    def capabilities(self, absinfo=True):
+        if self.caps is None:
+            raise AttributeError("capabilities")
+        if absinfo:
+            return self.caps
+        return {etype: [c[0] if isinstance(c, tuple) else c for c in codes] for etype, codes in self.caps.items()}
+
+    def fileno(self):
+        return self.fd
+
+    def read(self):
+        data = os.read(self.fd, EVENT_SIZE * 64)
+        for offset in range(0, len(data), EVENT_SIZE):
+            sec, usec, etype, code, value = struct.unpack_from(EVENT_FORMAT, data, offset)
+            yield InputEvent(sec, usec, etype, code, value)
+
+    def send(self, seq):
+        now = time.time()
+        sec, usec = int(now), int(now % 1 * 1e6)
+        os.write(self.write_fd, b"".join((
+            struct.pack(EVENT_FORMAT, sec, usec, ecodes.EV_KEY, ecodes.KEY_A, seq),
+            struct.pack(EVENT_FORMAT, sec, usec, ecodes.EV_MSC, ecodes.MSC_SCAN, 4),
+            struct.pack(EVENT_FORMAT, sec, usec, ecodes.EV_SYN, 0, 0),
+        )))
+
+    def write(self, events):
+        now = time.time()
+        sec, usec = int(now), int(now % 1 * 1e6)
+        os.write(self.write_fd, b"".join(
+            struct.pack(EVENT_FORMAT, sec, usec, etype, code, value) for etype, code, value in events))
+
+    def close(self):
+        os.close(self.fd)
+        os.close(self.write_fd)
+
+
+def legacy_step(listener, devices, timeout):
+    """基线版本 KeyListener.run 主循环的一次迭代"""
+    r, w, x = select.select(devices, [], [], timeout)
+    for device in r:
+        for event in device.read():
+            if event.type == ecodes.EV_KEY or event.type == ecodes.EV_ABS:
+                key_name = listener._event_name(event)
+                LOGGER.debug(f"{device.name} - key down {key_name}")
+                for callback in listener.callbacks:
+                    if hasattr(callback, '__self__'):
+                        callback.__self__.key_code = event.code
+                    callback(event)
+                LOGGER.debug(f"Event: type={event.type}, code={event.code}, value={event.value}")
+
+
+def legacy_loop(listener, devices, stop):
+    while not stop.is_set():
+        legacy_step(listener, devices, 0.1)
+
+
+def epoll_step(listener, devices, timeout):
+    listener.poll(timeout)
+
+
+def epoll_loop(listener, devices, stop):
+    for dev in devices:
+        listener.add_device(dev)
+    while not stop.is_set():
+        listener.poll(0.1)
+
+
+def new_listener():
+    listener = KeyListener()
+    listener.listen((ecodes.EV_KEY, ecodes.KEY_A))  # 测试按键不在 keymap 中
+    return listener
+
+
+def measure(loop, events=EVENTS):
+    """跨线程：写入管道到 direct 回调执行的延迟样本（包含线程唤醒）"""
+    listener = new_listener()
+    devices = [PipeDevice("event0"), PipeDevice("event1")]
+    sent = [0.0] * events
+    latency = []
+    done = threading.Event()
+
+    def callback(evt):
+        latency.append(time.perf_counter() - sent[evt.value])
+        if len(latency) == events:
+            done.set()
+
+    listener.on(callback, direct=True)
+    stop = threading.Event()
+    thread = threading.Thread(target=loop, args=(listener, devices, stop), daemon=True)
+    thread.start()
+    time.sleep(0.05)
+
+    for seq in range(events):
+        sent[seq] = time.perf_counter()
+        devices[seq % len(devices)].send(seq)
+        time.sleep(0.0005)
+
+    done.wait(5)
+    stop.set()
+    thread.join()
+    for dev in devices:
+        dev.close()
+    return latency
+
+
+def measure_wake(step, count=3000):
+    """同一线程：事件已在管道中时，从调用一次循环迭代到 direct 回调执行的延迟样本（不含线程唤醒）"""
+    listener = new_listener()
+    devices = [PipeDevice("event0")]
+    if step is epoll_step:
+        listener.add_device(devices[0])
+    called = [0.0]
+    listener.on(lambda evt: called.__setitem__(0, time.perf_counter()), direct=True)
+    latency = []
+    for seq in range(count):
+        devices[0].send(seq)
+        start = time.perf_counter()
+        step(listener, devices, 0)
+        latency.append(called[0] - start)
+    devices[0].close()
+    return latency
+
+
+def stats(latency):
+    latency = sorted(latency)
+    n = len(latency)
+    return n, sum(latency) / n * 1e6, latency[n // 2] * 1e6, latency[int(n * 0.99)] * 1e6
+
+
+def measure_burst(step, count=800):
+    """预先写满缓冲区，在当前线程中测量每个事件的分发开销（不含线程唤醒）"""
+    listener = new_listener()
+    devices = [PipeDevice("event0")]
+    if step is epoll_step:
+        listener.add_device(devices[0])
+    received = []
+    listener.on(lambda evt: received.append(evt.value), direct=True)
+    for seq in range(count):
+        devices[0].send(seq)
+
+    start = time.perf_counter()
+    while len(received) < count:
+        step(listener, devices, 0)
+    elapsed = time.perf_counter() - start
+    devices[0].close()
+    return elapsed / count * 1e6
+
+
+def measure_coalesce(frames=100, per_frame=40):
+    """每帧注入自动重复和摇杆事件洪泛，统计主线程实际执行的回调次数"""
+    listener = new_listener()
+    listener.listen((ecodes.EV_ABS, ecodes.ABS_X))  # 注入事件不经过设备的死区滤波
+    calls = []
+    listener.on(lambda evt: calls.append(evt))
+    injected = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        events = [InputEvent(0, 0, ecodes.EV_KEY, ecodes.KEY_UP, 1 if frame == 0 else 2)]
+        for i in range(per_frame):
+            events.append(InputEvent(0, 0, ecodes.EV_KEY, ecodes.KEY_UP, 2))
+            events.append(InputEvent(0, 0, ecodes.EV_ABS, ecodes.ABS_X, i))
+        injected += len(events)
+        listener.inject(events)
+        listener.drain()
+    elapsed = time.perf_counter() - start
+    return injected, len(calls), elapsed / frames * 1e6
+
+
+GAMEPAD_CAPS = {
+    ecodes.EV_KEY: [ecodes.BTN_SOUTH, ecodes.BTN_EAST],
+    ecodes.EV_ABS: [
+        (ecodes.ABS_X, AbsInfo(128, 0, 255, 0, 15, 0)),
+        (ecodes.ABS_Y, AbsInfo(128, 0, 255, 0, 15, 0)),
+        (ecodes.ABS_RX, AbsInfo(128, 0, 255, 0, 15, 0)),
+        (ecodes.ABS_HAT0Y, AbsInfo(0, -1, 1, 0, 0, 0)),
+    ],
+}
+
+
+def gamepad_events(count, seed=1):
+    """摇杆在中心附近抖动，偶尔推到底，夹杂方向键和按钮"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        axis = rng.choice((ecodes.ABS_X, ecodes.ABS_Y, ecodes.ABS_RX))
+        if i % 200 < 20:
+            value = 250 if i % 400 < 200 else 5  # 推到底
+        else:
+            value = 128 + rng.randint(-30, 30)
+        events.append((ecodes.EV_ABS, axis, value))
+        if i % 100 == 0:
+            events.append((ecodes.EV_ABS, ecodes.ABS_HAT0Y, -1 if i % 200 == 0 else 0))
+            events.append((ecodes.EV_KEY, ecodes.BTN_SOUTH, 1 if i % 200 == 0 else 0))
+    return events
+
+
+def measure_gamepad(count=5000, bind_stick=False):
+    """手柄事件经过过滤后实际执行的回调次数和每个原始事件的开销"""
+    listener = KeyListener()
+    if bind_stick:
+        listener.listen((ecodes.EV_ABS, ecodes.ABS_X), (ecodes.EV_ABS, ecodes.ABS_Y))
+    dev = PipeDevice("event0", GAMEPAD_CAPS)
+    listener.add_device(dev)
+    received = []
+    listener.on(lambda evt: received.append(evt), direct=True)
+    events = gamepad_events(count)
+
+    start = time.perf_counter()
+    for offset in range(0, len(events), 64):
+        dev.write(events[offset:offset + 64])
+        epoll_step(listener, None, 0)
+    elapsed = time.perf_counter() - start
+    listener.remove_device(dev)
+    return len(events), len(received), elapsed / len(events) * 1e6
+
+
+def main():
+    loops = (("select", legacy_loop, legacy_step), ("epoll", epoll_loop, epoll_step))
+    threaded = {name: [] for name, _, _ in loops}
+    wake = {name: [] for name, _, _ in loops}
+    for _ in range(ROUNDS):
+        for name, loop, step in loops:
+            threaded[name] += measure(loop, EVENTS // ROUNDS)
+            wake[name] += measure_wake(step, EVENTS // ROUNDS)
+
+    print(f"{'loop':>8} {'events':>8} {'mean us':>10} {'p50 us':>10} {'p99 us':>10} {'burst us/evt':>13}")
+    for name, loop, step in loops:
+        n, mean, p50, p99 = stats(threaded[name])
+        burst = min(measure_burst(step) for _ in range(5))
+        print(f"{name:>8} {n:>8} {mean:>10.1f} {p50:>10.1f} {p99:>10.1f} {burst:>13.2f}")
+    print("\nsame thread, event already readable -> direct callback:")
+    for name, _, _ in loops:
+        n, mean, p50, p99 = stats(wake[name])
+        print(f"{name:>8} {n:>8} {mean:>10.2f} {p50:>10.2f} {p99:>10.2f}")
+
+    injected, called, per_frame = measure_coalesce()
+    print(f"\ncoalesce: {injected} events queued -> {called} callbacks on main thread ({per_frame:.1f} us/frame)")
+
+    relevant = sum(1 for etype, _, _ in gamepad_events(5000) if etype == ecodes.EV_KEY or etype == ecodes.EV_ABS)
+    print(f"gamepad: {relevant} EV_KEY/EV_ABS events reach callbacks without filtering")
+    for name, bind_stick in (("hat+buttons bound", False), ("stick bound", True)):
+        raw, called, cost = measure_gamepad(bind_stick=bind_stick)
+        print(f"gamepad ({name}): {raw} events -> {called} callbacks ({cost:.2f} us/event)")
+
+
+if __name__ == "__main__":
+    main()
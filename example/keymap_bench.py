@@ -0,0 +1,104 @@
+"""
+按键映射微基准
+
+测量一个典型 key_callback（翻屏、音量、长按、匹配）处理单个事件的开销
+
+用法:
+    python example/keymap_bench.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evdev import InputEvent, ecodes
+
+from until.keymap import KeyMap
+
+ROUNDS = 2000
+
+
+def make_events():
+    events = []
+    for code in (ecodes.KEY_RIGHT, ecodes.KEY_UP, ecodes.KEY_Z, ecodes.KEY_VOLUMEUP):
+        for value in (1, 2, 2, 0):
+            events.append(InputEvent(0, 0, ecodes.EV_KEY, code, value))
+    for value in (-1, 0, 1, 0):
+        events.append(InputEvent(0, 0, ecodes.EV_ABS, ecodes.ABS_HAT0Y, value))
+    return events
+
+
+def implicit_callback(km, evt):
+    """从调用栈中隐式获取 evt 的写法"""
+    hits = 0
+    if km.down(km.action_next_screen) or km.down(km.nav_right):
+        hits += 1
+    elif km.down(km.action_prev_screen) or km.down(km.nav_left):
+        hits += 1
+    if km.down(km.media_volume_up):
+        hits += 1
+    if km.down(km.media_volume_down):
+        hits += 1
+    if km.down(km.media_volume_mute):
+        hits += 1
+    if km.longpress(km.nav_up, repeat=True):
+        hits += 1
+    if km.longpress(km.nav_down, repeat=True):
+        hits += 1
+    km.up(km.nav_up, km.nav_down)
+    if km.match(km.action_select):
+        hits += 1
+    if km.match(km.action_cancel):
+        hits += 1
+    return hits
+
+
+def explicit_callback(km, evt):
+    """通过 km.event(evt) 显式传递事件的写法"""
+    hits = 0
+    k = km.event(evt)
+    if k.down(km.action_next_screen) or k.down(km.nav_right):
+        hits += 1
+    elif k.down(km.action_prev_screen) or k.down(km.nav_left):
+        hits += 1
+    if k.down(km.media_volume_up):
+        hits += 1
+    if k.down(km.media_volume_down):
+        hits += 1
+    if k.down(km.media_volume_mute):
+        hits += 1
+    if k.longpress(km.nav_up, repeat=True):
+        hits += 1
+    if k.longpress(km.nav_down, repeat=True):
+        hits += 1
+    k.up(km.nav_up, km.nav_down)
+    if k.match(km.action_select):
+        hits += 1
+    if k.match(km.action_cancel):
+        hits += 1
+    return hits
+
+
+def bench(callback):
+    km = KeyMap()
+    events = make_events()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for evt in events:
+            callback(km, evt)
+    elapsed = time.perf_counter() - start
+    return elapsed / (ROUNDS * len(events)) * 1e6
+
+
+def main():
+    callbacks = [("implicit", implicit_callback)]
+    if hasattr(KeyMap, "event"):
+        callbacks.append(("explicit", explicit_callback))
+    for name, callback in callbacks:
+        print(f"{name:>10}: {bench(callback):.2f} us/event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+输入到画面延迟回放
+
+在虚拟显示上运行 DisplayManager，注入合成的翻屏 / 跳跃按键事件，
+输出从事件时间戳到 disp.display() 刷新的延迟直方图。
+主循环或调度器出现回归时，延迟数字会直接变化。
+
+用法:
+    python example/latency_replay.py [次数]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evdev import InputEvent, ecodes
+
+from drive.virtual import VirtualDisplay
+from screen.manager import DisplayManager
+from screen.plugins.clock.app import clock
+from screen.plugins.dino.app import dino
+from screen.plugins.life.app import life
+from until.keymap import get_keymap
+from until.latency import get_latency_probe
+
+
+def key_event(code, value):
+    now = time.time()
+    return InputEvent(int(now), int(now % 1 * 1e6), ecodes.EV_KEY, code, value)
+
+
+def press(manager, code):
+    """按下并释放一个按键"""
+    manager.key_listener.inject([key_event(code, 1)])
+    time.sleep(0.03)
+    manager.key_listener.inject([key_event(code, 0)])
+
+
+def replay(manager, count):
+    km = get_keymap()
+    next_screen = km.action_next_screen[0]
+    select = km.action_select[0]
+
+    time.sleep(1.0)  # 等待欢迎画面和首个插件激活
+    for _ in range(count):
+        press(manager, next_screen)
+        time.sleep(random.uniform(0.3, 0.6))  # 等待翻屏动画结束
+        if manager.last_active and manager.last_active.name == "dino":
+            for _ in range(3):
+                press(manager, select)
+                time.sleep(random.uniform(0.2, 0.4))
+    manager.stop()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    probe = get_latency_probe()
+    probe.enabled = True
+    probe.report_every = 0
+
+    manager = DisplayManager(device=VirtualDisplay(128, 64))
+    for plugin in (clock, dino, life):
+        manager.add_plugin(plugin)
+
+    threading.Thread(target=replay, args=(manager, count), daemon=True).start()
+    manager.run()
+
+    print(f"frames: {manager.disp.frames}")
+    print(probe.report())
+
+
+if __name__ == "__main__":
+    main()
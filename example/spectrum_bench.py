@@ -0,0 +1,305 @@
+"""
+频谱插件音频处理基准
+
+用合成的立体声 int16 PCM（正弦扫频 + 噪声）按 ALSA period 喂给处理流程，
+比较原来的 np.concatenate 写法和预分配环形缓冲区 SampleRing：
+每个 period 的耗时（取出全部 hop 窗口，不含 FFT）以及处理期间额外占用的内存峰值。
+
+bands: 比较逐条 np.max 的频带聚合和 BandReducer（reduceat）在不同条数下每个 hop 的耗时，
+以及各频带划分（滤波器组矩阵乘法）单声道和立体声的耗时。
+
+analysis: 每秒音频的 FFT 次数和分析耗时：原来每个 hop 分析一次，
+现在按渲染帧率（60 fps）或 analysis_rate 按需分析最新窗口。
+
+fft: 各 FFT 后端（加窗 + rfft + 幅度）在 fft_size 1024~8192 下每次的耗时，
+以及启动测速（get_fft(size, "auto")）选出的后端。需要在目标设备上运行。
+
+render: 128x64 面板上每帧绘制的耗时：逐个矩形绘制频谱条、BarMask 一次生成频谱条掩码，
+和瀑布图（写入一行 + 抖动 + frombuffer）。
+
+用法:
+    python example/spectrum_bench.py [秒数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from until import dsp
+from until.dsp import BandReducer, SampleRing, log_band_edges
+from ui.bars import BarMask
+from ui.waterfall import Waterfall
+
+RATES = (44100, 48000, 96000)
+CHANNELS = 2
+CHUNK = 1024
+FFT_SIZE = 2048
+HOP = FFT_SIZE // 2
+
+
+def make_periods(rate, seconds):
+    """合成 seconds 秒的立体声 PCM，按 CHUNK 帧切分为 period"""
+    t = np.arange(int(rate * seconds)) / rate
+    freq = 40 * (rate / 2 / 40) ** (t / seconds)  # 对数扫频
+    phase = 2 * np.pi * np.cumsum(freq) / rate
+    rng = np.random.default_rng(0)
+    left = 0.5 * np.sin(phase) + 0.05 * rng.standard_normal(t.size)
+    right = 0.5 * np.sin(phase * 1.01) + 0.05 * rng.standard_normal(t.size)
+    pcm = (np.stack((left, right), axis=1) * 32767).clip(-32768, 32767).astype("<i2")
+    return [pcm[i:i + CHUNK].tobytes() for i in range(0, len(pcm) - CHUNK + 1, CHUNK)]
+
+
+class LegacyIngest:
+    """原来的 _consume_audio：每个 period 拼接整个缓冲区，每个 hop 切片"""
+
+    def __init__(self):
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.frames = 0
+
+    def feed(self, raw):
+        samples = np.frombuffer(raw, dtype=np.int16)
+        samples = samples.reshape(-1, CHANNELS).mean(axis=1)
+        samples = samples.astype(np.float32) / 32768.0
+        if self.buffer.size == 0:
+            self.buffer = samples
+        else:
+            self.buffer = np.concatenate((self.buffer, samples))
+        while self.buffer.size >= FFT_SIZE:
+            frame = self.buffer[:FFT_SIZE]
+            self.buffer = self.buffer[HOP:]
+            self.frames += frame.size > 0
+
+
+class RingIngest:
+    """SampleRing：原地混音写入，按 hop 取窗口视图"""
+
+    def __init__(self):
+        self.ring = SampleRing(2 * FFT_SIZE + CHUNK, CHANNELS, CHUNK)
+        self.frame_end = FFT_SIZE
+        self.frames = 0
+
+    def feed(self, raw):
+        ring = self.ring
+        ring.write_pcm(raw)
+        while ring.written >= self.frame_end:
+            frame = ring.window(FFT_SIZE, self.frame_end)
+            self.frame_end += HOP
+            self.frames += frame.size > 0
+
+
+def measure(ingest, periods):
+    for raw in periods[:16]:
+        ingest.feed(raw)  # 预热
+
+    start = time.perf_counter()
+    for raw in periods:
+        ingest.feed(raw)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for raw in periods[:200]:
+        ingest.feed(raw)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return elapsed / len(periods) * 1e6, peak
+
+
+def legacy_bands(spectrum_db, edges, count, db_floor=-70.0, db_ceiling=-15.0):
+    """原来的 _aggregate_bars：逐条切片取最大值并归一化"""
+    values = np.zeros(count, dtype=np.float32)
+    for idx in range(count):
+        start = edges[idx]
+        end = edges[idx + 1]
+        start = min(start, len(spectrum_db) - 1)
+        end = min(max(end, start + 1), len(spectrum_db))
+        segment = spectrum_db[start:end]
+        level = float(np.max(segment)) if segment.size else spectrum_db[start]
+        norm = (level - db_floor) / (db_ceiling - db_floor)
+        values[idx] = np.clip(norm, 0.0, 1.0)
+    return values
+
+
+def bench_bands(rounds=2000):
+    rate = 44100
+    freq_axis = np.fft.rfftfreq(FFT_SIZE, d=1.0 / rate)
+    frame = make_periods(rate, 1.0)[0]
+    samples = np.frombuffer(frame, dtype=np.int16).reshape(-1, CHANNELS).mean(axis=1) / 32768.0
+    samples = np.resize(samples, FFT_SIZE) * np.hanning(FFT_SIZE)
+    magnitude = np.abs(np.fft.rfft(samples))
+
+    print(f"{'bars':>6} {'method':>8} {'us/hop':>10}")
+    for count in (32, 64, 128):
+        edges = log_band_edges(freq_axis, count, 40)
+
+        def legacy():
+            db = 20 * np.log10(np.maximum(magnitude / (FFT_SIZE / 2.0), 1e-7))
+            return legacy_bands(db, edges, count)
+
+        reducer = BandReducer(edges, -70.0, -15.0, reference=FFT_SIZE / 2.0)
+        for name, fn in (("legacy", legacy), ("reduceat", lambda: reducer(magnitude))):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                fn()
+            print(f"{count:>6} {name:>8} {(time.perf_counter() - start) / rounds * 1e6:>10.2f}")
+
+    print()
+    print(f"{'bars':>6} {'banding':>8} {'mono us':>10} {'stereo us':>10}")
+    stereo_magnitude = np.stack((magnitude, magnitude))
+    for banding in dsp.BANDINGS:
+        row = []
+        for channels, mag in ((1, magnitude), (2, stereo_magnitude)):
+            reducer = dsp.make_band_reducer(banding, freq_axis, 64 // channels, 40, -70.0, -15.0,
+                                            reference=FFT_SIZE / 2.0, weighting=True, channels=channels)
+            mag = mag.astype(np.float32)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                reducer(mag)
+            row.append((time.perf_counter() - start) / rounds * 1e6)
+        print(f"{64:>6} {banding:>8} {row[0]:>10.2f} {row[1]:>10.2f}")
+
+
+def analyse(ring, window, reducer):
+    frame = ring.window(FFT_SIZE)
+    magnitude = np.abs(np.fft.rfft(frame * window))
+    return reducer(magnitude)
+
+
+def bench_analysis(seconds, fps=60.0, analysis_rates=(0, 30)):
+    window = np.hanning(FFT_SIZE).astype(np.float32)
+    print(f"{'rate':>6} {'mode':>10} {'fft/s':>7} {'ms/s':>7}")
+    for rate in RATES:
+        periods = make_periods(rate, seconds)
+        freq_axis = np.fft.rfftfreq(FFT_SIZE, d=1.0 / rate)
+        reducer = BandReducer(log_band_edges(freq_axis, 32, 40), -70.0, -15.0, reference=FFT_SIZE / 2.0)
+        period_time = CHUNK / rate
+
+        # 原来：每个 hop 分析一次
+        ring = SampleRing(2 * FFT_SIZE + CHUNK, CHANNELS, CHUNK)
+        frame_end = FFT_SIZE
+        count = 0
+        start = time.perf_counter()
+        for raw in periods:
+            ring.write_pcm(raw)
+            while ring.written >= frame_end:
+                frame = ring.window(FFT_SIZE, frame_end)
+                reducer(np.abs(np.fft.rfft(frame * window)))
+                frame_end += HOP
+                count += 1
+        elapsed = time.perf_counter() - start
+        print(f"{rate:>6} {'per hop':>10} {count / seconds:>7.1f} {elapsed / seconds * 1e3:>7.2f}")
+
+        # 按需：渲染帧到来时分析，analysis_rate 限制频率
+        for analysis_rate in analysis_rates:
+            interval = 1.0 / analysis_rate if analysis_rate else 0.0
+            ring = SampleRing(2 * FFT_SIZE + CHUNK, CHANNELS, CHUNK)
+            now = next_frame = last = analysed = 0.0
+            count = 0
+            start = time.perf_counter()
+            for raw in periods:
+                ring.write_pcm(raw)
+                now += period_time
+                while next_frame <= now:
+                    next_frame += 1.0 / fps
+                    if interval and next_frame - last < interval * 0.75:
+                        continue
+                    if ring.written == analysed or ring.written < FFT_SIZE:
+                        continue
+                    analyse(ring, window, reducer)
+                    analysed, last = ring.written, next_frame
+                    count += 1
+            elapsed = time.perf_counter() - start
+            mode = f"{analysis_rate:g}/s" if analysis_rate else "per frame"
+            print(f"{rate:>6} {mode:>10} {count / seconds:>7.1f} {elapsed / seconds * 1e3:>7.2f}")
+
+
+def bench_fft(rounds=500):
+    variants = [("numpy", {})]
+    if dsp.SCIPY_AVAILABLE:
+        variants += [("scipy", {"workers": 1}), ("scipy", {"workers": -1})]
+
+    print(f"{'size':>6} " + " ".join(
+        f"{name + ('-mt' if options.get('workers') == -1 else ''):>10}" for name, options in variants) + f" {'auto':>8}")
+    for size in (1024, 2048, 4096, 8192):
+        frame = np.random.default_rng(0).standard_normal(size).astype(np.float32)
+        row = []
+        for name, options in variants:
+            backend = dsp.FFT_BACKENDS[name](size, **options)
+            backend.magnitude(frame)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                backend.magnitude(frame)
+            row.append((time.perf_counter() - start) / rounds * 1e6)
+        auto = dsp.get_fft(size).name
+        print(f"{size:>6} " + " ".join(f"{us:>10.1f}" for us in row) + f" {auto:>8}")
+
+
+def bench_render(rounds=1000, width=128, height=64, bars=32):
+    levels = np.random.default_rng(0).random((rounds, bars)).astype(np.float32)
+    image = Image.new("1", (width, height))
+    draw = ImageDraw.Draw(image)
+    top, baseline = 7, height - 2
+
+    start = time.perf_counter()
+    for row in levels:
+        draw.rectangle((0, 0, width, height), fill=0)
+        for idx, value in enumerate(row):
+            left = idx * 4
+            draw.rectangle((left, baseline - int(value * (baseline - top)), left + 2, baseline), fill=255)
+            draw.line((left, top, left + 2, top), fill=255)
+    bars_ms = (time.perf_counter() - start) / rounds * 1e3
+
+    max_height = baseline - top
+    mask = BarMask(width, max_height + 1, [idx * 4 for idx in range(bars)], 3)
+    lengths = np.zeros(bars, dtype=np.int32)
+    marks = np.full(bars, max_height, dtype=np.int32)
+    scaled = np.zeros(bars, dtype=np.float32)
+    start = time.perf_counter()
+    for row in levels:
+        draw.rectangle((0, 0, width, height), fill=0)
+        np.multiply(row, max_height, out=scaled)
+        np.copyto(lengths, scaled, casting="unsafe")
+        lengths += 1
+        draw.bitmap((0, top), mask.image(lengths, marks), fill=255)
+    mask_ms = (time.perf_counter() - start) / rounds * 1e3
+
+    print(f"{'view':>12} {'ms/frame':>9}")
+    print(f"{'bars':>12} {bars_ms:>9.3f}")
+    print(f"{'bar mask':>12} {mask_ms:>9.3f}")
+    for direction in ("vertical", "horizontal"):
+        waterfall = Waterfall(width, height - top, bars, direction)
+        start = time.perf_counter()
+        for row in levels:
+            draw.rectangle((0, 0, width, height), fill=0)
+            waterfall.push(row)
+            image.paste(waterfall.image(), (0, top))
+        print(f"{'wf ' + direction[0]:>12} {(time.perf_counter() - start) / rounds * 1e3:>9.3f}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    print(f"{'rate':>6} {'method':>8} {'us/period':>10} {'peak KiB':>9}")
+    for rate in RATES:
+        periods = make_periods(rate, seconds)
+        for name, cls in (("legacy", LegacyIngest), ("ring", RingIngest)):
+            us, peak = measure(cls(), periods)
+            print(f"{rate:>6} {name:>8} {us:>10.2f} {peak / 1024:>9.1f}")
+    print()
+    bench_bands()
+    print()
+    bench_analysis(seconds)
+    print()
+    bench_fft()
+    print()
+    bench_render()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+音量按键到覆盖层的延迟基准
+
+比较 amixer 子进程和 pyalsaaudio 原生混音器两个后端：
+从 adjust_volume() 调节一步音量，到音量覆盖层合成进一帧画面的耗时。
+交替调高/调低，结束后音量不变。需要在有声卡的设备上运行。
+
+用法:
+    python example/volume_bench.py [次数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from ui.overlays import OverlayManager
+from until.device import volume
+
+WIDTH, HEIGHT = 128, 64
+
+
+def measure(backend, rounds):
+    if not volume.use_backend(backend):
+        return None
+
+    overlay_manager = OverlayManager(WIDTH, HEIGHT)
+    frame = Image.new("1", (WIDTH, HEIGHT), 0)
+    samples = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        percent = volume.adjust_volume("up" if i % 2 == 0 else "down")
+        if percent is not None:
+            overlay_manager.show_volume(percent)
+        overlay_manager.update()
+        if overlay_manager.has_active_overlays():
+            frame = overlay_manager.render(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    n = len(samples)
+    return sum(samples) / n, samples[n // 2], samples[int(n * 0.95)], samples[-1]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"{'backend':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for backend in ("amixer", "alsa"):
+        result = measure(backend, rounds)
+        if result is None:
+            print(f"{backend:>8}  unavailable")
+            continue
+        print(f"{backend:>8} " + " ".join(f"{value:>9.2f}" for value in result))
+
+
+if __name__ == "__main__":
+    main()
@@ -114,6 +114,16 @@ class DisplayPlugin(ABC):
         """get the canvas draw object"""
         return self.draw
     
+    @property
+    def clock(self):
+        """get the frame clock, clock.time() is the monotonic timestamp of the current frame"""
+        return self.manager.clock
+
+    @property
+    def gestures(self):
+        """get the gesture engine, subscribe with owner=self and gestures.off(owner=self) when inactive"""
+        return self.manager.gestures
+
     @property
     def framerate(self):
         """get the current framerate"""
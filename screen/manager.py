@@ -1,13 +1,17 @@
-import time
 import sys
 import signal
 
 from pathlib import Path
 from PIL import Image, ImageDraw
 from until.device.input import KeyListener, ecodes
-from until.device.volume import adjust_volume, detect_pcm_controls, toggle_mute, get_volume_percent
+from until.device.volume import detect_pcm_controls, toggle_mute, get_volume_percent, get_volume_controller
+from until.device.audio_tap import get_audio_tap
 from until.log import LOGGER
 from until.keymap import get_keymap
+from until.scheduler import get_scheduler
+from until.gesture import get_gesture_engine
+from until.clock import get_clock, set_clock
+from until.latency import get_latency_probe
 from until.resource import get_resource_path
 
 from ui.fonts import Fonts
@@ -56,8 +60,14 @@ def _show_welcome(
 
 
 class DisplayManager:
-    def __init__(self, device=None):
-        """Initialize the display manager"""
+    def __init__(self, device=None, clock=None):
+        """Initialize the display manager
+
+        clock: 帧时钟，默认使用全局 FrameClock；测试/基准可传入 SimulatedClock
+        """
+        # 帧时钟必须最先设置，后续创建的动画、调度器都从它取时间
+        self.clock = set_clock(clock) if clock is not None else get_clock()
+
         # init display
         if device is None:
             LOGGER.error("display is not initialized")
@@ -78,6 +88,18 @@ class DisplayManager:
         # init keymap
         self.keymap = get_keymap()
 
+        # init scheduler
+        self.scheduler = get_scheduler()
+
+        # init gesture engine (longpress/repeat driven by the scheduler)
+        self.gestures = get_gesture_engine()
+        self.gestures.on("repeat", self.keymap.media_volume_up, lambda g: self.adjust_volume("up"), owner=self)
+        self.gestures.on("repeat", self.keymap.media_volume_down, lambda g: self.adjust_volume("down"), owner=self)
+
+        # init input-to-photon latency probe (MUSPI_LATENCY=1)
+        self.latency = get_latency_probe()
+        self.running = True
+
         # init overlay manager
         self.overlay_manager = OverlayManager(self.disp.width, self.disp.height)
 
@@ -89,9 +111,13 @@ class DisplayManager:
         self.disp.contrast(CONTRAST)  # 128 is the default contrast value
         self.welcome()
         self.sleep_time = 3 * 60  # 3 minutes idle time
-        self.sleep_count = time.time()
+        self.sleep_count = self.clock.time()
         
         self.is_muted = False  # 跟踪静音状态
+        # 音量调节在后台线程合并写入，写入后用真实音量校正覆盖层
+        self.volume = get_volume_controller()
+        self.volume.on_change = self.overlay_manager.show_volume
+        self.volume.on_mute = self._on_mute_changed
 
         # initialize plugins
         self.plugins = []
@@ -127,6 +153,8 @@ class DisplayManager:
 
     def active_next(self):
         """activate the next plugin"""
+        if self.latency.enabled:
+            self.latency.label("screen_switch")
         # Save current active_id to avoid it being modified during set_active() calls
         current_id = self.active_id
 
@@ -151,6 +179,8 @@ class DisplayManager:
 
     def active_prev(self):
         """activate the previous plugin"""
+        if self.latency.enabled:
+            self.latency.label("screen_switch")
         # Save current active_id to avoid it being modified during set_active() calls
         current_id = self.active_id
 
@@ -178,12 +208,14 @@ class DisplayManager:
         # 如果当前是静音状态，先取消静音
         if self.is_muted:
             self.is_muted = toggle_mute()
+            self.volume.invalidate()
             LOGGER.info("Auto-unmuted due to volume adjustment")
 
         if hasattr(self.last_active, "adjust_volume"):
             self.last_active.adjust_volume(direction)
         else:
-            volume = adjust_volume(direction)
+            # 立即显示预测的音量，不等待混音器
+            volume = self.volume.step(direction)
             if volume is not None:
                 self.overlay_manager.show_volume(volume)
 
@@ -204,7 +236,7 @@ class DisplayManager:
     # 处理按键事件
     def key_callback(self, evt):
         """handle the key event"""
-        km = self.keymap
+        km = self.keymap.event(evt)
         active_plugin = self.last_active
         
         exclusive_nav = bool(
@@ -234,24 +266,37 @@ class DisplayManager:
 
             # Volume mute toggle
             if km.down(km.media_volume_mute):
-                self.is_muted = toggle_mute()
-                if self.is_muted is not None:
-                    # 显示静音状态
-                    if self.is_muted:
-                        self.overlay_manager.show_volume(0)
-                    else:
-                        volume = get_volume_percent()
-                        if volume is not None:
-                            self.overlay_manager.show_volume(volume)
+                muted = toggle_mute()
+                self.volume.invalidate()
+                if muted is not None:
+                    self._on_mute_changed(muted)
+
+    def _on_mute_changed(self, muted):
+        """静音状态变化（按键或其他程序），显示静音或当前音量"""
+        self.is_muted = muted
+        if muted:
+            self.overlay_manager.show_mute()
+        else:
+            volume = get_volume_percent()
+            if volume is not None:
+                self.overlay_manager.show_volume(volume)
 
     def run(self):
-        detect_pcm_controls()
+        # 混音器检测结果按声卡缓存，后台校验，不阻塞第一帧；
+        # 控制器就绪后监听混音器事件，其他程序修改音量/静音时立即显示
+        detect_pcm_controls(self.get_path("user") / "mixer_cache.json", on_ready=self.volume.reload)
         self.key_listener.start()
         self.key_listener.on(self.key_callback)
+        self.key_listener.on(self.gestures.feed)
 
         try:
-            while True:
-                frame_start = time.time()
+            while self.running:
+                frame_start = self.clock.tick()  # 每帧只采样一次时间
+                self.key_listener.drain()  # 在主线程处理上一帧以来的输入事件
+                if self.latency.enabled:
+                    self.latency.begin_frame()  # 认领此前已处理的输入事件
+                Animation.tick(frame_start)  # 每帧统一驱动所有对象绑定的动画
+                self.scheduler.run_pending(frame_start)  # 执行到期的定时任务
                 self.sleep_check()
 
                 for plugin in self.plugins:
@@ -264,7 +309,7 @@ class DisplayManager:
 
                 # 当屏幕锁定时，降低帧率并跳过渲染，防止烧屏和节省CPU
                 if self.sleep:
-                    time.sleep(0.5)  # 锁屏时每0.5秒检查一次
+                    self.key_listener.wait(0.5)  # 锁屏时每0.5秒检查一次，有按键立即唤醒
                     continue
 
                 try:
@@ -304,7 +349,7 @@ class DisplayManager:
                     # 更新覆盖层
                     self.overlay_manager.update()
 
-                    # 如果有覆盖层，应用到主屏幕上
+                    # 如果有覆盖层，原地合成到主屏幕上
                     if self.overlay_manager.has_active_overlays():
                         self.main_screen = self.overlay_manager.render(self.main_screen)
                         # # 有覆盖层时保持高帧率
@@ -313,6 +358,8 @@ class DisplayManager:
 
                     # 使用 luma.oled 的 display() 方法直接显示图像
                     self.disp.display(self.main_screen)
+                    if self.latency.enabled:
+                        self.latency.flush()
 
                 except Exception as e:
                     import traceback
@@ -320,11 +367,14 @@ class DisplayManager:
                     LOGGER.error(f"错误堆栈: {traceback.format_exc()}")
                     # if error keep frame
                     LOGGER.error(f"error: {e}")
+                    # 同一插件的错误通知会被合并和限流，不会每帧重绘
+                    plugin_name = self.last_active.name if self.last_active else "muspi"
+                    self.overlay_manager.show_error(plugin_name, e)
                     framerate = 0.1
 
-                elapsed = time.time() - frame_start
+                elapsed = self.clock.monotonic() - frame_start
                 if elapsed < framerate:
-                    time.sleep(framerate - elapsed)
+                    self.clock.sleep(framerate - elapsed)
 
         except KeyboardInterrupt:
             LOGGER.warning("received keyboard interrupt, cleaning up...")
@@ -347,10 +397,10 @@ class DisplayManager:
         # time.sleep(1)
 
     def reset_sleep_timer(self):
-        self.sleep_count = time.time()
+        self.sleep_count = self.clock.time()
 
     def sleep_check(self):
-        if time.time() - self.sleep_count > self.sleep_time:
+        if self.clock.time() - self.sleep_count > self.sleep_time:
             self.turn_off_screen()
 
     def turn_on_screen(self):
@@ -371,7 +421,15 @@ class DisplayManager:
                 self.last_active.on_disp_status_update("off")
             self.sleep = True
 
+    def stop(self):
+        """stop the main loop after the current frame"""
+        self.running = False
+
     def cleanup(self, reset=True):
+        self.volume.stop()
+        get_audio_tap().stop()
+        if self.latency.enabled:
+            LOGGER.info(f"input latency report:\n{self.latency.report()}")
         # 清空显示
         self.disp.clear()
         if not reset:
@@ -6,6 +6,7 @@ import queue
 from until.log import LOGGER
 from screen.base import DisplayPlugin
 from ui.component import draw_scroll_text, draw_vu
+from until.device.audio_tap import get_audio_tap
 from assets.icons import IconDrawer
 from until.keymap import get_keymap
 
@@ -21,11 +22,12 @@ class airplay(DisplayPlugin):
         self.play_state = "pause"
         self.client_name = ""
         self.stream_volume = None
-        self.last_play_time = time.time()  # record the last play time
+        self.last_play_time = self.clock.time()  # record the last play time
         self.metadata_queue = queue.Queue()
         self.pause_timout = 30
         self._start_metadata_reader()
         self.keymap = get_keymap()
+        self._audio = None  # 共享音频采集的订阅，激活时订阅
         
     
     def _start_metadata_reader(self):
@@ -93,10 +95,12 @@ class airplay(DisplayPlugin):
         self.metadata_thread.start()
     
     def _read_metadata(self):
+        title_changed = False
         try:
             while not self.metadata_queue.empty():
                 metadata_type, value = self.metadata_queue.get_nowait()
                 if metadata_type == "title":
+                    title_changed = title_changed or value != self.current_title
                     self.current_title = value
                 elif metadata_type == "artist":
                     self.current_artist = value
@@ -106,10 +110,10 @@ class airplay(DisplayPlugin):
                     self.set_active(value)
                     
                     if value:  # if start playing, update the last play time
-                        self.last_play_time = time.time()
+                        self.last_play_time = self.clock.time()
                 elif metadata_type == "play_state":
                     if self.play_state != value:  # if play state changed
-                        self.last_play_time = time.time()  # update the last play time
+                        self.last_play_time = self.clock.time()  # update the last play time
                     self.play_state = value
                 elif metadata_type == "volume":
                     self.stream_volume = value
@@ -117,6 +121,10 @@ class airplay(DisplayPlugin):
                     self.client_name = value
         except queue.Empty:
             pass
+
+        # 不在当前屏幕时，曲目切换以通知的形式显示
+        if title_changed and self.manager.last_active is not self:
+            self.manager.overlay_manager.show_track(self.current_title, self.current_artist)
     
     def render(self):
         # get the canvas
@@ -164,7 +172,7 @@ class airplay(DisplayPlugin):
 
         # draw the VU table
         if self.play_state == "play":
-            draw_vu(draw, volume_level=volume, center_y=self.height // 2 -2)
+            draw_vu(draw, volume_level=volume, center_y=self.height // 2 -2, levels=self._audio_levels())
             if self.manager.sleep:
                 self.manager.turn_on_screen()
 
@@ -179,26 +187,40 @@ class airplay(DisplayPlugin):
         
 
             
+    # 共享音频采集的电平，没有可用的 loopback 时返回 None（draw_vu 按音量模拟）
+    def _audio_levels(self):
+        if self._audio is None:
+            return None
+        return self._audio.levels()
+
     def is_playing(self):
         return self.play_state == "play"
 
     def set_active(self, value):
         super().set_active(value)
         if value:
-            self.last_play_time = time.time()
+            self.last_play_time = self.clock.time()
             self.manager.key_listener.on(self.key_callback)
+            self._audio = get_audio_tap().subscribe(self)
+            # 按住方向键持续调节音量（定时器驱动，不依赖按键自动重复）
+            self.gestures.on("repeat", self.keymap.nav_up, lambda g: self.manager.adjust_volume("up"), owner=self)
+            self.gestures.on("repeat", self.keymap.nav_down, lambda g: self.manager.adjust_volume("down"), owner=self)
         else:
             self.manager.key_listener.off(self.key_callback)
+            self.gestures.off(owner=self)
+            if self._audio is not None:
+                self._audio.close()
+                self._audio = None
     
     def event_listener(self):
         self._read_metadata()
 
         # check if the pause state has been more than 5 minutes
-        if self.play_state == "pause" and time.time() - self.last_play_time > self.pause_timout:  # 300 seconds = 5 minutes
+        if self.play_state == "pause" and self.clock.time() - self.last_play_time > self.pause_timout:  # 300 seconds = 5 minutes
             self.set_active(False)
 
     def key_callback(self, evt):
-        km = self.keymap
+        km = self.keymap.event(evt)
 
         # volume up/down
         if km.down(km.nav_up):
@@ -206,9 +228,3 @@ class airplay(DisplayPlugin):
 
         if km.down(km.nav_down):
             self.manager.adjust_volume("down")
-
-        if km.longpress(km.nav_up, repeat=True):
-            self.manager.adjust_volume("up")
-
-        if km.longpress(km.nav_down, repeat=True):
-            self.manager.adjust_volume("down")
\ No newline at end of file
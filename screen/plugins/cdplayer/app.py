@@ -8,10 +8,12 @@ import time
 
 from screen.base import DisplayPlugin
 from ui.component import draw_scroll_text, draw_vu
+from until.device.audio_tap import get_audio_tap
 from assets.icons import IconDrawer
 
 from until.log import LOGGER
 from until.keymap import get_keymap
+from until.scheduler import get_scheduler
 
 MPV_SOCKET_PATH = "/tmp/mpv_socket"
 
@@ -25,12 +27,14 @@ class cdplayer(DisplayPlugin):
         self.media_player = MediaPlayer()
         self.last_play_time = 0
         self.pause_timout = 300 # 300 seconds = 5 minutes
+        self._last_title = self.media_player.current_title
 
         self.media_player.start_cd_monitor()
         self._is_in_longpress = False
         self._key_press_start_time = {}  # Track when each key was pressed
         self._longpress_duration = 2.0  # 2 seconds for long press
         self.keymap = get_keymap()
+        self._audio = None  # 共享音频采集的订阅，激活时订阅
 
     def render(self):
         # get the canvas
@@ -94,7 +98,7 @@ class cdplayer(DisplayPlugin):
             
         # draw the VU table
         if self.media_player.play_state == "playing" and self.media_player.is_player_ready:
-            draw_vu(draw, volume_level=0.5, center_y=self.height // 2 -2) 
+            draw_vu(draw, volume_level=0.5, center_y=self.height // 2 -2, levels=self._audio_levels()) 
             if self.manager.sleep:
                 self.manager.turn_on_screen()
                 
@@ -107,38 +111,58 @@ class cdplayer(DisplayPlugin):
             draw_vu(draw, volume_level=0.0, center_y=self.height // 2 -2)
             draw_scroll_text(draw, "⏹", (offset, 0), font=self.font_status)
             
+    # 共享音频采集的电平，没有可用的 loopback 时返回 None（draw_vu 按音量模拟）
+    def _audio_levels(self):
+        if self._audio is None:
+            return None
+        return self._audio.levels()
+
     def is_playing(self):
         return self.media_player.play_state == "playing"
 
     def set_active(self, value):
         super().set_active(value)
         if value:
-            self.last_play_time = time.time()
+            self.last_play_time = self.clock.time()
             self.manager.key_listener.on(self.key_callback)
+            self._audio = get_audio_tap().subscribe(self)
+            self.gestures.on("longpress", self.keymap.action_select, self._on_longpress_select, owner=self)
+            self.gestures.on("longpress", self.keymap.action_cancel, self._on_longpress_cancel, owner=self)
         else:
             self.manager.key_listener.off(self.key_callback)
+            self.gestures.off(owner=self)
+            if self._audio is not None:
+                self._audio.close()
+                self._audio = None
     
     def event_listener(self):
         if self.media_player.cd.read_status == "reading":
             self.set_active(True)
 
+        # 不在当前屏幕时，曲目切换以通知的形式显示
+        title = self.media_player.current_title
+        if title != self._last_title:
+            self._last_title = title
+            if self.media_player.is_running and self.manager.last_active is not self:
+                self.manager.overlay_manager.show_track(title, self.media_player.current_artist)
+
         # check if the pause state has been more than 5 minutes
-        if not self.media_player.is_running and time.time() - self.last_play_time > self.pause_timout:  # 300 seconds = 5 minutes
+        if not self.media_player.is_running and self.clock.time() - self.last_play_time > self.pause_timout:  # 300 seconds = 5 minutes
             self.set_active(False)
 
-    def key_callback(self, evt):
-        km = self.keymap
-        
-        # 长按 select 键 = 停止
-        if km.longpress(km.action_select):
-            self.media_player.stop()
-            self.media_player.cd.reset()
-            self._is_in_longpress = True
+    # 长按 select 键 = 停止
+    def _on_longpress_select(self, gesture):
+        self.media_player.stop()
+        self.media_player.cd.reset()
+        self._is_in_longpress = True
 
-        # 长按 cancel 键 = 弹出 CD
-        elif km.longpress(km.action_cancel):
-            self.media_player.eject()
-            self._is_in_longpress = True
+    # 长按 cancel 键 = 弹出 CD
+    def _on_longpress_cancel(self, gesture):
+        self.media_player.eject()
+        self._is_in_longpress = True
+
+    def key_callback(self, evt):
+        km = self.keymap.event(evt)
 
         # 短按 select 键 = 播放/暂停/尝试播放
         if km.down(km.action_select):
@@ -721,10 +745,7 @@ class CDDevice:
         self.type = "cdda"
         self.audio_files = []
 
-        threading.Timer(
-            5,
-            lambda: self.reset()
-        ).start()
+        get_scheduler().call_later(5, self.reset, group="cdplayer")
 
     @property
     def is_inserted(self):
@@ -860,10 +881,7 @@ class CDDevice:
         self._is_cd_inserted = False
         self.read_status = "nodisc"
         # Reset status after a delay to allow retry
-        threading.Timer(
-            15,
-            lambda: self.reset() if self.read_status == "nodisc" else None
-        ).start()
+        get_scheduler().call_later(15, lambda: self.reset() if self.read_status == "nodisc" else None, group="cdplayer")
 
     def _fix_info(self, cd_info):
         self._cd_info = cd_info
@@ -12,7 +12,7 @@ class clock(DisplayPlugin):
 
     def render(self):
         draw = self.canvas
-        current_time = time.time()
+        current_time = self.clock.time()
 
         # handle the colon blinking
         if current_time - self.last_blink_time >= 0.5:
@@ -1,4 +1,3 @@
-import time
 import random
 from screen.base import DisplayPlugin
 from until.keymap import get_keymap
@@ -256,12 +255,12 @@ class dino(DisplayPlugin):
         self.last_jump_time = 0
         self.jump_cooldown = 0.3
         self.frame_count = 0
-        self.last_score_update = time.time()
+        self.last_score_update = self.clock.time()
         self.game_over_time = 0  # 记录游戏结束的时间
         self.player = player
 
     def ai_decision(self):
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time - self.last_jump_time < self.jump_cooldown:
             return
 
@@ -307,7 +306,7 @@ class dino(DisplayPlugin):
         return False
 
     def update_object(self):
-        current_time = time.time()
+        current_time = self.clock.time()
 
         # 如果游戏结束且已经过去5秒，重新开始游戏
         if self.game_over:
@@ -399,7 +398,7 @@ class dino(DisplayPlugin):
             draw.text((text_x, text_y), game_over_text, fill=255, font=self.font8)
             
             # 显示重启倒计时
-            remaining = 5 - int(time.time() - self.game_over_time)
+            remaining = 5 - int(self.clock.time() - self.game_over_time)
             if remaining > 0:
                 draw.rectangle((WIDTH//2-1, self.height//2+2, WIDTH//2+10, self.height//2+10), fill=0)
                 draw.text((WIDTH//2+1, self.height//2), f"{remaining}s", fill=255, font=self.font8)
@@ -415,11 +414,13 @@ class dino(DisplayPlugin):
 
         if evt.value == 1:  # key down
             # select 或 cancel 键都可以跳跃/开始游戏
-            if self.keymap.match(key_select) or self.keymap.match(key_cancel):
+            if self.keymap.match(key_select, key_cancel, evt=evt):
                 if self.player != "You" or self.game_over:
                     self.reset_game("You")
                 elif self.player == "You":
                     self.dino.jump()
+                    if self.manager.latency.enabled:
+                        self.manager.latency.label("dino_jump")
 
     def set_active(self, active):
         super().set_active(active)
@@ -13,6 +13,7 @@ import dataclasses
 from screen.base import DisplayPlugin
 from until.keymap import get_keymap
 from until.log import LOGGER
+from until.triple_buffer import TripleBuffer
 from ui.animation import Animation, Operator
 from ui.component import draw_scroll_text
 
@@ -131,9 +132,11 @@ class gameboy(DisplayPlugin):
             self._loop_gate.set()
 
         # 输入与输出
-        self._frame_lock = threading.Lock()
         self._input_lock = threading.Lock()
-        self._current_frame: Optional[np.ndarray] = None
+        # 模拟器线程和渲染线程通过三缓冲交换帧，互不等待；转换后的图像缓存到有新帧为止
+        self._frames = TripleBuffer()
+        self._frame_image: Optional[Image.Image] = None
+        self._frame_image_seq = 0
         self._input_state = {
             "up": False,
             "down": False,
@@ -149,14 +152,6 @@ class gameboy(DisplayPlugin):
         # 游戏状态管理
         self._paused_game: Optional[Path] = None  # 当前暂停的游戏
 
-        # 组合键状态追踪
-        self._combo_keys_pressed = {
-            "select": False,
-            "cancel": False,
-            "up": False,
-            "down": False,
-        }
-
         # 模拟轴状态追踪（用于防抖）
         self._axis_state = {
             "ABS_HAT0Y": 0,
@@ -185,10 +180,18 @@ class gameboy(DisplayPlugin):
 
         if value:
             self.manager.key_listener.on(self.key_callback)
+            # 游戏按键在监听线程中直接写入输入状态，不等下一帧
+            self.manager.key_listener.on(self.game_key_callback, direct=True)
+            # 组合键（备用退出方式）: action_select + action_cancel + nav_up / nav_down
+            km = self.keymap
+            self.gestures.on("chord", [km.action_select, km.action_cancel, km.nav_up], self._on_exit_combo, owner=self)
+            self.gestures.on("chord", [km.action_select, km.action_cancel, km.nav_down], self._on_screenshot_combo, owner=self)
             if not self._show_menu:
                 self._loop_gate.set()
         else:
             self.manager.key_listener.off(self.key_callback)
+            self.manager.key_listener.off(self.game_key_callback)
+            self.gestures.off(owner=self)
             self._exit_to_menu()
 
     def wants_exclusive_input(self) -> bool:
@@ -204,7 +207,7 @@ class gameboy(DisplayPlugin):
             self._emulator_ready = False
 
         # # 只要有新帧就保持屏幕唤醒
-        # if self.is_active and (time.time() - self._last_frame_ts) < 0.5:
+        # if self.is_active and (self.clock.time() - self._last_frame_ts) < 0.5:
         #     self.manager.reset_sleep_timer() # reset the sleep timer
 
     # ------------------------------------------------------------------ #
@@ -219,10 +222,11 @@ class gameboy(DisplayPlugin):
             return
 
         # 游戏运行模式
-        frame_img = None
-        with self._frame_lock:
-            if self._current_frame is not None:
-                frame_img = self._convert_frame(self._current_frame)
+        if self._frames.seq != self._frame_image_seq:
+            seq, frame = self._frames.acquire()
+            self._frame_image = self._convert_frame(frame) if frame is not None else None
+            self._frame_image_seq = seq
+        frame_img = self._frame_image
 
         if frame_img:
             self.image.paste(frame_img)
@@ -235,34 +239,12 @@ class gameboy(DisplayPlugin):
     # ------------------------------------------------------------------ #
     # muspi输入处理
 
-    def key_callback(self, evt):
-        km = self.keymap
-        keycode = evt.code
-        
-        # reset the sleep timer when any key is pressed
-        self.manager.reset_sleep_timer() 
-
-        # 菜单模式下的按键处理
+    def game_key_callback(self, evt):
+        """监听线程中直接调用（direct），只更新 _input_lock 保护的按键状态"""
         if self._show_menu:
-            self._handle_menu_key(evt)
             return
 
-        # 游戏模式下的按键处理
-        # 检测 action_menu 按键快速返回选单
-        if km.down(km.action_menu):
-            self._exit_to_menu()
-            return
-
-        # 更新组合键状态（备用退出方式）
-        self._update_combo_key_state(keycode, abs(evt.value))
-
-        # 检测组合键: action_select + action_cancel + nav_up（备用退出方式）
-        if self._check_exit_combo():
-            self._exit_to_menu()
-            return
-        if self._check_screenshot_combo():
-            self._take_screenshot()
-
+        km = self.keymap.event(evt)
         # 按键映射：支持键盘和手柄
         mapping = (
             ("up", [km.nav_up]),
@@ -281,6 +263,23 @@ class gameboy(DisplayPlugin):
                     self._set_button_state(button, abs(evt.value))
                     break
 
+    def key_callback(self, evt):
+        km = self.keymap.event(evt)
+        
+        # reset the sleep timer when any key is pressed
+        self.manager.reset_sleep_timer() 
+
+        # 菜单模式下的按键处理
+        if self._show_menu:
+            self._handle_menu_key(evt)
+            return
+
+        # 游戏模式下的按键处理
+        # 检测 action_menu 按键快速返回选单
+        if km.down(km.action_menu):
+            self._exit_to_menu()
+            return
+
         # media_stop 作为快速复位
         if km.down(km.media_stop):
             self._reset_request.set()
@@ -435,9 +434,8 @@ class gameboy(DisplayPlugin):
         if frame is None:
             return
 
-        with self._frame_lock:
-            self._current_frame = frame.copy()
-            self._last_frame_ts = time.time()
+        self._frames.publish(frame)
+        self._last_frame_ts = self.clock.time()
 
     def _pump_audio(self):
         if not (self.arduboy and self._audio_driver):
@@ -629,7 +627,6 @@ class gameboy(DisplayPlugin):
             # self.canvas.text((4, self.height // 2 - 5), "No games found", font=self.font10, fill=255)
             return
 
-        self._animation.update()
         self._maybe_hide_scrollbar()
 
         active_rom = self._rom_list[self._selected_rom_index]
@@ -776,12 +773,12 @@ class gameboy(DisplayPlugin):
             duration=2,
             operator=Operator.ease_out_cubic,
         )
-        self._scrollbar_last_move = time.time()
+        self._scrollbar_last_move = self.clock.time()
         self._show_scrollbar()
         self._animate_scrollbar_thumb()
 
     def _is_animation_running(self, anim_id: str) -> bool:
-        return anim_id in self._animation.animation_list and self._animation.is_running(anim_id)
+        return self._animation.is_running(anim_id)
 
     def _show_scrollbar(self):
         """滚动条划入"""
@@ -819,7 +816,7 @@ class gameboy(DisplayPlugin):
         if not self._scrollbar_visible:
             return
 
-        if (time.time() - self._scrollbar_last_move) < self._scrollbar_hide_delay:
+        if (self.clock.time() - self._scrollbar_last_move) < self._scrollbar_hide_delay:
             return
 
         self._scrollbar_visible = False
@@ -875,7 +872,7 @@ class gameboy(DisplayPlugin):
     
     def _handle_menu_key(self, evt):
         """处理菜单模式下的按键"""
-        km = self.keymap
+        km = self.keymap.event(evt)
         
         if not self._rom_list:
             return
@@ -916,33 +913,16 @@ class gameboy(DisplayPlugin):
             LOGGER.info("Loading game -> %s", selected_rom.name)
             self._start_worker()
 
-    def _update_combo_key_state(self, keycode: int, pressed: bool):
-        """更新组合键状态"""
-        if self.keymap.action_select and keycode in self.keymap.action_select:
-            self._combo_keys_pressed["select"] = pressed
-        elif self.keymap.action_cancel and keycode in self.keymap.action_cancel:
-            self._combo_keys_pressed["cancel"] = pressed
-        elif self.keymap.nav_up and keycode in self.keymap.nav_up:
-            self._combo_keys_pressed["up"] = pressed
-        elif self.keymap.nav_down and keycode in self.keymap.nav_down:
-            self._combo_keys_pressed["down"] = pressed
-
-    def _check_exit_combo(self) -> bool:
-        """检测退出组合键: action_select + action_cancel + nav_up 同时按下"""
-        return (
-            self._combo_keys_pressed["select"] and
-            self._combo_keys_pressed["cancel"] and
-            self._combo_keys_pressed["up"]
-        )
+    def _on_exit_combo(self, gesture):
+        """组合键 action_select + action_cancel + nav_up 退出到选单"""
+        if not self._show_menu:
+            self._exit_to_menu()
+
+    def _on_screenshot_combo(self, gesture):
+        """组合键 action_select + action_cancel + nav_down 截图"""
+        if not self._show_menu:
+            self._take_screenshot()
 
-    def _check_screenshot_combo(self) -> bool:
-        """检测截图组合键: action_select + action_cancel + nav_down 同时按下"""
-        return (
-            self._combo_keys_pressed["select"] and
-            self._combo_keys_pressed["cancel"] and
-            self._combo_keys_pressed["down"]
-        )
-        
     def _exit_to_menu(self):
         """退出游戏回到选单"""
         LOGGER.info("Exiting game to menu")
@@ -951,10 +931,6 @@ class gameboy(DisplayPlugin):
         self._paused_game = self._current_rom_path
         self._loop_gate.clear()  # 暂停游戏循环
         self._reset_inputs()
-        # 清空组合键状态
-        for key in self._combo_keys_pressed:
-            self._combo_keys_pressed[key] = False
-        self._combo_screenshot_triggered = False
 
     def _stop_current_game(self):
         """停止当前游戏"""
@@ -984,7 +960,8 @@ class gameboy(DisplayPlugin):
 
         # 重置状态
         self._emulator_ready = False
-        self._current_frame = None
+        self._frames.reset()
+        self._frame_image = None
         self._worker = None
 
     def _take_screenshot(self):
@@ -995,10 +972,9 @@ class gameboy(DisplayPlugin):
             return
 
         # 获取当前帧
-        frame = None
-        with self._frame_lock:
-            if self._current_frame is not None:
-                frame = self._current_frame.copy()
+        _, frame = self._frames.acquire()
+        if frame is not None:
+            frame = frame.copy()
 
         if frame is None:
             LOGGER.warning("Screenshot failed: no frame available")
@@ -71,7 +71,7 @@ class life(DisplayPlugin):
             self.manager.key_listener.off(self.key_callback)
     
     def key_callback(self, evt):
-        km = self.keymap
+        km = self.keymap.event(evt)
         
         if km.down(km.action_select, km.action_cancel):
             self.initialize_grid()
@@ -54,7 +54,7 @@ class matrix(DisplayPlugin):
         # 转换为单色灰度值（取绿色通道值）
         self.gray_levels = [rgb[1] for rgb in wrd_rgb]
 
-        self.clock = 0
+        self.frame_count = 0
         self.blue_pilled_population = []
         self.max_population = self.width * 8
 
@@ -85,7 +85,7 @@ class matrix(DisplayPlugin):
         5. 清理超出屏幕的雨滴
         """
         draw = self.canvas
-        self.clock += 1
+        self.frame_count += 1
 
         # 绘制所有雨滴
         for person in self.blue_pilled_population:
@@ -119,7 +119,7 @@ class matrix(DisplayPlugin):
             person[1] += speed
 
         # 定期增加新雨滴
-        if self.clock % 5 == 0 or self.clock % 3 == 0:
+        if self.frame_count % 5 == 0 or self.frame_count % 3 == 0:
             self.increase_population()
 
         # 移除超出屏幕的雨滴
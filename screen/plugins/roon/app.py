@@ -6,6 +6,7 @@ from roonapi import RoonApi, RoonDiscovery
 
 from screen.base import DisplayPlugin
 from ui.component import draw_scroll_text, draw_vu
+from until.device.audio_tap import get_audio_tap
 from assets.icons import IconDrawer
 
 from until.log import LOGGER
@@ -39,7 +40,7 @@ class roon(DisplayPlugin):
         self.current_artist = "show info"
         self.play_state = "pause"
         self.volume = {"value": 0, "is_muted": False}
-        self.last_play_time = time.time()
+        self.last_play_time = self.clock.time()
 
         self.metadata_queue = queue.Queue()
         self.is_played_yet = False
@@ -50,6 +51,7 @@ class roon(DisplayPlugin):
 
         self.ready = False
         self.keymap = get_keymap()
+        self._audio = None  # 共享音频采集的订阅，激活时订阅
 
     def _start_roon_thread(self):
         def roon_thread():
@@ -176,10 +178,12 @@ class roon(DisplayPlugin):
 
 
     def _read_metadata(self):
+        title_changed = False
         try:
             while not self.metadata_queue.empty():
                 metadata_type, value = self.metadata_queue.get_nowait()
                 if metadata_type == "title":
+                    title_changed = title_changed or value != self.current_title
                     self.current_title = value
                 elif metadata_type == "artist":
                     self.current_artist = value
@@ -193,11 +197,11 @@ class roon(DisplayPlugin):
                     # if not self.is_played_yet:
                     #     self.set_active(value)
                     if value:
-                        self.last_play_time = time.time()
+                        self.last_play_time = self.clock.time()
                         self.is_played_yet = True
                 elif metadata_type == "play_state":
                     if self.play_state != value:
-                        self.last_play_time = time.time()
+                        self.last_play_time = self.clock.time()
                     self.play_state = value
                 elif metadata_type == "volume":
                     self.volume = value
@@ -207,6 +211,10 @@ class roon(DisplayPlugin):
                     self.media_length = value
         except queue.Empty:
             pass
+
+        # 不在当前屏幕时，曲目切换以通知的形式显示
+        if title_changed and self.manager.last_active is not self:
+            self.manager.overlay_manager.show_track(self.current_title, self.current_artist)
     
     def render(self): 
         draw = self.canvas
@@ -271,7 +279,7 @@ class roon(DisplayPlugin):
         
         ## draw the VU table
         if self.play_state == "playing":
-            draw_vu(draw, volume_level=volume, center_y=self.height // 2 -2)
+            draw_vu(draw, volume_level=volume, center_y=self.height // 2 -2, levels=self._audio_levels())
             if self.manager.sleep:
                 self.manager.turn_on_screen()
                 
@@ -287,10 +295,18 @@ class roon(DisplayPlugin):
     def set_active(self, value):
         super().set_active(value)
         if value:
-            self.last_play_time = time.time()
+            self.last_play_time = self.clock.time()
             self.manager.key_listener.on(self.key_callback)
+            self._audio = get_audio_tap().subscribe(self)
+            # 按住方向键持续调节音量（定时器驱动，不依赖按键自动重复）
+            self.gestures.on("repeat", self.keymap.nav_up, lambda g: self.manager.adjust_volume("up"), owner=self)
+            self.gestures.on("repeat", self.keymap.nav_down, lambda g: self.manager.adjust_volume("down"), owner=self)
         else:
             self.manager.key_listener.off(self.key_callback)
+            self.gestures.off(owner=self)
+            if self._audio is not None:
+                self._audio.close()
+                self._audio = None
     
     # def adjust_volume(self, value):
     #     zone = self.roon.zones[self.zone_id]
@@ -306,7 +322,7 @@ class roon(DisplayPlugin):
                 
 
     def key_callback(self, evt):
-        km = self.keymap
+        km = self.keymap.event(evt)
 
         # select 键或专用播放/暂停键
         if km.down(km.action_select) or km.down(km.media_play_pause):
@@ -331,14 +347,6 @@ class roon(DisplayPlugin):
         if km.down(km.nav_down):
             self.manager.adjust_volume("down")
 
-        if km.longpress(km.nav_up, repeat=True):
-            self.manager.adjust_volume("up")
-
-        if km.longpress(km.nav_down, repeat=True):
-            self.manager.adjust_volume("down")
-        
-        km.up(km.nav_up, km.nav_down) # 释放 nav_up,nav_down 键
-
     def event_listener(self):
         self._read_metadata()
         
@@ -347,8 +355,14 @@ class roon(DisplayPlugin):
             self.is_played_yet = False
 
         # check if the pause state has been more than 5 minutes
-        if self.play_state == "paused" and time.time() - self.last_play_time > self.pause_timout:
+        if self.play_state == "paused" and self.clock.time() - self.last_play_time > self.pause_timout:
             self.set_active(False)
     
+    # 共享音频采集的电平，没有可用的 loopback 时返回 None（draw_vu 按音量模拟）
+    def _audio_levels(self):
+        if self._audio is None:
+            return None
+        return self._audio.levels()
+
     def is_playing(self):
         return self.play_state == "playing"
\ No newline at end of file
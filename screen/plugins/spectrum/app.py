@@ -1,25 +1,16 @@
-import os
-import threading
-import time
-from typing import List, Optional
-
 import numpy as np
 
 from screen.base import DisplayPlugin
 from until.config import config as config_loader
+from until.device.audio_tap import ALSA_AVAILABLE, get_audio_tap
+from until.dsp import get_fft, make_band_reducer
 from until.log import LOGGER
+from ui.bars import BarMask
 from ui.component import draw_scroll_text
 from ui.spinner import Spinner
+from ui.waterfall import Waterfall
 from until.keymap import get_keymap
 
-try:
-    import alsaaudio
-
-    ALSA_AVAILABLE = True
-except ImportError:
-    ALSA_AVAILABLE = False
-    alsaaudio = None
-
 
 class spectrum(DisplayPlugin):
     CONFIG_FILE = "config.json"
@@ -28,7 +19,15 @@ class spectrum(DisplayPlugin):
         "sample_rate": 44100, #采样率，影响频域分辨率
         "chunk_size": 1024, #采样数据大小，影响频域分辨率
         "fft_size": 2048, #FFT窗口大小，影响频域分辨率
+        "fft_backend": "auto", #FFT后端：auto（启动时测速选择）、numpy、scipy
+        "fft_workers": 1, #scipy FFT 线程数，-1 为全部 CPU
         "min_frequency": 40, #最小频率，影响频域显示范围
+        "bar_count": 0, #频谱条数量，0 表示按屏幕宽度自动计算
+        "banding": "log", #频带划分：log（对数）、octave（1/3倍频程）、mel、hybrid（线性/对数混合）
+        "a_weighting": False, #是否叠加A计权
+        "stereo": False, #左右声道分开显示，左声道在左侧镜像，低频在中间
+        "view": "bars", #显示方式：bars（频谱条）、waterfall（瀑布图）
+        "waterfall_direction": "vertical", #瀑布图滚动方向：vertical（向下）、horizontal（向左）
         "db_floor": -70.0, #dB.floor，影响频域显示范围
         "db_ceiling": -15.0, #dB.ceiling，影响频域显示范围
         "gain_db": 0.0, #dB.gain，影响频域显示范围
@@ -39,18 +38,9 @@ class spectrum(DisplayPlugin):
         "rise_smoothing": 0.35, #频域条高度上升平滑
         "decay_smoothing": 0.65, #频域条高度下降平滑
         "peak_decay": 0.02, #频域条高度衰减
+        "analysis_rate": 30, #每秒分析次数，两次分析之间插值；0 表示每帧分析
     }
  
-    # 音频设备循环检测列表
-    LOOPBACK_CANDIDATES = [
-        # "hw:Loopback,1",
-        # "hw:Loopback,0",
-        # "plughw:Loopback,1",
-        # "plughw:Loopback,0",
-        "Loopback",
-        "default",
-    ]
-
     def __init__(self, manager, width, height):
         self.name = "spectrum"
         super().__init__(manager, width, height)
@@ -65,23 +55,81 @@ class spectrum(DisplayPlugin):
         self.min_frequency = float(self._config.get("min_frequency", 40))
         self.channels = 2
 
+        self._stereo = bool(self._config.get("stereo", False))
+        analysed_channels = self.channels if self._stereo else 1
+
         self._setup_bars()
 
-        self._window = np.hanning(self.fft_size).astype(np.float32)
+        # Hann 窗在后端的预分配缓冲区中原地计算，立体声时两个声道一次计算
+        self._fft = get_fft(
+            self.fft_size,
+            str(self._config.get("fft_backend", "auto")),
+            channels=analysed_channels,
+            workers=int(self._config.get("fft_workers", 1)),
+        )
         self._freq_axis = np.fft.rfftfreq(self.fft_size, d=1.0 / self.sample_rate)
-        self._bin_edges = self._build_frequency_bins()
 
-        self._bars = np.zeros(self._bar_count, dtype=np.float32)
-        self._peaks = np.zeros(self._bar_count, dtype=np.float32)
-        self._bars_lock = threading.Lock()
-
-        self._sample_buffer = np.zeros(0, dtype=np.float32)
-        self._hop_size = max(1, self.fft_size // 2)
         self._db_floor = float(self._config.get("db_floor", -70.0))
         self._db_ceiling = float(self._config.get("db_ceiling", -15.0))
         self._gain_db = float(self._config.get("gain_db", 0.0))
         if self._db_ceiling <= self._db_floor:
             self._db_ceiling = self._db_floor + 10.0
+        # 频带预先计算（reduceat 边界或滤波器组矩阵），每次分析只做一次聚合，只对频带取 dB
+        self._band_reducer = make_band_reducer(
+            str(self._config.get("banding", "log")),
+            self._freq_axis,
+            self._bar_count // analysed_channels,
+            self.min_frequency,
+            self._db_floor,
+            self._db_ceiling,
+            self._gain_db,
+            reference=self.fft_size / 2.0,
+            weighting=bool(self._config.get("a_weighting", False)),
+            channels=analysed_channels,
+        )
+        band_count = self._band_reducer.count
+        self._setup_bars(band_count * analysed_channels)
+        # 立体声：左声道倒序放在左半边，右声道放在右半边，低频在中间
+        self._bar_order = None
+        if self._stereo:
+            self._bar_order = np.concatenate((np.arange(band_count)[::-1], band_count + np.arange(band_count)))
+            self._levels = np.zeros(self._bar_count, dtype=np.float32)
+
+        self._bars = np.zeros(self._bar_count, dtype=np.float32)
+        self._peaks = np.zeros(self._bar_count, dtype=np.float32)
+        self._prev_bars = np.zeros(self._bar_count, dtype=np.float32)  # 上次分析前的值，用于插值
+        self._display_bars = np.zeros(self._bar_count, dtype=np.float32)
+
+        # 频谱条和峰值线按条高一次生成掩码图像，区域从基线向上 max_height 行
+        self._bars_top = min(self.height - 8, 7)
+        self._baseline = self.height - 2
+        self._max_height = max(4, self._baseline - self._bars_top)
+        step = self._bar_width + self._bar_spacing
+        lefts = [self._bars_offset + idx * step for idx in range(self._bar_count)]
+        self._bar_mask = BarMask(self.width, self._max_height + 1, lefts, self._bar_width)
+        self._scaled = np.zeros(self._bar_count, dtype=np.float32)
+        self._bar_lengths = np.zeros(self._bar_count, dtype=np.int32)
+        self._peak_marks = np.zeros(self._bar_count, dtype=np.int32)
+
+        self._hop_size = max(1, self.fft_size // 2)
+        # 共享的音频采集：采集线程只写入立体声环形缓冲区，分析在渲染时按需取最新窗口
+        self._tap = get_audio_tap()
+        self._tap.configure(
+            device=(self._config.get("device") or "").strip() or None,
+            sample_rate=self.sample_rate,
+            chunk_size=self.chunk_size,
+            window_size=self.fft_size,
+        )
+        self._audio = None  # 激活时订阅
+        # 单声道分析时的混音暂存
+        self._mono = None if self._stereo else np.zeros(self.fft_size, dtype=np.float32)
+        self._analysed_end = 0  # 上次分析的窗口结束位置，没有新数据时跳过 FFT
+        analysis_rate = float(self._config.get("analysis_rate", 30) or 0)
+        self._analysis_interval = 1.0 / analysis_rate if analysis_rate > 0 else 0.0
+        # 平滑和峰值衰减系数按原来每个 hop 一次分析标定，换算为按时间
+        self._hop_rate = self.sample_rate / self._hop_size
+        self._smoothing = np.zeros(self._bar_count, dtype=np.float32)
+        self._diff = np.zeros(self._bar_count, dtype=np.float32)
 
         self._rise_smoothing = float(self._config.get("rise_smoothing", 0.35))
         self._decay_smoothing = float(self._config.get("decay_smoothing", 0.65))
@@ -90,28 +138,30 @@ class spectrum(DisplayPlugin):
         self._peak_decay = float(self._config.get("peak_decay", 0.05))
         self._peak_decay = min(max(self._peak_decay, 0.001), 1.0)
 
-        self._capture_thread: Optional[threading.Thread] = None
-        self._stop_event: Optional[threading.Event] = None
-        self._device_label = None
-        self._status_message = "Idle"
-        self._error_message = None
-        self._last_fft_ts = 0.0
+        self._last_fft_ts = 0.0  # 上次分析的帧时间
         self._avg_level = 0.0
 
-        env_device = os.environ.get("MUSPI_SPECTRUM_DEVICE", "").strip()
-        configured = (self._config.get("device") or "").strip()
-        self._device_hint = env_device or configured or None
-
         self._signal_threshold = float(self._config.get("signal_threshold", 0.003))
         self._bar_signal_threshold = float(self._config.get("bar_signal_threshold", 0.05))
         self._silence_hold = float(self._config.get("silence_hold", 0.75))
-        self._last_signal_ts = time.time()
+        self._last_signal_ts = self.clock.time()
         self._bar_gamma = float(self._config.get("bar_gamma", 1.0))
         if self._bar_gamma <= 0:
             self._bar_gamma = 1.0
 
+        # 瀑布图：每次分析写入一行，有序抖动后整张图一次生成
+        self._waterfall = None
+        if self._config.get("view", "bars") == "waterfall":
+            self._waterfall_top = min(self.height - 8, 7)
+            self._waterfall = Waterfall(
+                self.width,
+                self.height - self._waterfall_top,
+                self._bar_count,
+                str(self._config.get("waterfall_direction", "vertical")),
+            )
+            self._waterfall_levels = np.zeros(self._bar_count, dtype=np.float32)
+
         if not ALSA_AVAILABLE:
-            self._error_message = "Install pyalsaaudio"
             LOGGER.error("pyalsaaudio is not installed; spectrum plugin disabled")
             
         # spinner text
@@ -140,15 +190,22 @@ class spectrum(DisplayPlugin):
         super().set_active(active)
 
         if active:
-            self._start_capture()
+            self._audio = self._tap.subscribe(self)
             self.manager.key_listener.on(self.key_callback)
+            # 按住方向键持续调节音量（定时器驱动，不依赖按键自动重复）
+            self.gestures.on("repeat", self.keymap.nav_up, lambda g: self.manager.adjust_volume("up"), owner=self)
+            self.gestures.on("repeat", self.keymap.nav_down, lambda g: self.manager.adjust_volume("down"), owner=self)
         elif not active:
-            self._stop_capture()
+            if self._audio is not None:
+                self._audio.close()
+                self._audio = None
+            self._reset_analysis()
             self.manager.key_listener.off(self.key_callback)
+            self.gestures.off(owner=self)
 
     # 处理按键事件
     def key_callback(self, evt):
-        km = self.keymap
+        km = self.keymap.event(evt)
 
         # volume up/down
         if km.down(km.nav_up):
@@ -157,224 +214,64 @@ class spectrum(DisplayPlugin):
         if km.down(km.nav_down):
             self.manager.adjust_volume("down")
 
-        if km.longpress(km.nav_up, repeat=True):
-            self.manager.adjust_volume("up")
-
-        if km.longpress(km.nav_down, repeat=True):
-            self.manager.adjust_volume("down")
 
-    # 处理显示状态更新事件
-    def on_disp_status_update(self, status: str):
-        if status == "off":
-            self._stop_capture()
-        elif status == "on" and self.is_active:
-            self._start_capture()
+    # 清除分析状态，下次激活时从新数据开始
+    def _reset_analysis(self):
+        self._analysed_end = 0
+        if self._waterfall is not None:
+            self._waterfall.clear()
 
     # 计算频谱条的数量和间距
-    def _setup_bars(self):
+    def _setup_bars(self, count=None):
         self._bar_spacing = 1
         self._bar_width = 3 if self.width >= 96 else 2
         max_bars = max(8, self.width // (self._bar_width + self._bar_spacing))
-        self._bar_count = min(32, max_bars)
+        if count is None:
+            bar_count = int(self._config.get("bar_count", 0) or 0)
+            count = min(bar_count, max_bars) if bar_count > 0 else max_bars
+        # 频带数由频带划分决定（如倍频程），按实际数量居中
+        self._bar_count = count
         total_width = self._bar_count * self._bar_width + (self._bar_count - 1) * self._bar_spacing
         self._bars_offset = max(0, (self.width - total_width) // 2)
 
-    # 构建频率分箱
-    def _build_frequency_bins(self):
-        nyquist = self.sample_rate / 2.0
-        start_freq = max(10.0, min(self.min_frequency, nyquist))
-        end_freq = max(start_freq + 10, nyquist)
-
-        try:
-            freq_edges = np.geomspace(start_freq, end_freq, self._bar_count + 1)
-        except ValueError:
-            freq_edges = np.linspace(start_freq, end_freq, self._bar_count + 1)
-
-        freq_edges = np.clip(freq_edges, 0, nyquist)
-        indices = np.searchsorted(self._freq_axis, freq_edges)
-        indices = np.clip(indices, 0, len(self._freq_axis) - 1)
-
-        edges: List[int] = indices.tolist()
-        for i in range(1, len(edges)):
-            if edges[i] <= edges[i - 1]:
-                edges[i] = min(len(self._freq_axis) - 1, edges[i - 1] + 1)
-
-        return edges
-
-    # 启动捕获线程
-    def _start_capture(self):
-        if self._capture_thread and self._capture_thread.is_alive():
-            return
-
-        if not ALSA_AVAILABLE:
-            self._error_message = "Install pyalsaaudio"
-            return
-
-        self._stop_event = threading.Event()
-        self._capture_thread = threading.Thread(target=self._capture_loop, name="SpectrumLoopback", daemon=True)
-        self._capture_thread.start()
-        self._status_message = "Connecting..."
-        self._error_message = None
-
-    # 停止捕获线程
-    def _stop_capture(self):
-        if self._stop_event:
-            self._stop_event.set()
-
-        if self._capture_thread:
-            self._capture_thread.join(timeout=1.0)
-
-        self._capture_thread = None
-        self._stop_event = None
-        self._sample_buffer = np.zeros(0, dtype=np.float32)
-        self._device_label = None
-
-    # 捕获循环
-    def _capture_loop(self):
-        pcm = None
-
-        try:
-            pcm = self._open_capture_device()
-            if pcm is None:
-                return
-
-            while self._stop_event and not self._stop_event.is_set():
-                try:
-                    length, data = pcm.read()
-                except alsaaudio.ALSAAudioError as exc:  # type: ignore[attr-defined]
-                    LOGGER.error(f"[spectrum] ALSA read error: {exc}")
-                    self._error_message = "Loopback error"
-                    time.sleep(0.5)
-                    continue
-
-                if length > 0:
-                    self._consume_audio(data)
-                else:
-                    time.sleep(0.005)
-
-        except Exception as exc:
-            LOGGER.error(f"[spectrum] capture thread crashed: {exc}", exc_info=True)
-            self._error_message = "Capture failed"
-        finally:
-            if pcm:
-                try:
-                    pcm.close()
-                except Exception:
-                    pass
-
-    # 查找候选的音频设备
-    def _candidate_devices(self):
-        candidates = []
-
-        def _add(dev):
-            if dev and dev not in candidates:
-                candidates.append(dev)
-
-        if self._device_hint:
-            _add(self._device_hint)
-
-        for name in self.LOOPBACK_CANDIDATES:
-            _add(name)
-
-        try:
-            card_names = alsaaudio.cards()
-            LOGGER.debug(f"[spectrum] ALSA cards: {card_names}")
-            for card_index, card_name in enumerate(card_names):
-                base = f"hw:{card_index}"
-                plug = f"plughw:{card_index}"
-                _add(f"{base},0")
-                _add(f"{plug},0")
-                _add(f"{base},1")
-                _add(f"{plug},1")
-                if "loopback" in card_name.lower():
-                    _add(card_name)
-        except Exception as exc:
-            LOGGER.warning(f"[spectrum] failed to enumerate ALSA cards: {exc}")
-
-        try:
-            pcm_names = alsaaudio.pcms(alsaaudio.PCM_CAPTURE)
-            LOGGER.debug(f"[spectrum] ALSA capture PCMs: {pcm_names}")
-            for pcm_name in pcm_names:
-                _add(pcm_name)
-        except Exception as exc:
-            LOGGER.warning(f"[spectrum] failed to list capture PCMs: {exc}")
-
-        return candidates
-
-    # 打开音频捕获设备
-    def _open_capture_device(self):
-        for device in self._candidate_devices():
-            try:
-                pcm = alsaaudio.PCM(
-                    type=alsaaudio.PCM_CAPTURE,
-                    mode=alsaaudio.PCM_NONBLOCK,
-                    device=device,
-                )
-                pcm.setchannels(self.channels)
-                pcm.setrate(self.sample_rate)
-                pcm.setformat(alsaaudio.PCM_FORMAT_S16_LE)
-                pcm.setperiodsize(self.chunk_size)
-
-                self._device_label = device
-                # self._status_message = f"{device} {self.sample_rate // 1000}kHz"
-                self._status_message = "Capturing"
-                LOGGER.info(f"[spectrum] capturing loopback from {device}")
-                return pcm
-            except alsaaudio.ALSAAudioError as exc:  # type: ignore[attr-defined]
-                LOGGER.warning(f"[spectrum] failed to open {device}: {exc}")
-                continue
-
-        self._error_message = "Loopback missing"
-        LOGGER.error(
-            "[spectrum] no loopback capture device available. "
-            "Set MUSPI_SPECTRUM_DEVICE or edit plugins/spectrum/config.json"
-        )
-        return None
-
-    # 处理捕获的音频数据
-    def _consume_audio(self, raw_data: bytes):
-        samples = np.frombuffer(raw_data, dtype=np.int16)
-
-        if self.channels > 1:
-            remainder = samples.size % self.channels
-            if remainder:
-                samples = samples[:-remainder]
-
-            if samples.size == 0:
-                return
-
-            samples = samples.reshape(-1, self.channels).mean(axis=1)
-
-        samples = samples.astype(np.float32) / 32768.0
-
-        if self._sample_buffer.size == 0:
-            self._sample_buffer = samples
-        else:
-            self._sample_buffer = np.concatenate((self._sample_buffer, samples))
-
-        while self._sample_buffer.size >= self.fft_size:
-            frame = self._sample_buffer[: self.fft_size]
-            self._sample_buffer = self._sample_buffer[self._hop_size :]
-            self._update_levels(frame)
+    # 按需分析最新窗口
+    def _analyse(self, now):
+        # 帧间隔有抖动，留出四分之一间隔的余量，避免 60 fps 下 30 次/秒 退化为 20 次/秒
+        if self._analysis_interval and now - self._last_fft_ts < self._analysis_interval * 0.75:
+            return False
+
+        audio = self._audio
+        if audio is None:
+            return False
+        end = audio.written
+        if end == self._analysed_end:
+            audio.touch()  # 没有新数据，仍需保持采集运行
+            return False
+        frame = audio.window(self.fft_size, end)
+        if frame is None:
+            return False
+        # 采集线程会继续写入，立即读取；容量保证写入一个 period 不会覆盖该窗口
+        if self._mono is not None:
+            frame = np.add(frame[:, 0], frame[:, 1], out=self._mono)
+            frame *= 0.5
+        peak_value = max(float(frame.max()), -float(frame.min()))
+        magnitude = self._fft.magnitude(frame)
+        self._analysed_end = end
+
+        dt = min(now - self._last_fft_ts, 0.5) if self._last_fft_ts else 1.0 / self._hop_rate
+        self._last_fft_ts = now
+        self._update_levels(magnitude, peak_value, now, dt)
+        return True
 
     # 更新频谱级别
-    def _update_levels(self, frame: np.ndarray):
-        if frame.size != self.fft_size:
-            return
+    def _update_levels(self, magnitude: np.ndarray, peak_value: float, now: float, dt: float):
+        bars = self._band_reducer(magnitude)
+        if self._bar_order is not None:
+            bars = np.take(bars.ravel(), self._bar_order, out=self._levels)
 
-        windowed = frame * self._window
-        fft_result = np.fft.rfft(windowed)
-        magnitude = np.abs(fft_result) / (self.fft_size / 2.0)
-        magnitude = np.maximum(magnitude, 1e-7)
-        spectrum_db = 20 * np.log10(magnitude) + self._gain_db
-
-        bars = self._aggregate_bars(spectrum_db)
-
-        peak_value = float(np.max(np.abs(frame)))
         bar_peak = float(np.max(bars)) if bars.size else 0.0
         
         # LOGGER.info(f"[spectrum] peak_value: {peak_value} bar_peak: {bar_peak}")
-        now = time.time()
         silent = False
 
         if peak_value > self._signal_threshold or bar_peak > self._bar_signal_threshold:
@@ -386,55 +283,65 @@ class spectrum(DisplayPlugin):
                 silent = True
 
         if silent:
-            bars = np.zeros_like(bars)
-
-        with self._bars_lock:
-            current = self._bars
-            diff = bars - current
-            smoothing = np.where(diff >= 0, self._rise_smoothing, self._decay_smoothing)
-            self._bars = current + smoothing * diff
-
-            decayed = np.maximum(self._peaks - self._peak_decay, 0.0)
-            self._peaks = np.maximum(bars, decayed)
-            self._avg_level = float(np.mean(self._bars))
-            self._last_fft_ts = time.time()
-
-    # 聚合频谱数据到柱状图
-    def _aggregate_bars(self, spectrum_db: np.ndarray):
-        values = np.zeros(self._bar_count, dtype=np.float32)
-
-        for idx in range(self._bar_count):
-            start = self._bin_edges[idx]
-            end = self._bin_edges[idx + 1]
-            start = min(start, len(spectrum_db) - 1)
-            end = min(max(end, start + 1), len(spectrum_db))
-
-            segment = spectrum_db[start:end]
-            if segment.size == 0:
-                level = spectrum_db[start]
-            else:
-                level = float(np.max(segment))
-
-            norm = (level - self._db_floor) / (self._db_ceiling - self._db_floor)
-            values[idx] = np.clip(norm, 0.0, 1.0)
-
-        return values
+            bars.fill(0.0)
+
+        if self._waterfall is not None:
+            levels = self._waterfall_levels
+            np.power(bars, self._bar_gamma, out=levels)
+            self._waterfall.push(levels)
+
+        # 原地平滑：上升和下降使用不同系数，按经过的 hop 数换算
+        hops = dt * self._hop_rate
+        rise = 1.0 - (1.0 - self._rise_smoothing) ** hops
+        decay = 1.0 - (1.0 - self._decay_smoothing) ** hops
+        current = self._bars
+        np.copyto(self._prev_bars, current)
+        smoothing = self._smoothing
+        np.greater_equal(bars, current, out=smoothing)
+        smoothing *= rise - decay
+        smoothing += decay
+        diff = self._diff
+        np.subtract(bars, current, out=diff)
+        diff *= smoothing
+        current += diff
+
+        self._peaks -= self._peak_decay * hops
+        np.maximum(self._peaks, bars, out=self._peaks)
+        np.maximum(self._peaks, 0.0, out=self._peaks)
+        self._avg_level = float(np.mean(current))
+
+    # 当前显示的频谱条：按分析间隔在两次分析结果之间插值
+    def _current_bars(self, now):
+        if not self._analysis_interval:
+            return self._bars
+        alpha = min(1.0, (now - self._last_fft_ts) / self._analysis_interval)
+        out = self._display_bars
+        np.subtract(self._bars, self._prev_bars, out=out)
+        out *= alpha
+        out += self._prev_bars
+        return out
 
     # 获取当前状态文本
     def _get_status_text(self):
-        if not ALSA_AVAILABLE:
-            return "Install pyalsaaudio"
-
-        if self._error_message:
-            return self._error_message
+        tap = self._tap
+        if tap.error_message or not tap.capturing:
+            return tap.status
 
-        if self._capture_thread is None:
-            return "Wait For Thread"
-
-        if time.time() - self._last_signal_ts > 2.0:
+        if self.clock.time() - self._last_signal_ts > 2.0:
             return "On Mute"
 
-        return self._status_message or "Loopback"
+        return tap.status
+
+    # 按 gamma 缩放到像素高度（截断取整）
+    def _scale_heights(self, values, out):
+        scaled = self._scaled
+        if self._bar_gamma != 1.0:
+            np.power(values, self._bar_gamma, out=scaled)
+        else:
+            np.copyto(scaled, values)
+        scaled *= self._max_height
+        np.copyto(out, scaled, casting="unsafe")
+        return out
 
     # 渲染频谱显示
     def render(self):
@@ -442,7 +349,7 @@ class spectrum(DisplayPlugin):
 
         status_text = self._get_status_text()
         
-        if time.time() - self._last_signal_ts > 2.0:
+        if self.clock.time() - self._last_signal_ts > 2.0:
             # On Mute
             draw_scroll_text(draw, "₽", (0, 0), font=self.font_status)
         else:
@@ -451,38 +358,24 @@ class spectrum(DisplayPlugin):
             
         draw_scroll_text(draw, status_text, (28, 0), width=90, font=self.font_status, align="center")
         # draw_scroll_text(draw, "R", (123, 0), font=self.font_status)
-            
-        top = min(self.height - 8, 7)
-        baseline = self.height - 2
-        max_height = max(4, baseline - top)
-
-        with self._bars_lock:
-            bars = self._bars.copy()
-            peaks = self._peaks.copy()
-            avg_level = self._avg_level
-
-        gamma = self._bar_gamma
-        apply_gamma = gamma != 1.0
-
-        for idx, value in enumerate(bars):
-            scaled_value = value**gamma if apply_gamma else value
-            bar_height = int(scaled_value * max_height)
-            left = self._bars_offset + idx * (self._bar_width + self._bar_spacing)
-            right = left + self._bar_width - 1
-            top_y = baseline - bar_height
-            draw.rectangle((left, top_y, right, baseline), fill=255)
-
-            scaled_peak = peaks[idx]**gamma if apply_gamma else peaks[idx]
-            peak_height = int(scaled_peak * max_height)
-            peak_y = max(top, baseline - peak_height)
-            draw.line((left, peak_y, right, peak_y), fill=0 if peak_y == baseline else 255)
+
+        now = self.clock.time()
+        self._analyse(now)
+        if self._waterfall is not None:
+            self.image.paste(self._waterfall.image(), (0, self._waterfall_top))
+            return
+
+        # 条高（含基线一行）和峰值线到基线的距离；基线随后被底部的电平线覆盖
+        lengths = self._scale_heights(self._current_bars(now), self._bar_lengths)
+        lengths += 1
+        marks = self._scale_heights(self._peaks, self._peak_marks)
+        np.minimum(marks, self._baseline - self._bars_top, out=marks)
+        draw.bitmap((0, self._baseline - self._max_height), self._bar_mask.image(lengths, marks), fill=255)
 
         draw.rectangle((0, self.height - 2, self.width, self.height - 2), fill=255)
-        scaled_avg = avg_level**gamma if apply_gamma else avg_level
+        avg_level = self._avg_level
+        scaled_avg = avg_level**self._bar_gamma
         level_width = int((self.width - 4) * np.clip(scaled_avg, 0.0, 1.0))
         
         if level_width > 0:
             draw.rectangle((0, self.height - 2, 2 + level_width, self.height - 1), fill=255)
-    
-    def __del__(self):
-        self._stop_capture()
@@ -81,7 +81,7 @@ class xiaozhi(DisplayPlugin):
         self.animations = {}  # 存储所有动画状态
         self.anim = Animation(0.3)
 
-        self.sleep_time = time.time()
+        self.sleep_time = self.clock.time()
         self.is_sleeping = False
 
         self.robot = RobotEmotion()
@@ -123,6 +123,9 @@ class xiaozhi(DisplayPlugin):
                 
             self.mqtt_info = response_json['mqtt']
             self._create_mqtt_client(self.mqtt_info)
+        except requests.ConnectionError as e:
+            LOGGER.error(f"Failed to get OTA version, network unreachable: {e}")
+            self.manager.overlay_manager.show_network(False)
         except Exception as e:
             LOGGER.error(f"Failed to get OTA version and setup MQTT: {e}")
            
@@ -143,10 +146,7 @@ class xiaozhi(DisplayPlugin):
         self.text_area.append_text("你好.")
         self.text_area.append_text("我是小派.")
         self.text_area.append_text("---")
-        threading.Timer(
-            3,
-            lambda: self._close_chatbox()
-        ).start()
+        self.manager.scheduler.call_later(3, self._close_chatbox, group=self.name)
 
     def _on_connect(self, client, userdata, flags, rs, pr):
         LOGGER.info(f"connect to mqtt server at {self.mqtt_info['endpoint']}")
@@ -154,7 +154,7 @@ class xiaozhi(DisplayPlugin):
     def _on_message(self, client, userdata, message):
         msg = json.loads(message.payload)
         LOGGER.info(f"recv: {msg}")
-        self.sleep_time = time.time()  # reset sleep time
+        self.sleep_time = self.clock.time()  # reset sleep time
         
         if msg['type'] == 'hello':
             self._receive_msg = msg
@@ -434,14 +434,11 @@ class xiaozhi(DisplayPlugin):
    
     def render(self):
         draw = self.canvas
-        current_time = time.time()
+        current_time = self.clock.time()
         
         if current_time - self.sleep_time > SLEEP_TIMEOUT:
             self._sleep()
         
-        # 更新所有动画
-        self.anim.update()
-        
         robot = self.robot.update()
         # 计算居中位置
         x = (self.width - robot.width) // 2 + self.robot_offset_x
@@ -455,15 +452,12 @@ class xiaozhi(DisplayPlugin):
         
     def _wakeup(self):
         if self.is_sleeping:
-            self.sleep_time = time.time() #reset sleep time
+            self.sleep_time = self.clock.time() #reset sleep time
             self.is_sleeping = False
             self.robot.set_emotion("angry")
             
             # 设置表情切换计时器
-            threading.Timer(
-                3,
-                lambda: self.robot.set_emotion("neutral")
-            ).start()
+            self.manager.scheduler.call_later(3, self.robot.set_emotion, "neutral", group=self.name)
             
         
     def _sleep(self):
@@ -478,7 +472,7 @@ class xiaozhi(DisplayPlugin):
             # 锁屏时降低帧率，减少屏幕刷新，防止烧屏
             self._fps = 1.0  # 降低到 1 FPS
             # 停止所有动画（清空动画列表）
-            self.anim.animation_list.clear()
+            self.anim.clear()
             # 重置动画偏移
             self.robot_offset_x = 0
             self.chatbox_offset_x = 0
@@ -497,7 +491,7 @@ class xiaozhi(DisplayPlugin):
     def key_callback(self, evt):
         # LOGGER.info(f"xiaozhi key detected: {evt.code}")
         
-        km = self.keymap
+        km = self.keymap.event(evt)
         self._wakeup()
       
         # select 键 = 开始语音输入
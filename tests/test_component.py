@@ -0,0 +1,17 @@
+from ui import component
+from until.clock import SimulatedClock, get_clock, set_clock
+
+
+def test_scroll_starts_on_the_installed_clock():
+    previous = get_clock()
+    try:
+        clock = set_clock(SimulatedClock(start=1000.0))
+        assert component._get_step_time() == 0
+        clock.advance(8.0)
+        assert component._get_step_time() == 100
+
+        # 换用新时钟后从头滚动
+        set_clock(SimulatedClock(start=5.0))
+        assert component._get_step_time() == 0
+    finally:
+        set_clock(previous)
@@ -0,0 +1,57 @@
+from evdev import InputEvent, ecodes
+
+from until.gesture import GestureEngine
+from until.scheduler import Scheduler
+
+ACTION = ("nav", "up")
+
+
+class FakeKeymap:
+    longpress_threshold = 1.0
+
+    def actions(self, evt):
+        return (ACTION,)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_engine():
+    clock = FakeClock()
+    engine = GestureEngine(keymap=FakeKeymap(), scheduler=Scheduler(clock=clock), clock=clock)
+    return engine, clock
+
+
+def tap(engine, clock, at):
+    clock.now = at
+    engine.feed(InputEvent(0, 0, ecodes.EV_KEY, ecodes.KEY_UP, 1))
+    clock.now = at + 0.02
+    engine.feed(InputEvent(0, 0, ecodes.EV_KEY, ecodes.KEY_UP, 0))
+
+
+def test_triple_tap_fires_one_double_tap():
+    engine, clock = make_engine()
+    fired = []
+    engine.on("double_tap", ACTION, fired.append)
+
+    for at in (0.0, 0.1, 0.2):
+        tap(engine, clock, at)
+
+    assert len(fired) == 1
+    assert fired[0].time == 0.1
+
+
+def test_fourth_tap_starts_a_new_double_tap():
+    engine, clock = make_engine()
+    fired = []
+    engine.on("double_tap", ACTION, fired.append)
+
+    for at in (0.0, 0.1, 0.2, 0.3):
+        tap(engine, clock, at)
+
+    assert [g.time for g in fired] == [0.1, 0.3]
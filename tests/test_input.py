@@ -0,0 +1,57 @@
+from evdev import InputEvent, ecodes
+
+from until.device.input import KeyListener
+from until.latency import LatencyProbe
+
+
+def make_listener():
+    listener = KeyListener()
+    listener.listen((ecodes.EV_KEY, ecodes.KEY_A))
+    listener.probe = LatencyProbe(enabled=True, clock=lambda: 100.0, report_every=0)
+    return listener
+
+
+def key(value, sec=99):
+    return InputEvent(sec, 0, ecodes.EV_KEY, ecodes.KEY_A, value)
+
+
+def test_event_with_direct_and_queued_callbacks_is_recorded_once():
+    listener = make_listener()
+    calls = []
+    listener.on(lambda evt: calls.append("direct"), direct=True)
+    listener.on(lambda evt: calls.append("queued"))
+
+    listener.inject([key(1)])
+    assert listener.probe.dispatch.samples == []  # 主线程回调还没执行
+    listener.drain()
+
+    assert calls == ["direct", "queued"]
+    assert listener.probe.dispatch.samples == [1000.0]
+
+
+def test_direct_only_event_is_done_on_listener_thread():
+    listener = make_listener()
+    listener.on(lambda evt: None, direct=True)
+
+    listener.inject([key(1)])
+    assert len(listener.probe.dispatch.samples) == 1
+    listener.drain()
+    assert len(listener.probe.dispatch.samples) == 1
+
+
+def test_coalesced_repeats_keep_their_tags():
+    listener = make_listener()
+    calls = []
+
+    def callback(evt):
+        calls.append(evt.value)
+        listener.probe.label("nav")
+
+    listener.on(callback)
+    listener.inject([key(2, sec=97), key(2, sec=98), key(2, sec=99)])
+    listener.drain()
+
+    assert calls == [2]
+    probe = listener.probe
+    assert sorted(probe.dispatch.samples) == [1000.0, 2000.0, 3000.0]
+    assert [tag.label for tag in probe._pending] == ["nav", "nav", "nav"]
@@ -1,41 +1,119 @@
-import time
 import math
 
+from until.clock import get_clock, now as clock_now
+
+
+class Tween:
+    '''
+    单个补间动画
+
+    使用 __slots__ 存储状态，避免每个动画一个 dict；
+    value() 只做数值计算，不产生任何分配
+    '''
+    __slots__ = ("start_value", "current", "target", "duration", "start_time", "operator", "obj", "attr")
+
+    def __init__(self, current=0, start_time=None, duration=0.3, operator=None):
+        self.start_value = current
+        self.current = current
+        self.target = 0
+        self.duration = duration
+        self.start_time = start_time
+        self.operator = operator
+        self.obj = None  # 存储对象引用
+        self.attr = None  # 存储属性名
+
+    def value(self, now, target, duration, operator):
+        '''
+        计算 now 时刻的动画值
+        动画结束时 start_time 置 None，并返回 target
+        '''
+        elapsed = now - self.start_time
+        if elapsed < 0:
+            elapsed = 0
+        if duration > 0 and elapsed <= duration:
+            progress = operator(elapsed / duration)
+            start = self.start_value
+            self.current = start + (target - start) * progress
+            return self.current
+
+        self.start_time = None
+        self.current = target
+        return target
+
+
 class Animation:
-    def __init__(self,duration=0.3):
+    # 由 DisplayManager 每帧调用 Animation.tick() 统一驱动
+    _ticking = set()  # 含有对象绑定动画的实例
+
+    def __init__(self, duration=0.3, lut=False):
+        '''
+        duration: 默认动画时长
+        lut: 是否使用预计算的缓动查找表
+        '''
         self.animation_list = {}
         self.default_duration = duration
-        self.default_operator = Operator.ease_in_quad
+        self.lut = lut
+        self.default_operator = self._resolve_operator(Operator.ease_in_quad)
         self.direction = 1  # 1 for forward, -1 for backward
+        self._bound = {}  # 绑定了对象属性的动画 {id: Tween}
+
+    @classmethod
+    def tick(cls, now=None):
+        '''
+        每帧驱动一次所有绑定对象属性的动画
+        now: 帧时间戳，默认取帧时钟
+        '''
+        if now is None:
+            now = get_clock().time()
+        if cls._ticking:
+            for anim in tuple(cls._ticking):
+                anim._update_bound(now)
+
+    @staticmethod
+    def now():
+        '''当前帧时间戳（单调时间）'''
+        return clock_now()
+
+    def _resolve_operator(self, operator):
+        if operator is None:
+            return self.default_operator
+        if self.lut and not isinstance(operator, EasingTable):
+            return Operator.table(operator)
+        return operator
 
     def reset(self,id,current=0):
         '''
         重置动画
         id: 动画id
         '''
-        self.animation_list[id] = {
-            "current": current,
-            "target": 0,
-            "duration": self.default_duration,
-            "start_time": time.time(),
-            "obj": None,  # 存储对象引用
-            "attr": None  # 存储属性名
-        }
+        self._bound.pop(id, None)
+        self.animation_list[id] = Tween(current, Animation.now(), self.default_duration, self.default_operator)
 
     def update(self):
         '''
         更新动画
         '''
-        for id in self.animation_list:
-            anim = self.animation_list[id]
-            if anim["obj"] is None or anim["attr"] is None:
-                continue
-            if self.is_running(id):
-                # 计算动画结果
-                result = self.run(id, anim["target"], anim["duration"], anim["operator"])
-                # 设置新值
-                setattr(anim["obj"], anim["attr"], result)
-    
+        self._update_bound(Animation.now())
+
+    def _update_bound(self, now):
+        bound = self._bound
+        finished = None
+        for id, anim in bound.items():
+            result = anim.value(now, anim.target, anim.duration, anim.operator)
+            setattr(anim.obj, anim.attr, result)
+            if anim.start_time is None:
+                if finished is None:
+                    finished = []
+                finished.append(id)
+
+        if finished:
+            for id in finished:
+                del bound[id]
+                self.animation_list.pop(id, None)
+
+        if not bound:
+            Animation._ticking.discard(self)
+
     def start(self, id, obj, attr, target, duration=None, operator=None):
         '''
         开始动画
@@ -45,15 +123,19 @@ class Animation:
         target: 目标值
         duration: 动画时长
         '''
-        self.reset(id)
-        anim = self.animation_list[id]
-        anim["obj"] = obj
-        anim["attr"] = attr
-        anim["target"] = target
-        anim["duration"] = duration if duration is not None else self.default_duration
-        anim["current"] = getattr(obj, attr)
-        anim["operator"] = operator if operator is not None else self.default_operator
-        
+        anim = Tween(
+            getattr(obj, attr),
+            Animation.now(),
+            duration if duration is not None else self.default_duration,
+            self._resolve_operator(operator),
+        )
+        anim.obj = obj
+        anim.attr = attr
+        anim.target = target
+        self.animation_list[id] = anim
+        self._bound[id] = anim
+        Animation._ticking.add(self)
+
     def run(self,id,target,duration = None, operator=None):
         '''
         运行动画
@@ -61,39 +143,66 @@ class Animation:
         target: 目标值
         duration: 动画时长
         '''
+        anim = self.animation_list.get(id)
+        if anim is None or anim.start_time is None:
+            return target
+
         if duration is None:
             duration = self.default_duration
-        
-        if self.animation_list[id]["start_time"] > 0:
-            elapsed = time.time() - self.animation_list[id]["start_time"]
-            if elapsed <= duration:
-                current = self.animation_list[id]["current"]
-                progress = elapsed / duration
-                
-                # 使用动画算子
-                if operator is None:
-                    operator = self.default_operator
-                    
-                progress = operator(progress) 
-
-                current = current + (target - current) * progress
-                self.animation_list[id]["current"] = current
-                return current
-            else:
-                self.animation_list[id]["start_time"] = 0
-                return target
-        
-        return target
+
+        result = anim.value(Animation.now(), target, duration, self._resolve_operator(operator))
+        if anim.start_time is None and id not in self._bound:
+            # 结束的动画直接移除，is_running() 对不存在的 id 返回 False
+            del self.animation_list[id]
+        return result
 
     def is_running(self,id):
         '''
         判断动画是否正在运行
         id: 动画id
         '''
-        return self.animation_list[id]["start_time"] > 0
+        anim = self.animation_list.get(id)
+        return anim is not None and anim.start_time is not None
+
+    def clear(self):
+        '''停止并移除所有动画'''
+        self.animation_list.clear()
+        self._bound.clear()
+        Animation._ticking.discard(self)
+
+
+class EasingTable:
+    '''
+    预计算的缓动查找表
+    在 [0, 1] 上均匀采样缓动函数，查询时取最近的采样点
+    '''
+    __slots__ = ("table", "scale", "last")
+
+    def __init__(self, operator, size=1024):
+        self.table = tuple(operator(i / (size - 1)) for i in range(size))
+        self.scale = size - 1
+        self.last = self.table[-1]
+
+    def __call__(self, t):
+        if t >= 1:
+            return self.last
+        if t <= 0:
+            return self.table[0]
+        return self.table[int(t * self.scale + 0.5)]
+
+
+_EASING_TABLES = {}
 
 
 class Operator:
+    def table(operator, size=1024):
+        """获取缓动函数的查找表（按函数和尺寸缓存）"""
+        key = (operator, size)
+        table = _EASING_TABLES.get(key)
+        if table is None:
+            table = _EASING_TABLES[key] = EasingTable(operator, size)
+        return table
+
     def ease_linear(t):
         """线性缓动"""
         return t
@@ -171,7 +280,7 @@ class Operator:
             t -= 2.625 / d1
             return n1 * t * t + 0.984375
 
-    def ease_in_out_bounce(self, t):
+    def ease_in_out_bounce(t):
         """弹跳缓入缓出"""
         if t < 0.5:
             return Operator.ease_in_bounce(t * 2) / 2
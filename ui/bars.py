@@ -0,0 +1,78 @@
+import numpy as np
+from PIL import Image
+
+
+class BarMask:
+    """
+    竖条图的 1 位掩码（频谱条、VU 表）
+
+    每个像素预先计算到基线（或中线）的距离，各条的长度按像素列展开后与距离网格做一次广播比较，
+    得到 uint8 掩码，np.packbits 打包后一次 Image.frombuffer 生成图像，不逐条绘制矩形。
+    """
+
+    def __init__(self, width, height, lefts, bar_width, anchor="bottom"):
+        """
+        Args:
+            width: 图像宽度
+            height: 图像高度
+            lefts: 每个条的左边界（像素）
+            bar_width: 条的宽度（像素）
+            anchor: "bottom" 条从底部向上；"center" 条从中线向上下对称延伸（VU 表）
+        """
+        self.width = width
+        self.height = height
+        self.count = len(lefts)
+
+        # 每个像素列所属的条，条之间的空隙指向末尾恒为 0 的一项
+        columns = np.full(width, self.count, dtype=np.intp)
+        for idx, left in enumerate(lefts):
+            columns[max(0, left):max(0, left + bar_width)] = idx
+        self._columns = columns
+        self._lengths = np.zeros(self.count + 1, dtype=np.int32)
+        self._marks = np.full(self.count + 1, -1, dtype=np.int32)
+        self._column_lengths = np.zeros(width, dtype=np.int32)
+        self._column_marks = np.zeros(width, dtype=np.int32)
+
+        rows = np.arange(height, dtype=np.int32)[:, None]
+        if anchor == "center":
+            self._distance = np.abs(rows - height // 2)
+        else:
+            self._distance = height - 1 - rows
+        self._distance = np.ascontiguousarray(np.broadcast_to(self._distance, (height, width)))
+        self._mask = np.zeros((height, width), dtype=np.uint8)
+        self._hit = np.zeros((height, width), dtype=bool)
+
+    def fill(self, lengths, marks=None):
+        """
+        按条的长度生成掩码
+
+        Args:
+            lengths: 每个条点亮的像素数（到基线或中线的距离小于该值的像素）
+            marks: 每个条额外点亮的一行到基线或中线的距离（如峰值线），负数不标记
+
+        Returns:
+            np.ndarray: (height, width) uint8 掩码，下次调用时覆盖
+        """
+        self._lengths[:-1] = lengths
+        np.take(self._lengths, self._columns, out=self._column_lengths)
+        mask = self._mask
+        np.less(self._distance, self._column_lengths, out=mask)
+        if marks is not None:
+            self._marks[:-1] = marks
+            np.take(self._marks, self._columns, out=self._column_marks)
+            np.equal(self._distance, self._column_marks, out=self._hit)
+            mask |= self._hit
+        return mask
+
+    def image(self, lengths=None, marks=None):
+        """
+        Args:
+            lengths: 不为 None 时先调用 fill()
+
+        Returns:
+            Image: 1 位图像
+        """
+        if lengths is not None:
+            self.fill(lengths, marks)
+        packed = np.packbits(self._mask, axis=1)
+        return Image.frombuffer("1", (self.width, self.height), packed, "raw", "1", 0, 1)
@@ -1,8 +1,12 @@
 import random
-import time
 from PIL import Image, ImageDraw
 
-SCROLL_START_TIME = time.time()
+from until.clock import get_clock, now as clock_now
+from ui.bars import BarMask
+
+# 滚动起点在首次绘制时按当前时钟取值，set_clock() 换用其他时钟（如 SimulatedClock）后重新取值
+_scroll_start_time = None
+_scroll_clock = None
 SCROLL_SPEED = 0.2  # speed parameter, 1.0, means 1 unit per second
 STOP_FRAMES = 32  # 停顿的帧数
 
@@ -11,23 +15,34 @@ VU_FPS = 12  # VU 动画更新频率
 VU_FRAME_INTERVAL = 1.0 / VU_FPS  # 每帧间隔时间
 _last_vu_update_time = 0
 _cached_vu_heights = [0, 0, 0]  # 缓存的柱状图高度
+VU_MAX_HEIGHT = 12
+# 三个柱从中线向上下对称延伸，宽 2 像素、间隔 4 像素，整体作为一个掩码绘制
+_vu_mask = BarMask(10, 2 * VU_MAX_HEIGHT + 1, [0, 4, 8], 2, anchor="center")
+_vu_image = None
+_vu_image_heights = None
 
 # 绘制左侧 VU 效果（32x32 区域）
-def draw_vu(draw, volume_level = 0.5, offset_x=0, center_y=14):
-    global _last_vu_update_time, _cached_vu_heights
+# levels 为共享音频采集的读数（until.device.audio_tap.AudioLevels）时显示真实电平：
+# 左声道 VU、峰值、右声道 VU；为 None 时按 volume_level 模拟
+def draw_vu(draw, volume_level = 0.5, offset_x=0, center_y=14, now=None, levels=None):
+    global _last_vu_update_time, _cached_vu_heights, _vu_image, _vu_image_heights
 
-    bar_width = 1
-    spacing = 3
-    num_bars = 3   # 增加到4个柱状图
-    max_height = 12
+    num_bars = 3
+    max_height = VU_MAX_HEIGHT
 
     # 每个柱状图的高度系数，让它们有明显差异
     bar_coefficients = [0.5, 0.8, 0.65]
 
-    current_time = time.time()
+    current_time = clock_now() if now is None else now
+
+    if levels is not None:
+        # VU 弹道已在采集线程中计算，每帧直接使用
+        _cached_vu_heights[0] = int(max_height * levels.vu[0])
+        _cached_vu_heights[1] = int(max_height * max(levels.peak))
+        _cached_vu_heights[2] = int(max_height * levels.vu[-1])
 
     # 检查是否需要更新 VU 高度（8fps 控制）
-    if current_time - _last_vu_update_time >= VU_FRAME_INTERVAL:
+    elif current_time - _last_vu_update_time >= VU_FRAME_INTERVAL:
         _last_vu_update_time = current_time
 
         # 更新缓存的柱状图高度
@@ -42,28 +57,28 @@ def draw_vu(draw, volume_level = 0.5, offset_x=0, center_y=14):
 
             _cached_vu_heights[i] = bar_height
 
-    # 使用缓存的高度绘制柱状图
-    for i in range(num_bars):
-        bar_height = _cached_vu_heights[i]
-        
-        x = 4 + i * (bar_width + spacing) + offset_x
-        
-        # 绘制上半部分
-        draw.rectangle((x, center_y - bar_height, 
-                       x + bar_width, center_y), fill=255)
-        
-        # 绘制下半部分
-        draw.rectangle((x, center_y, 
-                       x + bar_width, center_y + bar_height), fill=255)
+    # 使用缓存的高度绘制柱状图：中线向上下各 bar_height 行，高度不变时复用图像
+    heights = tuple(_cached_vu_heights)
+    if heights != _vu_image_heights:
+        _vu_image = _vu_mask.image([h + 1 for h in heights])
+        _vu_image_heights = heights
+    draw.bitmap((4 + offset_x, center_y - max_height), _vu_image, fill=255)
 
-def _get_step_time():
+def _get_step_time(now=None):
     """get the current step time, adjust according to the speed parameter"""
-    elapsed = time.time() - SCROLL_START_TIME
+    global _scroll_start_time, _scroll_clock
+    clock = get_clock()
+    if now is None:
+        now = clock.time()
+    if clock is not _scroll_clock:
+        _scroll_clock = clock
+        _scroll_start_time = now
+    elapsed = now - _scroll_start_time
     return int(elapsed * SCROLL_SPEED * 1000 / 16)  # 16ms is a unit
 
 
 # 右侧文字滚动
-def draw_scroll_text(draw, text, position=(32, 0), width=None, font=None, align="left"):
+def draw_scroll_text(draw, text, position=(32, 0), width=None, font=None, align="left", now=None):
     x, y = position
     text = f"{text} "
     bbox = font.getbbox(text)
@@ -96,7 +111,7 @@ def draw_scroll_text(draw, text, position=(32, 0), width=None, font=None, align=
         
         # 计算完整的来回滚动周期（包括停顿时间）
         full_cycle = max_scroll * 2 + STOP_FRAMES * 2  # 来回滚动的总距离加上停顿时间
-        step = _get_step_time()
+        step = _get_step_time(now)
         current_pos = step % full_cycle
         
         # 确定滚动方向和位置
@@ -1,8 +1,9 @@
 from PIL import Image, ImageDraw
 import random
-import time
 import math
 from ui.animation import Animation
+from until.clock import now as clock_now
+from until.scheduler import Scheduler
 from ui.matrix import Matrix
 
 from .emotion_pattern import PATTERN
@@ -92,11 +93,11 @@ class RobotEmotion:
         self.mask_rotation = [0,0]
         
         # 初始化动画计时器
-        self.last_blink_time = time.time()
+        self.last_blink_time = clock_now()
         self.blink_interval = random.uniform(BLINK_INTERVAL, BLINK_MAX_INTERVAL)
-        self.last_look_around_time = time.time()
+        self.last_look_around_time = clock_now()
         self.look_around_interval = random.uniform(LOOK_AROUND_INTERVAL, LOOK_AROUND_MAX_INTERVAL)
-        self.last_furrowed_time = time.time()
+        self.last_furrowed_time = clock_now()
         self.furrowed_interval = random.uniform(FURROWED_INTERVAL, FURROWED_MAX_INTERVAL)
         
         # 眼睛位置偏移
@@ -113,8 +114,8 @@ class RobotEmotion:
         self.current_emotion = ""
         self.base_emotion = {}
         
-        # 动画队列
-        self.animation_queues = {}
+        # 动画事件调度器，由 update() 驱动，按动画名分组
+        self.scheduler = Scheduler(clock=clock_now)
         self.is_looking_around = False
         self.is_furrowed = False
         
@@ -221,25 +222,22 @@ class RobotEmotion:
     def draw_action(self,img):
         if self.current_emotion == "listening":
             matrix = Matrix()
-            matrix.set_matrix(PATTERN.LISTENING[int((time.time()*2)%len(PATTERN.LISTENING))])
+            matrix.set_matrix(PATTERN.LISTENING[int((clock_now()*2)%len(PATTERN.LISTENING))])
             matrix.new() # create img
             matrix.draw()
-            img.paste(matrix.img, (WIDTH - int(matrix.width * 1.6), int(3 - (time.time()*1.5)%2)))
+            img.paste(matrix.img, (WIDTH - int(matrix.width * 1.6), int(3 - (clock_now()*1.5)%2)))
             
         return img
     
     # 更新表情
-    def update(self):
-        current_time = time.time()
+    def update(self, now=None):
+        current_time = clock_now() if now is None else now
         
         if self.anim.is_running("eye_position_x") or self.anim.is_running("eye_position_y"):
             self.animation_duration = ANIMATION_DURATION #reset duration
                 
         # 处理动画事件
-        for name, queue in self.animation_queues.items():
-            while queue and queue[0][0] <= current_time:
-                _, callback = queue.pop(0)
-                callback()
+        self.scheduler.run_pending(current_time)
         
         # 随机眨眼（所有表情都会眨眼）
         if current_time - self.last_blink_time > self.blink_interval:
@@ -292,9 +290,7 @@ class RobotEmotion:
     # 安排一个动画事件
     def _schedule_animation(self, name, delay, callback):
         """安排一个动画事件"""
-        if name not in self.animation_queues:
-            self.animation_queues[name] = []
-        self.animation_queues[name].append((time.time() + delay, callback))
+        self.scheduler.call_later(delay, callback, group=name)
         # print(f"schedule {name} animation {delay}")
 
     # 重置所有动画状态
@@ -304,13 +300,12 @@ class RobotEmotion:
         self.is_looking_around = False
         self.is_furrowed = False
         
-        # 只保留blink队列，清空其他所有队列
-        blink_queue = self.animation_queues.get("blink", [])
-        self.animation_queues = {"blink": blink_queue}
+        # 只保留blink事件，取消其他所有动画事件
+        self.scheduler.clear(keep=("blink",))
         
         # 重置计时器
-        self.last_look_around_time = time.time()
-        self.last_furrowed_time = time.time()
+        self.last_look_around_time = clock_now()
+        self.last_furrowed_time = clock_now()
 
     # 睁开眼睛，回到基本表情状态
     def open_eyes(self):
@@ -5,6 +5,24 @@ Overlays 覆盖层模块
 
 from ui.overlays.base import Overlay
 from ui.overlays.volume import VolumeOverlay
+from ui.overlays.notification import (
+    NotificationOverlay,
+    TrackOverlay,
+    MuteOverlay,
+    NetworkOverlay,
+    BluetoothOverlay,
+    ErrorOverlay,
+)
 from ui.overlays.manager import OverlayManager
 
-__all__ = ['Overlay', 'VolumeOverlay', 'OverlayManager']
+__all__ = [
+    'Overlay',
+    'VolumeOverlay',
+    'NotificationOverlay',
+    'TrackOverlay',
+    'MuteOverlay',
+    'NetworkOverlay',
+    'BluetoothOverlay',
+    'ErrorOverlay',
+    'OverlayManager',
+]
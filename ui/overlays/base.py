@@ -3,15 +3,35 @@
 所有覆盖层的基础实现
 """
 
-import time
+from collections import OrderedDict
 from PIL import Image, ImageDraw
 from ui.animation import Animation, Operator
 from ui.fonts import Fonts
+from until.clock import now as clock_now
+
+# 已渲染位图缓存 {cache_key: (image, mask)}，内容相同的覆盖层直接复用
+_BITMAP_CACHE = OrderedDict()
+_BITMAP_CACHE_SIZE = 32
+
+_FONTS = None
+
+
+def _get_fonts():
+    """所有覆盖层共享一份字体，避免每次通知都重新加载 ttf"""
+    global _FONTS
+    if _FONTS is None:
+        _FONTS = Fonts()
+    return _FONTS
 
 
 class Overlay:
     """单个覆盖层基类"""
 
+    key = None  # 相同 key 的覆盖层会合并为一个
+    slot = None  # 同一位置同时只显示一个覆盖层，None 表示不限制
+    priority = 0  # 数值越大越优先，可抢占同一 slot 中较低优先级的覆盖层
+    min_interval = 0.0  # 同一 key 两次显示/更新之间的最小间隔（秒）
+
     def __init__(self, width, height, duration=3.0):
         """
         初始化覆盖层
@@ -26,7 +46,8 @@ class Overlay:
         self.duration = duration
         self.image = Image.new("1", (width, height), 0)
         self.draw = ImageDraw.Draw(self.image)
-        self.fonts = Fonts()
+        self.mask = None
+        self._dirty = True  # 内容变化后才重新 render()
 
         # 动画相关
         self.y_offset = -height  # 初始位置在屏幕上方
@@ -34,7 +55,7 @@ class Overlay:
         self.anim.reset("slide", current=self.y_offset)
 
         # 状态管理
-        self.create_time = time.time()
+        self.create_time = clock_now()
         self.is_showing = False
         self.is_hiding = False
         self.is_expired = False
@@ -43,7 +64,7 @@ class Overlay:
         """显示覆盖层（从上方滑入）"""
         self.is_showing = True
         self.is_hiding = False
-        self.create_time = time.time()
+        self.create_time = clock_now()
         # 从上方滑入到顶部 (y=0)
         self.anim.reset("slide", current=self.y_offset)
 
@@ -57,7 +78,7 @@ class Overlay:
     def update(self):
         """更新覆盖层状态"""
         # 检查是否过期
-        if not self.is_hiding and time.time() - self.create_time > self.duration:
+        if not self.is_hiding and clock_now() - self.create_time > self.duration:
             self.hide()
 
         # 更新动画
@@ -72,17 +93,72 @@ class Overlay:
                 self.is_hiding = False
                 self.is_expired = True
 
+    @property
+    def fonts(self):
+        return _get_fonts()
+
+    def merge(self, other):
+        """
+        合并同 key 的新覆盖层内容（子类重写）
+
+        Returns:
+            bool: 内容是否发生变化
+        """
+        return False
+
+    def cache_key(self):
+        """位图缓存 key，None 表示不缓存（子类重写）"""
+        return None
+
+    def invalidate(self):
+        """标记内容已变化，下次 get_image() 时重新渲染"""
+        self._dirty = True
+
     def render(self):
         """渲染覆盖层内容（子类需要重写此方法）"""
         pass
 
+    def render_mask(self, mask):
+        """
+        渲染不透明区域 mask（白色=不透明，黑色=透明）
+        默认只有图像中的白色像素不透明，子类可重写以遮挡底层画面
+
+        Args:
+            mask: mask 图像的 ImageDraw，mask 已用 image 内容初始化
+        """
+        pass
+
     def get_image(self):
-        """获取当前覆盖层图像"""
-        self.image = Image.new("1", (self.width, self.height), 0)
-        self.draw = ImageDraw.Draw(self.image)
-        self.render()
+        """获取当前覆盖层图像（内容未变化时直接返回缓存）"""
+        if self._dirty:
+            key = self.cache_key()
+            cached = _BITMAP_CACHE.get(key) if key is not None else None
+            if cached is not None:
+                _BITMAP_CACHE.move_to_end(key)
+                self.image, self.mask = cached
+            else:
+                if key is not None:
+                    # 缓存中的位图不能被改写，重新分配一张
+                    self.image = Image.new("1", (self.width, self.height), 0)
+                    self.draw = ImageDraw.Draw(self.image)
+                else:
+                    self.draw.rectangle((0, 0, self.width - 1, self.height - 1), fill=0)
+                self.render()
+                self.mask = self.image.copy()
+                self.render_mask(ImageDraw.Draw(self.mask))
+                if key is not None:
+                    _BITMAP_CACHE[key] = (self.image, self.mask)
+                    if len(_BITMAP_CACHE) > _BITMAP_CACHE_SIZE:
+                        _BITMAP_CACHE.popitem(last=False)
+            self._dirty = False
         return self.image
 
+    def get_mask(self):
+        """获取当前覆盖层的 1-bit 不透明 mask"""
+        if self._dirty:
+            self.get_image()
+        return self.mask
+
     def get_y_offset(self):
         """获取当前 Y 轴偏移量"""
         return self.y_offset
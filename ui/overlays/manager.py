@@ -3,7 +3,19 @@
 管理和渲染所有活跃的覆盖层
 """
 
+import heapq
+import itertools
+import threading
+
+from until.clock import now as clock_now
 from ui.overlays.volume import VolumeOverlay
+from ui.overlays.notification import (
+    BluetoothOverlay,
+    ErrorOverlay,
+    MuteOverlay,
+    NetworkOverlay,
+    TrackOverlay,
+)
 
 
 class OverlayManager:
@@ -20,70 +32,112 @@ class OverlayManager:
         self.width = width
         self.height = height
         self.overlays = []  # 当前活跃的覆盖层列表
-        
+
+        # 待显示队列：(-priority, seq, overlay)，可在任意线程中添加
+        self._pending = []
+        self._pending_keys = {}  # key -> 最新的待显示覆盖层，旧的在出队时丢弃
+        self._last_shown = {}  # key -> 上次显示/更新时间，用于限流
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
     def add_overlay(self, overlay):
         """
-        添加覆盖层
+        添加覆盖层（线程安全），在下一次 update() 时显示
+
+        相同 key 的覆盖层会合并：队列中只保留最新一个，
+        已显示的覆盖层直接更新内容，内容不变时不会重绘
 
         Args:
             overlay: Overlay 实例
         """
-        # 如果是音量通知，检查是否已存在
-        if isinstance(overlay, VolumeOverlay):
-            for existing in self.overlays:
-                if isinstance(existing, VolumeOverlay):
-                    # 更新现有音量通知
-                    existing.set_volume(overlay.volume_percent)
-                    return
-
-        overlay.show()
-        self.overlays.append(overlay)
+        with self._lock:
+            if overlay.key is not None:
+                self._pending_keys[overlay.key] = overlay
+            heapq.heappush(self._pending, (-overlay.priority, next(self._seq), overlay))
+
+    def _find(self, attr, value):
+        for existing in self.overlays:
+            if getattr(existing, attr) == value and not existing.is_expired:
+                return existing
+        return None
+
+    def _process_pending(self, now):
+        """按优先级处理待显示队列"""
+        if not self._pending:
+            return
+
+        with self._lock:
+            deferred = []
+            while self._pending:
+                entry = heapq.heappop(self._pending)
+                overlay = entry[2]
+                key = overlay.key
+
+                if key is not None:
+                    if self._pending_keys.get(key) is not overlay:
+                        continue  # 已被同 key 的新通知替代
+                    # 限流：间隔太短的留在队列中，期间到达的同 key 通知会替代它
+                    if now - self._last_shown.get(key, float("-inf")) < overlay.min_interval:
+                        deferred.append(entry)
+                        continue
+
+                    existing = self._find("key", key)
+                    if existing is not None:
+                        del self._pending_keys[key]
+                        if existing.merge(overlay):
+                            self._last_shown[key] = now
+                        continue
+
+                if overlay.slot is not None:
+                    occupant = self._find("slot", overlay.slot)
+                    if occupant is not None:
+                        if occupant.priority > overlay.priority:
+                            deferred.append(entry)  # 等待高优先级的通知结束
+                            continue
+                        # 从当前位置接替，避免先滑出再滑入
+                        overlay.y_offset = occupant.y_offset
+                        occupant.is_expired = True
+
+                if key is not None:
+                    del self._pending_keys[key]
+                    self._last_shown[key] = now
+                overlay.show()
+                self.overlays.append(overlay)
+
+            for entry in deferred:
+                heapq.heappush(self._pending, entry)
 
     def update(self):
         """更新所有覆盖层"""
+        self._process_pending(clock_now())
+
         for overlay in self.overlays:
-            overlay.update()
+            if not overlay.is_expired:
+                overlay.update()
 
         # 移除已过期的覆盖层
         self.overlays = [o for o in self.overlays if not o.is_expired]
 
     def render(self, base_image):
         """
-        渲染所有覆盖层到基础图像上
+        渲染所有覆盖层到基础图像上（原地合成）
 
         Args:
-            base_image: PIL Image 对象，主屏幕图像
+            base_image: PIL Image 对象，主屏幕图像，每帧都会被重新绘制
 
         Returns:
-            PIL Image: 合成后的图像
+            PIL Image: 合成后的图像（即 base_image 本身）
         """
-        if not self.overlays:
-            return base_image
-
-        # 创建副本避免修改原图像
-        result = base_image.copy()
-
         for overlay in self.overlays:
-            overlay_image = overlay.get_image()
             y_offset = overlay.get_y_offset()
 
-            # 只渲染可见区域
+            # 只渲染可见区域，越界部分由 paste 自动裁剪
             if y_offset < self.height and y_offset + overlay.height > 0:
-                # 计算粘贴位置 - 居右显示
-                paste_x = self.width - overlay.width
-                paste_y = max(0, y_offset)
-
-                # 计算源图像的裁剪区域
-                crop_top = max(0, -y_offset)
-                crop_bottom = min(overlay.height, self.height - y_offset)
+                overlay_image = overlay.get_image()
+                # 居右显示，mask 白色=不透明，黑色=透明
+                base_image.paste(overlay_image, (self.width - overlay.width, y_offset), overlay.get_mask())
 
-                if crop_top < crop_bottom:
-                    cropped = overlay_image.crop((0, crop_top, overlay.width, crop_bottom))
-                    # 使用图像本身作为 mask：白色像素=不透明，黑色像素=透明
-                    # 在单色模式下，白色（1）会覆盖，黑色（0）保持原样
-                    result.paste(cropped, (paste_x, paste_y))
-
-        return result
+        return base_image
 
     def has_active_overlays(self):
         """检查是否有活跃的覆盖层"""
@@ -98,4 +152,36 @@ class OverlayManager:
         Args:
             volume_percent: 音量百分比 (0-100)
         """
-        self.add_overlay(VolumeOverlay(24, 7, volume_percent))
\ No newline at end of file
+        self.add_overlay(VolumeOverlay(24, 7, volume_percent))
+
+    def show_mute(self):
+        """显示静音通知"""
+        self.add_overlay(MuteOverlay(24, 7))
+
+    def show_track(self, title, artist=""):
+        """
+        显示曲目切换通知
+
+        Args:
+            title: 曲目标题
+            artist: 艺术家
+        """
+        self.add_overlay(TrackOverlay(self.width, title, artist))
+
+    def show_network(self, connected):
+        """显示网络状态通知"""
+        self.add_overlay(NetworkOverlay(self.width, connected))
+
+    def show_bluetooth(self, name, connected=True):
+        """显示蓝牙连接状态通知"""
+        self.add_overlay(BluetoothOverlay(self.width, name, connected))
+
+    def show_error(self, plugin, error):
+        """
+        显示插件错误通知
+
+        Args:
+            plugin: 插件名
+            error: 异常或错误信息
+        """
+        self.add_overlay(ErrorOverlay(self.width, plugin, error))
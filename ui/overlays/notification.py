@@ -0,0 +1,143 @@
+"""
+通知覆盖层
+曲目切换、静音、网络、蓝牙、插件错误等类型化通知
+"""
+
+from until.clock import now as clock_now
+from ui.overlays.base import Overlay
+
+
+class NotificationOverlay(Overlay):
+    """顶部横幅通知基类"""
+
+    key = "notification"
+    slot = "banner"
+    priority = 0
+    min_interval = 1.0
+
+    def __init__(self, width, title, text="", duration=2.5, height=12):
+        """
+        初始化通知
+
+        Args:
+            width: 横幅宽度（通常为屏幕宽度）
+            title: 标题
+            text: 附加文本
+            duration: 显示持续时间（秒）
+            height: 横幅高度
+        """
+        super().__init__(width, height, duration)
+        self.title = title
+        self.text = text
+
+    def content(self):
+        """通知内容，用于去重和位图缓存"""
+        return (self.title, self.text)
+
+    def merge(self, other):
+        """合并同 key 的新通知，内容相同则什么都不做"""
+        if other.content() == self.content():
+            return False
+        self.title = other.title
+        self.text = other.text
+        self.invalidate()
+        self.create_time = clock_now()
+        self.is_expired = False
+        if self.is_hiding:
+            self.show()
+        return True
+
+    def cache_key(self):
+        return (type(self).__name__, self.width, self.height) + self.content()
+
+    def _fit(self, text, font, max_width):
+        """按像素宽度截断文本"""
+        if font.getlength(text) <= max_width:
+            return text
+        while text and font.getlength(text + "..") > max_width:
+            text = text[:-1]
+        return text + ".."
+
+    def render(self):
+        """渲染横幅：边框 + 单行文本"""
+        font = self.fonts.size_8
+        self.draw.rectangle((0, 0, self.width - 1, self.height - 1), outline=255, fill=0)
+        label = f"{self.title} {self.text}" if self.text else self.title
+        label = self._fit(label, font, self.width - 6)
+        self.draw.text((3, (self.height - 8) // 2), label, font=font, fill=255)
+
+    def render_mask(self, mask):
+        """整个横幅不透明"""
+        mask.rectangle((0, 0, self.width - 1, self.height - 1), fill=255)
+
+
+class TrackOverlay(NotificationOverlay):
+    """曲目切换通知"""
+
+    key = "track"
+    priority = 1
+
+    def __init__(self, width, title, artist=""):
+        super().__init__(width, "♪", f"{title} - {artist}" if artist else title)
+
+
+class BluetoothOverlay(NotificationOverlay):
+    """蓝牙连接状态通知"""
+
+    key = "bluetooth"
+    priority = 2
+    min_interval = 2.0
+
+    def __init__(self, width, name, connected=True):
+        super().__init__(width, "BT", f"{name} {'connected' if connected else 'disconnected'}")
+
+
+class NetworkOverlay(NotificationOverlay):
+    """网络状态通知"""
+
+    key = "network"
+    priority = 3
+    min_interval = 30.0
+
+    def __init__(self, width, connected=False):
+        super().__init__(width, "Network", "connected" if connected else "lost", duration=3.0)
+
+
+class ErrorOverlay(NotificationOverlay):
+    """插件错误通知，每个插件一个 key"""
+
+    priority = 4
+    min_interval = 30.0
+
+    def __init__(self, width, plugin, error):
+        super().__init__(width, f"[{plugin}]", str(error) or type(error).__name__, duration=4.0)
+        self.key = f"error:{plugin}"
+
+
+class MuteOverlay(Overlay):
+    """静音通知，与音量通知共用右上角位置"""
+
+    key = "mute"
+    slot = "volume"
+    priority = 1  # 与音量通知同级，后到的直接替换
+
+    def merge(self, other):
+        """重复静音只刷新显示时间"""
+        self.create_time = clock_now()
+        self.is_expired = False
+        if self.is_hiding:
+            self.show()
+        return False
+
+    def cache_key(self):
+        return (type(self).__name__, self.width, self.height)
+
+    def render(self):
+        """渲染静音提示"""
+        font = self.fonts.size_5
+        text = "MUTE"
+        x = (self.width - round(font.getlength(text))) // 2
+        self.draw.text((x, (self.height - 5) // 2), text, font=font, fill=255)
+
+    def render_mask(self, mask):
+        mask.rectangle((0, 0, self.width - 1, self.height - 1), fill=255)
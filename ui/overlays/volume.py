@@ -3,12 +3,17 @@
 显示音量调节的视觉反馈
 """
 
+from until.clock import now as clock_now
 from ui.overlays.base import Overlay
 
 
 class VolumeOverlay(Overlay):
     """音量通知覆盖层"""
 
+    key = "volume"
+    slot = "volume"
+    priority = 1
+
     def __init__(self, width, height, volume_percent, duration=3.0):
         """
         初始化音量通知
@@ -23,35 +28,48 @@ class VolumeOverlay(Overlay):
         self.volume_percent = max(0, min(100, volume_percent))
 
     def set_volume(self, volume_percent):
-        """更新音量值并重置显示时间"""
-        self.volume_percent = max(0, min(100, volume_percent))
-        self.create_time = time.time()
+        """
+        更新音量值并重置显示时间
+
+        Returns:
+            bool: 音量值是否变化
+        """
+        volume_percent = max(0, min(100, volume_percent))
+        changed = volume_percent != self.volume_percent
+        if changed:
+            self.volume_percent = volume_percent
+            self.invalidate()
+        self.create_time = clock_now()
         self.is_expired = False
         if self.is_hiding:
             self.show()
+        return changed
 
-    def render(self):
-        """渲染音量通知"""
-        # 覆盖层高度约 20 像素
-        overlay_height = 7 
+    def merge(self, other):
+        """合并新的音量通知"""
+        return self.set_volume(other.volume_percent)
 
+    def _frame_box(self):
+        """音量框位置 (x, y, width, height)"""
         # 音量条整体尺寸:
         bar_total_width = 24
         bar_total_height = 7
 
         # 居中定位
         bar_x = (self.width - bar_total_width) // 2
-        bar_y = (overlay_height - bar_total_height) // 2
-
-        # 注意：不绘制黑底，保持背景为黑色（0），用作透明 mask
-        # 只绘制白色部分（框和填充条），这样黑色区域会透明
+        bar_y = (self.height - bar_total_height) // 2
 
-        # 1. 绘制音量框白框 (居中)
         frame_width = bar_total_width - 2
-        frame_height = bar_total_height -2
+        frame_height = bar_total_height - 2
         frame_x = bar_x + (bar_total_width - frame_width) // 2
         frame_y = bar_y + (bar_total_height - frame_height) // 2
+        return frame_x, frame_y, frame_width, frame_height
+
+    def render(self):
+        """渲染音量通知"""
+        frame_x, frame_y, frame_width, frame_height = self._frame_box()
 
+        # 1. 绘制音量框白框 (居中)
         self.draw.rectangle(
             [(frame_x, frame_y), (frame_x + frame_width - 1, frame_y + frame_height - 1)],
             outline=255,
@@ -59,7 +77,7 @@ class VolumeOverlay(Overlay):
             fill=0
         )
 
-        # 3. 绘制音量条填充 (居中于音量框)
+        # 2. 绘制音量条填充 (居中于音量框)
         fill_max_width = frame_width - 5
         fill_height = 1
         fill_x = frame_x + (frame_width - fill_max_width) // 2
@@ -73,6 +91,10 @@ class VolumeOverlay(Overlay):
                 fill=255
             )
 
-
-# 需要导入 time 用于 set_volume 方法
-import time
+    def render_mask(self, mask):
+        """音量框内部不透明，框外保持透明"""
+        frame_x, frame_y, frame_width, frame_height = self._frame_box()
+        mask.rectangle(
+            [(frame_x, frame_y), (frame_x + frame_width - 1, frame_y + frame_height - 1)],
+            fill=255
+        )
@@ -1,14 +1,15 @@
-import time
+from until.clock import now as clock_now
 
 class Spinner:
     def __init__(self, frames, interval):
         self._frames = tuple(frames)
         self._interval = interval
         self._pos = 0
-        self._last = time.monotonic()
+        self._last = clock_now()
 
-    def frame(self):
-        now = time.monotonic()
+    def frame(self, now=None):
+        if now is None:
+            now = clock_now()
         if now - self._last >= self._interval:
             self._pos = (self._pos + 1) % len(self._frames)
             self._last = now
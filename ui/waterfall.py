@@ -0,0 +1,88 @@
+import numpy as np
+from PIL import Image
+
+
+def bayer_matrix(order=4):
+    """
+    有序抖动的 Bayer 阈值矩阵
+
+    Args:
+        order: 矩阵边长，2 的幂
+
+    Returns:
+        np.ndarray: (order, order) 阈值，取值在 (0, 1) 内均匀分布
+    """
+    matrix = np.zeros((1, 1), dtype=np.int32)
+    while matrix.shape[0] < order:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return ((matrix + 0.5) / matrix.size).astype(np.float32)
+
+
+class Waterfall:
+    """
+    滚动频谱图（瀑布图）
+
+    每次分析写入一行（或一列）频带强度，历史保存在镜像的环形数组中，
+    任意时刻按时间排列的历史都是连续视图；强度与屏幕坐标固定的 Bayer 阈值比较得到 1 位图像，
+    np.packbits 打包后一次 Image.frombuffer 生成图像，不逐个绘制矩形。
+    """
+
+    def __init__(self, width, height, bands, direction="vertical", order=4):
+        """
+        Args:
+            width: 图像宽度
+            height: 图像高度
+            bands: 每次写入的频带数
+            direction: "vertical" 新数据在顶部、向下滚动，频率沿水平方向（低频在左）；
+                       "horizontal" 新数据在右侧、向左滚动，频率沿垂直方向（低频在下）
+            order: Bayer 矩阵边长，越大灰阶越多
+        """
+        self.width = width
+        self.height = height
+        self.direction = "horizontal" if direction == "horizontal" else "vertical"
+        vertical = self.direction == "vertical"
+
+        # 历史长度和每次写入的像素数
+        self.length = height if vertical else width
+        span = width if vertical else height
+        if vertical:
+            self._pixel_bands = np.arange(span) * bands // span
+        else:
+            self._pixel_bands = (span - 1 - np.arange(span)) * bands // span  # 低频在下
+        self._history = np.zeros((2 * self.length, span), dtype=np.float32)  # 后半部分是前半部分的镜像
+        self._pos = 0  # 下一次写入的位置
+
+        tiles = (height + order - 1) // order, (width + order - 1) // order
+        self._threshold = np.tile(bayer_matrix(order), tiles)[:height, :width]
+        self._bits = np.zeros((height, width), dtype=bool)
+
+    def clear(self):
+        self._history.fill(0.0)
+
+    def push(self, levels):
+        """
+        写入一次分析结果
+
+        Args:
+            levels: 每个频带 0~1 的强度
+        """
+        pos = self._pos
+        row = self._history[pos]
+        np.take(levels, self._pixel_bands, out=row)
+        self._history[pos + self.length] = row
+        self._pos = (pos + 1) % self.length
+
+    def image(self):
+        """
+        Returns:
+            Image: 1 位图像
+        """
+        # 从最旧到最新的连续视图
+        history = self._history[self._pos:self._pos + self.length]
+        if self.direction == "vertical":
+            pixels = history[::-1]  # 最新的在顶部
+        else:
+            pixels = history.T  # 最新的在右侧
+        np.greater(pixels, self._threshold, out=self._bits)
+        packed = np.packbits(self._bits, axis=1)
+        return Image.frombuffer("1", (self.width, self.height), packed, "raw", "1", 0, 1)
@@ -0,0 +1,92 @@
+"""
+帧时钟
+
+DisplayManager 每帧只采样一次单调时间，插件和 UI 组件通过 time() 读取同一个帧时间戳。
+使用 time.monotonic，不受 NTP 校时影响（树莓派无 RTC，开机后系统时间可能跳变）。
+
+测试和基准可以注入 SimulatedClock，sleep() 直接推进时间，比实时运行更快。
+"""
+
+import time
+
+
+class FrameClock:
+    """单调帧时钟"""
+
+    def __init__(self, source=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            source: 单调时间函数
+            sleep: 休眠函数
+        """
+        self._source = source
+        self._sleep = sleep
+        self.now = None  # 当前帧时间戳，tick() 前为 None
+        self.dt = 0.0  # 与上一帧的间隔
+        self.frame = 0  # 帧计数
+
+    def tick(self):
+        """采样新的一帧时间戳，由 DisplayManager 每帧调用一次"""
+        now = self._source()
+        if self.now is not None:
+            self.dt = now - self.now
+        self.now = now
+        self.frame += 1
+        return now
+
+    def time(self):
+        """当前帧时间戳，尚未开始驱动时返回实时单调时间"""
+        now = self.now
+        return self._source() if now is None else now
+
+    def monotonic(self):
+        """实时单调时间（不取帧时间戳），用于测量帧内耗时"""
+        return self._source()
+
+    def sleep(self, seconds):
+        """休眠"""
+        if seconds > 0:
+            self._sleep(seconds)
+
+
+class SimulatedClock(FrameClock):
+    """模拟时钟，sleep() 只推进时间不阻塞"""
+
+    def __init__(self, start=0.0):
+        self._time = start
+        super().__init__(source=self._get_time, sleep=self.advance)
+
+    def _get_time(self):
+        return self._time
+
+    def advance(self, seconds):
+        """推进模拟时间"""
+        self._time += seconds
+
+
+_clock_instance = None
+
+
+def get_clock():
+    """
+    获取全局帧时钟单例
+
+    Returns:
+        FrameClock: 帧时钟实例
+    """
+    global _clock_instance
+    if _clock_instance is None:
+        _clock_instance = FrameClock()
+    return _clock_instance
+
+
+def set_clock(clock):
+    """替换全局帧时钟（测试、基准或模拟运行时使用）"""
+    global _clock_instance
+    _clock_instance = clock
+    return clock
+
+
+def now():
+    """当前帧时间戳，等价于 get_clock().time()"""
+    return get_clock().time()
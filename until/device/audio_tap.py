@@ -0,0 +1,421 @@
+"""
+共享的 loopback 音频采集
+
+一个采集线程从 ALSA loopback 读取 PCM，写入立体声环形缓冲区（SampleRing），
+并按 VU 表弹道计算各声道电平。插件通过 subscribe() 获得订阅，在渲染时读取
+levels()（VU 表）或 window()（频谱分析的原始样本），不再各自打开 PCM。
+
+读取即表示订阅者可见：超过 VISIBLE_TIMEOUT 没有订阅者读取（切换屏幕、熄屏）时
+采集线程自动停止，下次读取时重新启动。
+
+Examples:
+    audio = get_audio_tap().subscribe(self)
+    levels = audio.levels()  # 在 render() 中读取
+    audio.close()
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from until.dsp import SampleRing, VUMeter
+from until.log import LOGGER
+
+try:
+    import alsaaudio
+
+    ALSA_AVAILABLE = True
+except ImportError:
+    ALSA_AVAILABLE = False
+    alsaaudio = None
+
+# 没有订阅者读取超过该时间（秒）后停止采集
+VISIBLE_TIMEOUT = 1.0
+# 打开设备失败后重试的间隔（秒）
+RETRY_DELAY = 5.0
+# 环形缓冲区的最小容量（帧），足够取 8192 点的 FFT 窗口
+MIN_CAPACITY = 16384
+
+# 音频设备循环检测列表
+LOOPBACK_CANDIDATES = [
+    # "hw:Loopback,1",
+    # "hw:Loopback,0",
+    # "plughw:Loopback,1",
+    # "plughw:Loopback,0",
+    "Loopback",
+    "default",
+]
+
+
+class AudioLevels:
+    """VU 表读数，vu/peak 为各声道 0~1 的显示值"""
+
+    __slots__ = ("vu", "peak", "vu_db", "peak_db", "time")
+
+    def __init__(self, vu, peak, vu_db, peak_db, time):
+        self.vu = vu
+        self.peak = peak
+        self.vu_db = vu_db
+        self.peak_db = peak_db
+        self.time = time  # 最后一次更新的单调时间
+
+    def __repr__(self):
+        return f"AudioLevels(vu={self.vu}, peak={self.peak})"
+
+
+class AudioSubscription:
+    """音频采集的订阅，读取时保持采集运行"""
+
+    def __init__(self, tap, owner):
+        self.tap = tap
+        self.owner = owner
+
+    @property
+    def written(self):
+        """已采集的样本数（样本的绝对位置）"""
+        return self.tap.ring.written
+
+    @property
+    def status(self):
+        return self.tap.status
+
+    @property
+    def capturing(self):
+        return self.tap.capturing
+
+    def touch(self):
+        """不读取数据，只保持采集运行"""
+        self.tap.touch()
+
+    def levels(self):
+        """
+        Returns:
+            AudioLevels: 当前电平，没有可用的采集设备时返回 None
+        """
+        self.tap.touch()
+        return self.tap.levels()
+
+    def window(self, size, end=None):
+        """
+        取最近的原始样本（见 SampleRing.window），形状为 (size, channels)
+
+        视图会被采集线程继续写入，需要立即使用或复制
+        """
+        self.tap.touch()
+        return self.tap.ring.window(size, end)
+
+    def close(self):
+        self.tap.unsubscribe(self)
+
+
+class AudioTap:
+    """loopback 音频采集服务"""
+
+    def __init__(self, device=None, sample_rate=44100, chunk_size=1024, channels=2):
+        """
+        Args:
+            device: 采集设备，None 时按环境变量 MUSPI_SPECTRUM_DEVICE 和候选列表自动检测
+            sample_rate: 采样率
+            chunk_size: ALSA period 大小（帧）
+            channels: 声道数
+        """
+        self.device_hint = device or os.environ.get("MUSPI_SPECTRUM_DEVICE", "").strip() or None
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.channels = channels
+        self.window_size = 0  # 订阅者需要的最大窗口
+        self.ring = self._make_ring()
+        self.meter = VUMeter(channels)
+
+        self.device_label = None
+        self.status_message = "Idle"
+        self.error_message = None if ALSA_AVAILABLE else "Install pyalsaaudio"
+
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = None
+        self._last_touch = 0.0
+        self._retry_at = 0.0
+        self._levels = None  # 读者侧缓存的读数
+        self._levels_time = None  # VU 表最后一次更新的单调时间，未更新时为 None
+        # 采集线程的暂存，每个 period 不分配数组
+        self._sq = np.zeros((chunk_size, channels), dtype=np.float32)
+        self._rms = np.zeros(channels, dtype=np.float32)
+        self._peak = np.zeros(channels, dtype=np.float32)
+        self._trough = np.zeros(channels, dtype=np.float32)
+
+    def _make_ring(self):
+        capacity = max(MIN_CAPACITY, 2 * self.window_size + self.chunk_size)
+        return SampleRing(capacity, self.channels, self.chunk_size, downmix=False)
+
+    def configure(self, device=None, sample_rate=None, chunk_size=None, window_size=None):
+        """
+        修改采集参数（spectrum 插件按自己的配置调用），正在采集时重新打开设备
+
+        Args:
+            device: 采集设备
+            sample_rate: 采样率
+            chunk_size: ALSA period 大小
+            window_size: 订阅者需要的最大窗口（如 FFT 长度）
+        """
+        changed = False
+        if device and device != self.device_hint:
+            self.device_hint = device
+            changed = True
+        if sample_rate and sample_rate != self.sample_rate:
+            self.sample_rate = int(sample_rate)
+            changed = True
+        if chunk_size and chunk_size != self.chunk_size:
+            self.chunk_size = int(chunk_size)
+            self._sq = np.zeros((self.chunk_size, self.channels), dtype=np.float32)
+            changed = True
+        if window_size and window_size > self.window_size:
+            self.window_size = int(window_size)
+            changed = changed or 2 * self.window_size + self.chunk_size > self.ring.capacity
+        if not changed:
+            return
+
+        self.stop()
+        self.ring = self._make_ring()
+        self._retry_at = 0.0
+
+    def subscribe(self, owner):
+        """
+        Args:
+            owner: 订阅者（一般为插件）
+
+        Returns:
+            AudioSubscription: 订阅
+        """
+        for sub in self._subscriptions:
+            if sub.owner is owner:
+                return sub
+        sub = AudioSubscription(self, owner)
+        self._subscriptions.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self._subscriptions = [s for s in self._subscriptions if s is not sub]
+        if not self._subscriptions:
+            self.stop()
+
+    @property
+    def capturing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def status(self):
+        """状态文本（错误优先）"""
+        if self.error_message:
+            return self.error_message
+        if not self.capturing:
+            return "Wait For Thread"
+        return self.status_message or "Loopback"
+
+    def touch(self):
+        """订阅者可见（渲染中读取），需要时启动采集"""
+        now = time.monotonic()
+        self._last_touch = now
+        if not self.capturing and ALSA_AVAILABLE and now >= self._retry_at:
+            self._start()
+
+    def levels(self):
+        """
+        读者侧按需生成读数，VU 表没有更新时复用上次的结果
+
+        Returns:
+            AudioLevels: 当前电平，未采集时返回 None
+        """
+        if not self.capturing:
+            return None
+        with self._lock:
+            updated = self._levels_time
+            if updated is None:
+                return None
+            levels = self._levels
+            if levels is None or levels.time != updated:
+                meter = self.meter
+                levels = AudioLevels(
+                    tuple(meter.unit(meter.vu_db).tolist()),
+                    tuple(meter.unit(meter.peak_db).tolist()),
+                    tuple(meter.vu_db.tolist()),
+                    tuple(meter.peak_db.tolist()),
+                    updated,
+                )
+                self._levels = levels
+        return levels
+
+    def _start(self):
+        self._stop_event = threading.Event()
+        self.ring.clear()
+        with self._lock:
+            self.meter.reset()
+            self._levels = None
+            self._levels_time = None
+        self.status_message = "Connecting..."
+        self.error_message = None
+        self._thread = threading.Thread(
+            target=self._capture_loop, args=(self._stop_event,), name="AudioTap", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._stop_event:
+            self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        self._stop_event = None
+        self.device_label = None
+
+    # 采集循环
+    def _capture_loop(self, stop_event):
+        pcm = None
+
+        try:
+            pcm = self._open_capture_device()
+            if pcm is None:
+                self._retry_at = time.monotonic() + RETRY_DELAY
+                return
+
+            while not stop_event.is_set():
+                if time.monotonic() - self._last_touch > VISIBLE_TIMEOUT:
+                    LOGGER.info("[audio_tap] no visible subscriber, stop capture")
+                    break
+
+                try:
+                    length, data = pcm.read()
+                except alsaaudio.ALSAAudioError as exc:  # type: ignore[attr-defined]
+                    LOGGER.error(f"[audio_tap] ALSA read error: {exc}")
+                    self.error_message = "Loopback error"
+                    time.sleep(0.5)
+                    continue
+
+                if length > 0:
+                    self._consume_audio(data)
+                else:
+                    time.sleep(0.005)
+
+        except Exception as exc:
+            LOGGER.error(f"[audio_tap] capture thread crashed: {exc}", exc_info=True)
+            self.error_message = "Capture failed"
+            self._retry_at = time.monotonic() + RETRY_DELAY
+        finally:
+            if pcm:
+                try:
+                    pcm.close()
+                except Exception:
+                    pass
+
+    # 处理捕获的音频数据：写入环形缓冲区并更新 VU 表
+    def _consume_audio(self, raw_data):
+        ring = self.ring
+        frames = ring.write_pcm(raw_data)
+        if frames == 0:
+            return
+
+        rms, peak, trough = self._rms, self._peak, self._trough
+        for start in range(0, frames, self.chunk_size):
+            n = min(self.chunk_size, frames - start)
+            block = ring.window(n, ring.written - (frames - start - n))
+            if block is None:
+                continue
+            sq = self._sq[:n]
+            np.square(block, out=sq)
+            np.mean(sq, axis=0, out=rms)
+            np.sqrt(rms, out=rms)
+            np.max(block, axis=0, out=peak)
+            np.min(block, axis=0, out=trough)
+            np.negative(trough, out=trough)
+            np.maximum(peak, trough, out=peak)
+            # 只原地更新 VU 状态，AudioLevels 在读者调用 levels() 时生成
+            with self._lock:
+                self.meter.update(rms, peak, n / self.sample_rate)
+                self._levels_time = time.monotonic()
+
+    # 查找候选的音频设备
+    def _candidate_devices(self):
+        candidates = []
+
+        def _add(dev):
+            if dev and dev not in candidates:
+                candidates.append(dev)
+
+        if self.device_hint:
+            _add(self.device_hint)
+
+        for name in LOOPBACK_CANDIDATES:
+            _add(name)
+
+        try:
+            card_names = alsaaudio.cards()
+            LOGGER.debug(f"[audio_tap] ALSA cards: {card_names}")
+            for card_index, card_name in enumerate(card_names):
+                base = f"hw:{card_index}"
+                plug = f"plughw:{card_index}"
+                _add(f"{base},0")
+                _add(f"{plug},0")
+                _add(f"{base},1")
+                _add(f"{plug},1")
+                if "loopback" in card_name.lower():
+                    _add(card_name)
+        except Exception as exc:
+            LOGGER.warning(f"[audio_tap] failed to enumerate ALSA cards: {exc}")
+
+        try:
+            pcm_names = alsaaudio.pcms(alsaaudio.PCM_CAPTURE)
+            LOGGER.debug(f"[audio_tap] ALSA capture PCMs: {pcm_names}")
+            for pcm_name in pcm_names:
+                _add(pcm_name)
+        except Exception as exc:
+            LOGGER.warning(f"[audio_tap] failed to list capture PCMs: {exc}")
+
+        return candidates
+
+    # 打开音频捕获设备
+    def _open_capture_device(self):
+        for device in self._candidate_devices():
+            try:
+                pcm = alsaaudio.PCM(
+                    type=alsaaudio.PCM_CAPTURE,
+                    mode=alsaaudio.PCM_NONBLOCK,
+                    device=device,
+                )
+                pcm.setchannels(self.channels)
+                pcm.setrate(self.sample_rate)
+                pcm.setformat(alsaaudio.PCM_FORMAT_S16_LE)
+                pcm.setperiodsize(self.chunk_size)
+
+                self.device_label = device
+                self.status_message = "Capturing"
+                LOGGER.info(f"[audio_tap] capturing loopback from {device}")
+                return pcm
+            except alsaaudio.ALSAAudioError as exc:  # type: ignore[attr-defined]
+                LOGGER.warning(f"[audio_tap] failed to open {device}: {exc}")
+                continue
+
+        self.error_message = "Loopback missing"
+        LOGGER.error(
+            "[audio_tap] no loopback capture device available. "
+            "Set MUSPI_SPECTRUM_DEVICE or edit plugins/spectrum/config.json"
+        )
+        return None
+
+
+_tap_instance = None
+
+
+def get_audio_tap():
+    """
+    获取全局音频采集单例
+
+    Returns:
+        AudioTap: 音频采集实例
+    """
+    global _tap_instance
+    if _tap_instance is None:
+        _tap_instance = AudioTap()
+    return _tap_instance
@@ -1,14 +1,94 @@
+import logging
+import os
 import threading
-from evdev import InputDevice, ecodes, list_devices
+from collections import deque
+from evdev import InputDevice, InputEvent, ecodes, list_devices
 import select
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 from until.log import LOGGER
+from until.keymap import get_keymap
+from until.latency import get_latency_probe
 
 ecodes = ecodes
 
+EV_KEY = ecodes.EV_KEY
+EV_ABS = ecodes.EV_ABS
+EPOLL_LOST = select.EPOLLERR | select.EPOLLHUP
+# 方向键帽（HAT）是离散的按下/松开，不能合并
+HAT_CODES = frozenset(range(ecodes.ABS_HAT0X, ecodes.ABS_HAT3Y + 1))
+# 主线程来不及取走时最多缓存的事件数
+QUEUE_SIZE = 1024
+# 热插拔打开设备失败（udev 尚未设置权限、蓝牙设备未就绪等）时的重试间隔（秒）
+OPEN_RETRY_DELAY = 0.05
+OPEN_RETRY_MAX_DELAY = 5.0
+OPEN_RETRY_ATTEMPTS = 10
+
+
+def is_coalescable(event, discrete_axes=HAT_CODES):
+    """
+    是否为可合并的事件：按键自动重复（value == 2）和原始模拟轴移动
+
+    同一代码连续的多个此类事件只需保留最新的一个。
+    HAT 和经过 AxisFilter 量化的轴是离散的按下/松开，不能合并，否则同一帧内的按下会丢失
+
+    Args:
+        event: 输入事件
+        discrete_axes: 离散的 EV_ABS 代码
+    """
+    if event.type == ecodes.EV_KEY:
+        return event.value == 2
+    return event.type == ecodes.EV_ABS and event.code not in discrete_axes
+
+
+class AxisFilter:
+    """
+    模拟轴死区与滞回
+
+    把摇杆等模拟轴量化为 -1/0/1，只在状态变化时产生事件：
+    偏离中心超过 deadzone + hysteresis 才进入 ±1，回到 deadzone 以内才归 0，
+    中心附近的抖动和连续移动都不会产生事件
+    """
+
+    __slots__ = ("center", "half", "enter", "leave", "state")
+
+    def __init__(self, absinfo, deadzone, hysteresis):
+        """
+        Args:
+            absinfo: evdev.AbsInfo
+            deadzone: 死区，占半量程的比例
+            hysteresis: 滞回宽度，占半量程的比例
+        """
+        self.center = (absinfo.min + absinfo.max) / 2
+        self.half = max(1, (absinfo.max - absinfo.min) / 2)
+        self.leave = deadzone
+        self.enter = min(1.0, deadzone + hysteresis)
+        self.state = 0
+
+    def update(self, value):
+        """
+        输入原始值
+
+        Returns:
+            int | None: 新状态 -1/0/1，状态未变化返回 None
+        """
+        pos = (value - self.center) / self.half
+        mag = abs(pos)
+        state = self.state
+        if mag >= self.enter:
+            new = 1 if pos > 0 else -1
+        elif mag < self.leave:
+            new = 0
+        else:
+            return None  # 滞回区间内保持原状态
+        if new == state:
+            return None
+        self.state = new
+        return new
+
+
 class DeviceChangeHandler(FileSystemEventHandler):
     """Handler for device change events"""
     def __init__(self, key_listener):
@@ -19,23 +99,44 @@ class DeviceChangeHandler(FileSystemEventHandler):
         """Handle device creation"""
         if not event.is_directory and '/dev/input/event' in event.src_path:
             LOGGER.info(f"Device created: {event.src_path}")
-            # Wait a bit for device to be fully initialized
-            time.sleep(0.5)
-            self.key_listener.rescan_devices()
+            # 只打开新增的节点，由监听线程打开并在失败时退避重试，不阻塞 watchdog 线程
+            self.key_listener.device_added(event.src_path)
 
     def on_deleted(self, event):
         """Handle device deletion"""
         if not event.is_directory and '/dev/input/event' in event.src_path:
             LOGGER.info(f"Device deleted: {event.src_path}")
-            self.key_listener.rescan_devices()
+            self.key_listener.device_removed(event.src_path)
 
 class KeyListener(threading.Thread):
     def __init__(self):
         super().__init__()
         self.daemon = True  # set as daemon thread, exit when main program exits
         self.running = True
-        self.devices = []
+        self.devices = {}  # fd -> InputDevice
         self.callbacks = []
+        # 回调的只读快照 ((callback, 绑定方法的 self 或 None), ...)，避免回调中 on/off 影响遍历
+        self._callbacks = ()  # 主线程 drain() 时调用
+        self._direct_callbacks = ()  # 在监听线程中直接调用（低延迟）
+        self._queue = deque(maxlen=QUEUE_SIZE)  # 监听线程 -> 主线程的 (事件, 延迟标记)，append/popleft 本身是线程安全的
+        self._pending = threading.Event()  # 队列非空时置位，用于唤醒休眠中的主循环
+        self._epoll = select.epoll()
+        self._lock = threading.Lock()
+        self._opening = {}  # path -> (下次尝试时间, 已尝试次数)，由监听线程处理
+        # 唤醒管道：其他线程请求打开设备时让 epoll 立即返回
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+        self.probe = get_latency_probe()
+        self.keymap = get_keymap()
+        self._extra_codes = frozenset()  # listen() 额外关注的 (type, code)
+        self._interest_source = None  # 计算 _interest_codes 时的 keymap.codes
+        self._interest_codes = frozenset()
+        self._axis_filters = {}  # fd -> {code: AxisFilter}
+        self._discrete_axes = HAT_CODES  # HAT 和已过滤的轴代码，drain() 时不合并
+        self._ignored = set()  # 没有相关按键/轴而跳过的设备路径
+        self._ignored_source = None  # 跳过设备时的 keymap.codes，配置变化后重新检查
         self.observer = Observer()  # 创建 Observer
         self.event_handler = DeviceChangeHandler(self)  # 创建事件处理器
 
@@ -49,85 +150,454 @@ class KeyListener(threading.Thread):
         except (KeyError, IndexError):
             return f"UNKNOWN_{event.code}"
         
-    def on(self, callback):
-        """add callback function"""
+    def on(self, callback, direct=False):
+        """
+        add callback function
+
+        Args:
+            callback: callback(evt)
+            direct: 为 True 时在监听线程中收到事件立即调用（不合并、不排队），
+                    用于模拟器等对延迟敏感的输入，回调需自行保证线程安全；
+                    默认在主线程 drain() 时调用
+        """
         if callback not in self.callbacks:
             self.callbacks.append(callback)
+            self._update_callbacks(callback, direct)
             LOGGER.debug(f"add keyboardCallback: {callback.__name__}")
 
     def off(self, callback):
         """remove callback function"""
         if callback in self.callbacks:
             self.callbacks.remove(callback)
+            self._update_callbacks(callback, None)
             LOGGER.debug(f"remove keyboardCallback: {callback.__name__}")
 
+    def _update_callbacks(self, callback, direct):
+        """重建两组回调快照，direct 为 None 表示移除"""
+        queued = [entry for entry in self._callbacks if entry[0] != callback]
+        direct_cbs = [entry for entry in self._direct_callbacks if entry[0] != callback]
+        if direct is not None:
+            # 绑定方法的 self 在这里取出，分发时不必每个事件 hasattr
+            (direct_cbs if direct else queued).append((callback, getattr(callback, "__self__", None)))
+        self._callbacks = tuple(queued)
+        self._direct_callbacks = tuple(direct_cbs)
+
+    def listen(self, *pairs):
+        """
+        额外关注 keymap 中没有绑定的事件（默认只分发 keymap 绑定的 (type, code)）
+
+        Args:
+            *pairs: (type, code)
+        """
+        self._extra_codes = self._extra_codes | frozenset(pairs)
+        self._interest_source = None
+
+    def interest(self):
+        """需要分发的 (type, code) 集合：keymap 绑定的事件加上 listen() 的事件"""
+        codes = self.keymap.codes
+        if codes is not self._interest_source:
+            # keymap 重新加载后 codes 是新对象，这里随之更新
+            self._interest_codes = codes | self._extra_codes
+            self._interest_source = codes
+        return self._interest_codes
+
+    def is_relevant(self, dev):
+        """设备是否能产生任何需要分发的事件"""
+        try:
+            caps = dev.capabilities(absinfo=False)
+        except (AttributeError, OSError):
+            return True  # 无法查询能力时不做过滤
+        interest = self.interest()
+        for etype in (ecodes.EV_KEY, ecodes.EV_ABS):
+            for code in caps.get(etype, ()):
+                if (etype, code) in interest:
+                    return True
+        return False
+
+    def _open(self, device_path):
+        """
+        打开设备，没有相关按键/轴的设备直接关闭并返回 None
+
+        Raises:
+            OSError: 打开失败
+        """
+        dev = InputDevice(device_path)
+        if not self.is_relevant(dev):
+            LOGGER.info(f"skip device without mapped keys: {dev.name} ({device_path})")
+            self._ignored.add(device_path)
+            dev.close()
+            return None
+        LOGGER.debug(f"scan device: {dev.name}")
+        return dev
+
     def scan(self):
         """scan all available input devices"""
+        self._ignored.clear()
+        self._ignored_source = self.keymap.codes
         devices = []
         for device_path in list_devices():
             try:
-                dev = InputDevice(device_path)
-                devices.append(dev)
-                LOGGER.debug(f"scan device: {dev.name}")
+                dev = self._open(device_path)
             except Exception as e:
                 LOGGER.error(f"cannot open device {device_path}: {e}")
+                self._schedule_open(device_path)
+                continue
+            if dev is not None:
+                devices.append(dev)
         return devices
 
+    def _build_axis_filters(self, dev):
+        """为设备的模拟轴（HAT 除外）创建死区滤波器"""
+        try:
+            axes = dev.capabilities(absinfo=True).get(ecodes.EV_ABS, ())
+        except (AttributeError, OSError):
+            return {}
+        deadzone = self.keymap.axis_deadzone
+        hysteresis = self.keymap.axis_hysteresis
+        return {
+            code: AxisFilter(absinfo, deadzone, hysteresis)
+            for code, absinfo in axes
+            if code not in HAT_CODES and absinfo.max > absinfo.min
+        }
+
+    def add_device(self, dev):
+        """register an opened (non-blocking) device to epoll"""
+        filters = self._build_axis_filters(dev)
+        with self._lock:
+            self.devices[dev.fd] = dev
+            if filters:
+                self._axis_filters[dev.fd] = filters
+                self._update_discrete_axes()
+            self._epoll.register(dev.fd, select.EPOLLIN)
+
+    def _update_discrete_axes(self):
+        """持有 _lock 时调用：重新计算不能合并的轴代码"""
+        codes = set(HAT_CODES)
+        for filters in self._axis_filters.values():
+            codes.update(filters)
+        self._discrete_axes = frozenset(codes)
+
+    def remove_device(self, dev):
+        """unregister and close a device"""
+        with self._lock:
+            if self.devices.pop(dev.fd, None) is None:
+                return
+            if self._axis_filters.pop(dev.fd, None) is not None:
+                self._update_discrete_axes()
+            try:
+                self._epoll.unregister(dev.fd)
+            except (OSError, ValueError):
+                pass
+        try:
+            dev.close()
+        except Exception:
+            pass
+
     def rescan_devices(self):
-        """rescan devices and update device list"""
-        old_device_paths = {dev.path for dev in self.devices}
-        self.devices = self.scan()
-        new_device_paths = {dev.path for dev in self.devices}
+        """rescan devices, only open added devices and close removed ones"""
+        with self._lock:
+            known = {dev.path: dev for dev in self.devices.values()}
+        current = set(list_devices())
+
+        # 按键映射变化后重新检查之前跳过的设备
+        if self._ignored_source is not self.keymap.codes:
+            self._ignored.clear()
+            self._ignored_source = self.keymap.codes
+        self._ignored &= current
+
+        added = current - known.keys() - self._ignored
+        removed = known.keys() - current
+        for path in removed:
+            self.remove_device(known[path])
+        for path in set(added):
+            try:
+                dev = self._open(path)
+                if dev is not None:
+                    self.add_device(dev)
+                    continue
+            except Exception as e:
+                LOGGER.error(f"cannot open device {path}: {e}")
+                self._schedule_open(path)
+            added.discard(path)
 
         # Log device changes
-        added = new_device_paths - old_device_paths
-        removed = old_device_paths - new_device_paths
         if added:
             LOGGER.info(f"Devices added: {added}")
         if removed:
             LOGGER.info(f"Devices removed: {removed}")
 
+    def device_added(self, path):
+        """热插拔：请求打开新增的设备节点（任意线程调用，实际打开在监听线程中进行）"""
+        self._schedule_open(path, attempt=0, delay=0)
+
+    def device_removed(self, path):
+        """热插拔：只关闭被移除的设备节点"""
+        with self._lock:
+            self._opening.pop(path, None)
+            dev = next((d for d in self.devices.values() if d.path == path), None)
+        self._ignored.discard(path)
+        if dev is not None:
+            self.remove_device(dev)
+            LOGGER.info(f"Devices removed: {path}")
+
+    def _schedule_open(self, path, attempt=1, delay=None):
+        """安排在 delay 秒后尝试打开设备，delay 默认按尝试次数指数退避"""
+        if delay is None:
+            delay = min(OPEN_RETRY_MAX_DELAY, OPEN_RETRY_DELAY * 2 ** (attempt - 1))
+        with self._lock:
+            self._opening[path] = (time.monotonic() + delay, attempt)
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # 管道已满，监听线程必然会被唤醒
+
+    def _open_pending(self):
+        """
+        监听线程：打开到期的待打开设备，失败的按退避重新安排
+
+        Returns:
+            float | None: 距下一次重试的秒数，没有待打开设备时返回 None
+        """
+        if not self._opening:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            due = [(path, attempt) for path, (when, attempt) in self._opening.items() if when <= now]
+            for path, _ in due:
+                del self._opening[path]
+            known = {dev.path for dev in self.devices.values()}
+
+        for path, attempt in due:
+            if path in known or path in self._ignored:
+                continue
+            try:
+                dev = self._open(path)
+            except Exception as e:
+                if attempt + 1 >= OPEN_RETRY_ATTEMPTS or not os.path.exists(path):
+                    LOGGER.error(f"cannot open device {path}: {e}")
+                    continue
+                LOGGER.debug(f"open device {path} failed ({e}), retry #{attempt + 1}")
+                self._schedule_open(path, attempt + 1)
+                continue
+            if dev is not None:
+                self.add_device(dev)
+                LOGGER.info(f"Devices added: {path} ({dev.name})")
+
+        with self._lock:
+            if not self._opening:
+                return None
+            return max(0.0, min(when for when, _ in self._opening.values()) - time.monotonic())
+
+    def _dispatch(self, dev, events):
+        """
+        监听线程：丢弃无关事件并过滤模拟轴，调用 direct 回调，其余事件放入队列等待主线程处理
+
+        开启延迟探针时每个事件在这里标记一次，标记随事件入队，最后一个回调执行后才 done()。
+        每次唤醒在第一个回调前都要执行这里的准备工作，保持为几次局部变量绑定（direct 回调内联调用）
+        """
+        interest = self._interest_codes
+        if self.keymap.codes is not self._interest_source:
+            interest = self.interest()
+        direct = self._direct_callbacks
+        queue = self._queue
+        filters = self._axis_filters.get(dev.fd) if dev is not None else None
+        probe = self.probe
+        if not probe.enabled:
+            probe = None
+        debug = LOGGER.isEnabledFor(logging.DEBUG)
+        queued = False
+        for event in events:
+            etype = event.type
+            if etype != EV_KEY and etype != EV_ABS:
+                continue
+            if (etype, event.code) not in interest:
+                continue
+            if filters and etype == EV_ABS:
+                axis = filters.get(event.code)
+                if axis is not None:
+                    state = axis.update(event.value)
+                    if state is None:
+                        continue
+                    event = InputEvent(event.sec, event.usec, etype, event.code, state)
+            if debug:
+                LOGGER.debug(f"{dev.name if dev else 'inject'} - key down {self._event_name(event)}")
+                LOGGER.debug(f"Event: type={event.type}, code={event.code}, value={event.value}")
+            tag = probe.tag(event) if probe else None
+            for callback, owner in direct:
+                try:
+                    if owner is not None:
+                        owner.key_code = event.code
+                    callback(event)
+                except Exception as e:
+                    LOGGER.error(f"execute callback {callback.__name__} error: {e}")
+            if not self._callbacks:
+                # 没有主线程回调时不入队（drain() 也只会丢弃），direct 回调就是最后一个
+                if tag is not None:
+                    probe.done(tag)
+                continue
+            queue.append((event, tag))
+            queued = True
+
+        if queued and not self._pending.is_set():
+            self._pending.set()
+
+    def _call(self, callbacks, event):
+        # call all registered callbacks
+        for callback, owner in callbacks:
+            try:
+                # 如果 callback 是绑定方法，则在其 self 对象上设置 evt 属性
+                if owner is not None:
+                    owner.key_code = event.code
+                callback(event)
+            except Exception as e:
+                LOGGER.error(f"execute callback {callback.__name__} error: {e}")
+
+    @staticmethod
+    def coalesce(entries, discrete_axes=HAT_CODES):
+        """
+        合并事件：同一 (type, code) 连续的自动重复/原始轴移动只保留最新值，
+        保留在第一次出现的位置；按下、松开、HAT 和已过滤轴的事件原样保留并打断合并
+
+        Args:
+            entries: 按时间顺序的 (事件, 延迟标记) 列表，未开启延迟探针时标记为 None
+            discrete_axes: 离散的 EV_ABS 代码（HAT 和经过 AxisFilter 的轴）
+
+        Returns:
+            list: 合并后的 (事件, 标记列表) 列表，被合并事件的标记按顺序排在前面，没有标记时为 None
+        """
+        result = []
+        slots = {}  # (type, code) -> 可被覆盖的 result 下标
+        for event, tag in entries:
+            tags = None if tag is None else [tag]
+            key = (event.type, event.code)
+            if is_coalescable(event, discrete_axes):
+                index = slots.get(key)
+                if index is None:
+                    slots[key] = len(result)
+                    result.append((event, tags))
+                else:
+                    merged = result[index][1]
+                    if merged is not None:
+                        tags = merged if tags is None else merged + tags
+                    result[index] = (event, tags)
+            else:
+                slots.pop(key, None)
+                result.append((event, tags))
+        return result
+
+    def drain(self):
+        """
+        主线程：取出队列中的全部事件，合并后依次调用回调
+
+        由 DisplayManager 每帧调用一次
+
+        Returns:
+            int: 分发的事件数
+        """
+        queue = self._queue
+        if not queue:
+            return 0
+        self._pending.clear()
+        events = []
+        try:
+            while True:
+                events.append(queue.popleft())
+        except IndexError:
+            pass
+
+        probe = self.probe
+        if not self._callbacks:
+            # 入队后回调被移除，这些事件不会再有回调
+            for _, tag in events:
+                if tag is not None:
+                    probe.done(tag)
+            return 0
+        events = self.coalesce(events, self._discrete_axes)
+        for event, tags in events:
+            if tags:
+                probe.enter(tags[-1])
+            # 回调中可能 on/off，每个事件重新取快照
+            self._call(self._callbacks, event)
+            if tags:
+                probe.done(tags[-1], tags[:-1])
+        return len(events)
+
+    def wait(self, timeout):
+        """
+        等待新的输入事件入队（主循环休眠时使用，有按键立即唤醒）
+
+        Returns:
+            bool: 是否有待处理的事件
+        """
+        return self._pending.wait(timeout)
+
+    def inject(self, events, dev=None):
+        """dispatch synthetic events as if they were read from a device (replay/testing)"""
+        self._dispatch(dev, events)
+
+    def poll(self, timeout=0.5):
+        """wait for readable devices and dispatch all pending events once"""
+        for fd, mask in self._epoll.poll(timeout):
+            if fd == self._wake_r:
+                try:
+                    while os.read(self._wake_r, 64):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+            dev = self.devices.get(fd)
+            if dev is None:
+                continue
+            if mask & EPOLL_LOST:
+                LOGGER.info(f"Device lost: {dev.path}")
+                self.remove_device(dev)
+                continue
+            try:
+                # 一次 read() 批量读取内核缓冲区中的事件，剩余的由水平触发的 epoll 再次报告
+                events = dev.read()
+                self._dispatch(dev, events)
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                # 设备被拔出（ENODEV）等错误，只移除这一个设备；节点仍在时（蓝牙断续）退避后重新打开
+                LOGGER.error(f"read device {dev.path} error: {e}")
+                self.remove_device(dev)
+                if os.path.exists(dev.path):
+                    self._schedule_open(dev.path)
+
     def run(self):
         """线程主函数"""
-        # 设置 watchdog 监听 /dev/input 目录
-        self.observer.schedule(self.event_handler, '/dev/input', recursive=False)
-        self.observer.start()
+        # 设置 watchdog 监听 /dev/input 目录（无输入子系统时跳过，例如虚拟显示回放）
+        if os.path.isdir('/dev/input'):
+            self.observer.schedule(self.event_handler, '/dev/input', recursive=False)
+            self.observer.start()
 
         # 扫描设备
-        self.devices = self.scan()
+        for dev in self.scan():
+            self.add_device(dev)
         if not self.devices:
-            LOGGER.error("no input device found")
-            return
+            LOGGER.error("no input device found, waiting for hotplug")
 
         while self.running:
             try:
-                r, w, x = select.select(self.devices, [], [], 0.1)
-                for device in r:
-                    for event in device.read():
-                        if event.type == ecodes.EV_KEY or event.type == ecodes.EV_ABS:
-                            key_name = self._event_name(event)
-                            LOGGER.debug(f"{device.name} - key down {key_name}")
-
-                            # call all registered callbacks
-                            for callback in self.callbacks:
-                                try:
-                                    # 如果 callback 是绑定方法，则在其 self 对象上设置 evt 属性
-                                    if hasattr(callback, '__self__'):
-                                        callback.__self__.key_code = event.code
-                                    callback(event)
-                                except Exception as e:
-                                    LOGGER.error(f"execute callback {callback.__name__} error: {e}")
-
-                            LOGGER.debug(f"Event: type={event.type}, code={event.code}, value={event.value}")
+                # 按键映射重新加载后（codes 是新对象），重新检查之前跳过的设备
+                if self._ignored_source is not self.keymap.codes:
+                    self.rescan_devices()
+                # 有事件时 epoll 立即返回，超时只用于检查 running 标志和设备重试
+                retry = self._open_pending()
+                self.poll(0.5 if retry is None else min(0.5, retry))
             except Exception as e:
-                LOGGER.info("read device error, rescanning...")
-                LOGGER.error(f"read device error: {e}")
-                time.sleep(1)  # 出错后等待1秒再重试
-                self.devices = self.scan()
+                # 单个设备的读取错误已在 poll 中处理，这里只会是意外错误，短暂等待防止空转
+                LOGGER.error(f"poll device error: {e}")
+                time.sleep(0.1)
 
     def stop(self):
         """stop listening"""
         self.running = False
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
         if self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
@@ -1,66 +1,549 @@
+import hashlib
+import json
+import os
+import select
 import subprocess
 import re
+import threading
+import time
 
 from until.log import LOGGER
 
+try:
+    import alsaaudio
+
+    # Mixer 按 dB 读写（units=VOLUME_UNITS_DB）需要 pyalsaaudio 0.10 及以上
+    ALSA_AVAILABLE = hasattr(alsaaudio, "VOLUME_UNITS_DB")
+    if not ALSA_AVAILABLE:
+        LOGGER.warning("pyalsaaudio < 0.10 has no dB mixer API, volume falls back to amixer")
+except ImportError:
+    ALSA_AVAILABLE = False
+    alsaaudio = None
+
 CARD = "default"
 MIN_DB = -102.0
 STEP = "2.0dB"
+STEP_DB = 2.0  # 与 STEP 相同，原生接口使用
+STEP_PERCENT = 5  # PulseAudio 每次调节的百分比
+
+CARDS_FILE = "/proc/asound/cards"
+CACHE_VERSION = 1
 
 PCM_CONTROLS = []
 DEVICE_TYPE = None  # 'pulse' or 'alsa'
+BACKEND = None  # 当前混音器后端，由 detect_pcm_controls() 选择
 
-def detect_pcm_controls():
-    global PCM_CONTROLS, DEVICE_TYPE
-    PCM_CONTROLS = []
-    DEVICE_TYPE = None
 
-    try:
-        # Try PulseAudio first (for Pi 5)
+class AmixerBackend:
+    """通过 amixer 子进程读写音量（无 pyalsaaudio 时的后备方案）"""
+
+    name = "amixer"
+
+    def __init__(self):
+        self.device_type = None  # 检测时确定，每个实例独立，后台检测不影响正在使用的后端
+
+    def _amixer(self, *args):
+        if self.device_type == "pulse":
+            return ["amixer", "-D", "pulse", *args]
+        if CARD == "default":
+            return ["amixer", *args]
+        return ["amixer", "-c", CARD, *args]
+
+    def detect(self):
+        """
+        Returns:
+            tuple: (device_type, controls)
+        """
         try:
+            # Try PulseAudio first (for Pi 5)
             out = subprocess.check_output(["amixer", "-D", "pulse", "scontrols"]).decode()
-            DEVICE_TYPE = "pulse"
+            self.device_type = "pulse"
             LOGGER.info("Detected PulseAudio")
         except subprocess.CalledProcessError:
             # Fallback to ALSA (for Pi 3B+)
-            if CARD == "default":
-                out = subprocess.check_output(["amixer", "scontrols"]).decode()
-            else:
-                out = subprocess.check_output(["amixer", "-c", CARD, "scontrols"]).decode()
-            DEVICE_TYPE = "alsa"
+            self.device_type = "alsa"
+            out = subprocess.check_output(self._amixer("scontrols")).decode()
             LOGGER.info("Detected ALSA")
 
         # find all controllers, including name and index
         controls = re.findall(r"'([^']*)',(\d+)", out)
 
         # filter controllers based on device type
-        if DEVICE_TYPE == "pulse":
+        if self.device_type == "pulse":
             # For PulseAudio (Pi 5), use Master control
             pcm_controls = [f"{name},{index}" for name, index in controls if name == "Master"]
         else:
             # For ALSA (Pi 3B+), use PCM controls
             pcm_controls = [f"{name},{index}" for name, index in controls if "PCM" in name]
 
+        found = []
         for control in pcm_controls:
             # check if each controller has Playback limit
-            if DEVICE_TYPE == "pulse":
-                info = subprocess.check_output(["amixer", "-D", "pulse", "sget", control]).decode()
-            elif CARD == "default":
-                info = subprocess.check_output(["amixer", "sget", control]).decode()
-            else:
-                info = subprocess.check_output(["amixer", "-c", CARD, "sget", control]).decode()
-
+            info = subprocess.check_output(self._amixer("sget", control)).decode()
             if "Limits: Playback" in info:
-                PCM_CONTROLS.append(control)
-                LOGGER.info(f"find controller: {control}")
-    
-    except Exception as e:
-        LOGGER.error("detect PCM controller failed:", e)
+                found.append(control)
+        return self.device_type, found
+
+    def restore(self, device_type, controls, limits):
+        """从缓存恢复检测结果，amixer 每次调用时才访问混音器，无需打开"""
+        self.device_type = device_type
+
+    def limits(self):
+        return {}
+
+    def db_range(self, control):
+        return None  # amixer 不缓存 dB 范围
+
+    def close(self):
+        pass  # 没有打开的句柄
+
+    def get(self, control):
+        """
+        Returns:
+            tuple: (value, is_db)，失败返回 None
+        """
+        out = subprocess.check_output(self._amixer("get", control)).decode()
+
+        # Try to match dB format first (ALSA)
+        match = re.search(r'\[(\-?\d+\.\d+)dB\]', out)
+        if match:
+            return (float(match.group(1)), True)
+
+        # If no dB format, try percentage format (PulseAudio)
+        match = re.search(r'\[(\d+)%\]', out)
+        if match:
+            return (int(match.group(1)), False)
+        return None
+
+    def step(self, control, direction, steps=1):
+        """
+        调节音量
+
+        Args:
+            control: 控制器
+            direction: "up" 或 "down"
+            steps: 步数，合并后的多步一次写入
+
+        Returns:
+            tuple: 调整后的 (value, is_db)，失败返回 None
+        """
+        result = self.get(control)
+        if result is None:
+            return None
+        current_value, is_db = result
+
+        # Check minimum volume for ALSA (dB mode)
+        if is_db and direction == "down" and current_value <= MIN_DB:
+            LOGGER.info(f"🔇 Already at minimum {MIN_DB}dB")
+            return result
+
+        sign = "+" if direction == "up" else "-"
+        if self.device_type == "pulse":
+            # For PulseAudio, use percentage adjustment (e.g., "5%+")
+            delta = f"{STEP_PERCENT * steps}%{sign}"
+        else:
+            # For ALSA, use dB adjustment
+            delta = (STEP if steps == 1 else f"{STEP_DB * steps:.1f}dB") + sign
+        subprocess.run(self._amixer("set", control, delta), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return self.get(control)
+
+    def toggle_mute(self, control):
+        """
+        Returns:
+            bool: 切换后是否静音，无法解析时返回 None
+        """
+        result = subprocess.run(self._amixer("set", control, "toggle"), capture_output=True, text=True)
+        # 解析静音状态 [on] 或 [off]
+        if "[off]" in result.stdout:
+            return True  # off = 静音
+        if "[on]" in result.stdout:
+            return False  # on = 取消静音
+        return None
+
+
+class AlsaMixerBackend:
+    """
+    通过 pyalsaaudio 的 Mixer 直接读写音量
+
+    混音器句柄和 dB 范围在检测时缓存，每次按键只有几次 ioctl，不再 fork amixer；
+    polldescriptors() 可用于监听其他程序对音量的修改
+    """
+
+    name = "alsa"
+
+    def __init__(self):
+        self.device_type = None
+        self._mixers = {}  # control -> alsaaudio.Mixer
+        self._db_ranges = {}  # control -> (min_db, max_db)，不支持 dB 的控制器没有条目
+        self._lock = threading.RLock()  # 音量工作线程和事件监听线程共用混音器句柄
+
+    def _mixer_kwargs(self):
+        if self.device_type == "pulse":
+            return {"device": "pulse"}
+        if CARD == "default":
+            return {"device": "default"}
+        return {"cardindex": int(CARD)} if str(CARD).isdigit() else {"device": f"hw:{CARD}"}
+
+    def detect(self):
+        self.close()
+        try:
+            # Try PulseAudio first (for Pi 5)
+            names = alsaaudio.mixers(device="pulse")
+            self.device_type = "pulse"
+            LOGGER.info("Detected PulseAudio")
+        except alsaaudio.ALSAAudioError:
+            self.device_type = "alsa"
+            names = alsaaudio.mixers(**self._mixer_kwargs())
+            LOGGER.info("Detected ALSA")
+
+        if self.device_type == "pulse":
+            wanted = [name for name in names if name == "Master"]
+        else:
+            wanted = [name for name in names if "PCM" in name]
+
+        found = []
+        for name in dict.fromkeys(wanted):
+            # 同名控制器可能有多个索引（amixer 中的 'PCM',1）
+            for index in range(names.count(name)):
+                try:
+                    mixer = alsaaudio.Mixer(name, id=index, **self._mixer_kwargs())
+                except alsaaudio.ALSAAudioError:
+                    continue
+                if not any("Volume" in cap for cap in mixer.volumecap()):
+                    mixer.close()
+                    continue
+                control = f"{name},{index}"
+                self._mixers[control] = mixer
+                if self.device_type != "pulse":
+                    try:
+                        low, high = mixer.getrange(units=alsaaudio.VOLUME_UNITS_DB)
+                        if low < high:
+                            self._db_ranges[control] = (low / 100.0, high / 100.0)
+                    except alsaaudio.ALSAAudioError:
+                        pass  # 控制器不支持 dB，按百分比调节
+                found.append(control)
+        return self.device_type, found
+
+    def restore(self, device_type, controls, limits):
+        """
+        从缓存恢复检测结果：只按名称打开混音器句柄，不枚举控制器、不查询 dB 范围
+
+        Raises:
+            alsaaudio.ALSAAudioError: 控制器已不存在
+        """
+        self.device_type = device_type
+        self.close()
+        self._db_ranges = {control: tuple(limits[control]) for control in controls if control in limits}
+        for control in controls:
+            name, index = control.rsplit(",", 1)
+            self._mixers[control] = alsaaudio.Mixer(name, id=int(index), **self._mixer_kwargs())
+
+    def limits(self):
+        """
+        Returns:
+            dict: {control: [min_db, max_db]}，写入缓存
+        """
+        return {control: list(limits) for control, limits in self._db_ranges.items()}
+
+    def db_range(self, control):
+        """
+        Returns:
+            tuple: 控制器的 (min_db, max_db)，不支持 dB 时返回 None
+        """
+        return self._db_ranges.get(control)
+
+    def close(self):
+        """关闭所有混音器句柄，检测结果不再使用时调用"""
+        with self._lock:
+            mixers = list(self._mixers.values())
+            self._mixers.clear()
+            self._db_ranges.clear()
+        for mixer in mixers:
+            try:
+                mixer.close()
+            except alsaaudio.ALSAAudioError:
+                pass
+
+    def _sync(self, mixer):
+        # 处理混音器事件，取得其他进程修改后的最新值
+        try:
+            mixer.handleevents()
+        except (AttributeError, alsaaudio.ALSAAudioError):
+            pass
+
+    def get(self, control):
+        with self._lock:
+            mixer = self._mixers.get(control)
+            if mixer is None:
+                return None
+            self._sync(mixer)
+            if control in self._db_ranges:
+                return (mixer.getvolume(units=alsaaudio.VOLUME_UNITS_DB)[0] / 100.0, True)
+            return (mixer.getvolume()[0], False)
+
+    def step(self, control, direction, steps=1):
+        with self._lock:
+            mixer = self._mixers.get(control)
+            if mixer is None:
+                return None
+            result = self.get(control)
+            current, is_db = result
+            sign = 1 if direction == "up" else -1
+
+            if not is_db:
+                target = max(0, min(100, current + sign * STEP_PERCENT * steps))
+                if target != current:
+                    mixer.setvolume(target)
+                return (target, False)
+
+            if direction == "down" and current <= MIN_DB:
+                LOGGER.info(f"🔇 Already at minimum {MIN_DB}dB")
+                return result
+
+            low, high = self._db_ranges[control]
+            low = max(low, MIN_DB)
+            target = current + sign * STEP_DB * (steps - 1)
+            # 控制器的 dB 步进可能比 STEP_DB 粗，设置后读回，没有变化就再走一步
+            for _ in range(3):
+                target = max(low, min(high, target + sign * STEP_DB))
+                mixer.setvolume(int(round(target * 100)), units=alsaaudio.VOLUME_UNITS_DB)
+                value = mixer.getvolume(units=alsaaudio.VOLUME_UNITS_DB)[0] / 100.0
+                if value != current or target in (low, high):
+                    return (value, True)
+            return (value, True)
+
+    def toggle_mute(self, control):
+        with self._lock:
+            mixer = self._mixers.get(control)
+            if mixer is None:
+                return None
+            self._sync(mixer)
+            try:
+                muted = any(mixer.getmute())
+            except alsaaudio.ALSAAudioError:
+                return None  # 控制器没有静音开关
+            mixer.setmute(0 if muted else 1)
+            return not muted
+
+    def get_mute(self, control):
+        """
+        Returns:
+            bool: 是否静音，控制器没有静音开关时返回 None
+        """
+        with self._lock:
+            mixer = self._mixers.get(control)
+            if mixer is None:
+                return None
+            self._sync(mixer)
+            try:
+                return any(mixer.getmute())
+            except alsaaudio.ALSAAudioError:
+                return None
+
+    def handle_events(self, control):
+        """处理控制器待处理的混音器事件（清除 poll 的可读状态）"""
+        with self._lock:
+            mixer = self._mixers.get(control)
+            if mixer is not None:
+                self._sync(mixer)
+
+    def polldescriptors(self):
+        """
+        混音器事件的文件描述符
+
+        Returns:
+            list: [(fd, eventmask, control), ...]
+        """
+        with self._lock:
+            return [(fd, mask, control)
+                    for control, mixer in self._mixers.items()
+                    for fd, mask in mixer.polldescriptors()]
+
+def _backends():
+    backends = [AmixerBackend()]
+    if ALSA_AVAILABLE:
+        backends.insert(0, AlsaMixerBackend())
+    return backends
+
+
+def _detect():
+    """
+    依次尝试各后端检测音量控制器
+
+    Returns:
+        tuple: (backend, device_type, controls)，未检测到时为 (None, None, [])
+    """
+    for backend in _backends():
+        try:
+            device_type, controls = backend.detect()
+        except Exception as e:
+            LOGGER.error(f"detect PCM controller with {backend.name} failed: {e}")
+            backend.close()
+            continue
+        if controls:
+            return backend, device_type, controls
+    return None, None, []
+
+
+def _apply(backend, device_type, controls):
+    global PCM_CONTROLS, DEVICE_TYPE, BACKEND
+    BACKEND = backend
+    DEVICE_TYPE = device_type
+    PCM_CONTROLS = list(controls)
+    for control in controls:
+        LOGGER.info(f"find controller: {control} ({backend.name})")
+
+
+def card_identity():
+    """
+    声卡身份：/proc/asound/cards 内容和 CARD 配置的摘要，声卡变化后缓存失效
+
+    Returns:
+        str: 摘要，无法读取时返回 None
+    """
+    try:
+        with open(CARDS_FILE, "rb") as f:
+            cards = f.read()
+    except OSError:
+        return None
+    return hashlib.sha1(f"{CARD}\n".encode() + cards).hexdigest()
+
+
+def _describe(identity, backend, device_type, controls):
+    """缓存条目，未检测到控制器时为 None"""
+    if backend is None:
+        return None
+    return {
+        "version": CACHE_VERSION,
+        "cards": identity,
+        "backend": backend.name,
+        "device_type": device_type,
+        "controls": list(controls),
+        "limits": backend.limits(),
+    }
+
+
+def _load_cache(path, identity):
+    """读取缓存，不存在、损坏或声卡不一致时返回 None"""
+    if identity is None:
+        return None
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        LOGGER.warning(f"read mixer cache {path} failed: {e}")
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION or entry.get("cards") != identity:
+        return None
+    return entry
+
+
+def _save_cache(path, entry):
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        LOGGER.warning(f"write mixer cache {path} failed: {e}")
+
+
+def _restore(entry):
+    """按缓存条目恢复后端，失败返回 None"""
+    for backend in _backends():
+        if backend.name != entry["backend"]:
+            continue
+        try:
+            backend.restore(entry["device_type"], entry["controls"], entry.get("limits", {}))
+        except Exception as e:
+            LOGGER.warning(f"restore mixer from cache failed: {e}")
+            backend.close()
+            return None
+        return backend
+    return None
+
+
+def detect_pcm_controls(cache_path=None, on_ready=None):
+    """
+    检测音量控制器并选择后端：优先 pyalsaaudio，不可用时使用 amixer
+
+    给出 cache_path 时不阻塞：检测结果按声卡身份缓存到磁盘，命中时立即恢复，
+    然后在后台线程重新检测校验，结果不同时替换并更新缓存；未命中时在后台检测。
+    后台检测完成前音量接口返回 None。
+
+    Args:
+        cache_path: 缓存文件路径，None 表示同步检测、不使用缓存
+        on_ready: 控制器可用或检测结果变化后的回调 on_ready()，可能在后台线程调用
+
+    Returns:
+        threading.Thread: 后台检测线程，同步检测时返回 None
+    """
+    if cache_path is None:
+        _apply(*_detect())
+        if on_ready is not None and PCM_CONTROLS:
+            on_ready()
+        return None
+
+    cache_path = str(cache_path)
+    identity = card_identity()
+    entry = _load_cache(cache_path, identity)
+    if entry is not None:
+        backend = _restore(entry)
+        if backend is None:
+            entry = None
+        else:
+            LOGGER.info(f"restore mixer controls from {cache_path}")
+            _apply(backend, entry["device_type"], entry["controls"])
+            if on_ready is not None:
+                on_ready()
+
+    thread = threading.Thread(target=_validate, args=(cache_path, identity, entry, on_ready),
+                              name="pcm-detect", daemon=True)
+    thread.start()
+    return thread
+
+
+def _validate(cache_path, identity, cached, on_ready):
+    """后台重新检测，与缓存不一致时替换当前后端并重写缓存"""
+    start = time.monotonic()
+    backend, device_type, controls = _detect()
+    LOGGER.info(f"detect PCM controls took {time.monotonic() - start:.3f}s")
+    entry = _describe(identity, backend, device_type, controls)
+    if entry == cached:
+        # 缓存有效，继续使用已恢复的后端，关闭重新检测打开的混音器句柄
+        if backend is not None:
+            backend.close()
+        return
+
+    if cached is not None:
+        LOGGER.info("mixer controls changed, replace cached result")
+    _apply(backend, device_type, controls)
+    if identity is not None and entry is not None:
+        _save_cache(cache_path, entry)
+    elif cached is not None:
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+    if on_ready is not None and (backend is not None or cached is not None):
+        try:
+            on_ready()
+        except Exception as e:
+            LOGGER.error(f"mixer on_ready callback failed: {e}")
+
 
 def db_to_volume(db):
     # convert dB value (-100 to 0) to 0-100 volume percentage
     return int((db - MIN_DB) * 100 / (0 - MIN_DB+4))
 
+def _to_percent(result):
+    value, is_db = result
+    # ALSA: 需要将 dB 转换为百分比；PulseAudio: 直接返回百分比
+    return db_to_volume(value) if is_db else value
+
 def get_current_volume(control):
     """
     获取当前音量
@@ -70,31 +553,12 @@ def get_current_volume(control):
                - value: dB值(ALSA) 或 百分比(PulseAudio)
                - is_db: True表示返回的是dB值，False表示返回的是百分比
     """
+    if BACKEND is None:
+        return None
     try:
-        if DEVICE_TYPE == "pulse":
-            out = subprocess.check_output(["amixer", "-D", "pulse", "get", control]).decode()
-        elif CARD == "default":
-            out = subprocess.check_output(["amixer", "get", control]).decode()
-        else:
-            out = subprocess.check_output(["amixer", "-c", CARD, "get", control]).decode()
-
-        # Try to match dB format first (ALSA)
-        match = re.search(r'\[(\-?\d+\.\d+)dB\]', out)
-        if match:
-            db = float(match.group(1))
-            volume = db_to_volume(db)
-            # LOGGER.info(f"[{control}] volume: {volume}% ({db}dB)")
-            return (db, True)
-
-        # If no dB format, try percentage format (PulseAudio)
-        match = re.search(r'\[(\d+)%\]', out)
-        if match:
-            percent = int(match.group(1))
-            # LOGGER.info(f"[{control}] volume: {percent}%")
-            return (percent, False)
-
+        return BACKEND.get(control)
     except Exception as e:
-        LOGGER.error("Failed to get volume:", e)
+        LOGGER.error(f"Failed to get volume: {e}")
     return None
 
 def get_volume_percent():
@@ -107,66 +571,54 @@ def get_volume_percent():
     if not PCM_CONTROLS:
         return None
 
+    # 监听混音器事件时缓存始终是最新的，无需读取
+    controller = _controller_instance
+    if controller is not None and controller.watching:
+        level = controller.level()
+        if level is not None:
+            return level
+
     # 获取第一个控制器的音量
-    control = PCM_CONTROLS[0]
-    result = get_current_volume(control)
+    result = get_current_volume(PCM_CONTROLS[0])
     if result is None:
         return None
-
-    value, is_db = result
-    if is_db:
-        # ALSA: 需要将 dB 转换为百分比
-        return db_to_volume(value)
-    else:
-        # PulseAudio: 直接返回百分比
-        return value
+    return _to_percent(result)
 
 
-def adjust_volume(direction):
+def adjust_volume(direction, steps=1):
     """
     调整音量
 
     Args:
         direction: "up" 或 "down"
+        steps: 步数
 
     Returns:
         int: 调整后的音量百分比，失败返回 None
     """
+    result = _step_all(direction, steps)
+    # 返回调整后的音量百分比（第一个控制器，与 get_volume_percent 一致）
+    return None if result is None else _to_percent(result)
+
+def _step_all(direction, steps):
+    """调节所有控制器，返回第一个控制器调整后的 (value, is_db)，失败返回 None"""
     # set volume for all detected PCM controllers
-    if not PCM_CONTROLS:
+    if not PCM_CONTROLS or BACKEND is None:
         LOGGER.warning("No PCM controls detected")
         return None
 
+    first = None
     for control in PCM_CONTROLS:
-        result = get_current_volume(control)
-        if result is None:
-            return None
-
-        current_value, is_db = result
-
-        # Check minimum volume for ALSA (dB mode)
-        if is_db and direction == "down" and current_value <= MIN_DB:
-            LOGGER.info(f"🔇 Already at minimum {MIN_DB}dB")
-            return db_to_volume(current_value)
-
         try:
-            if DEVICE_TYPE == "pulse":
-                # For PulseAudio, use percentage adjustment (e.g., "5%+")
-                delta = "5%+" if direction == "up" else "5%-"
-                subprocess.run(["amixer", "-D", "pulse", "set", control, delta], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            else:
-                # For ALSA, use dB adjustment
-                delta = STEP + "+" if direction == "up" else STEP + "-"
-                if CARD == "default":
-                    subprocess.run(["amixer", "set", control, delta], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                else:
-                    subprocess.run(["amixer", "-c", CARD, "set", control, delta], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            result = BACKEND.step(control, direction, steps)
         except Exception as e:
-            LOGGER.error(f"set {control} volume failed:", e)
+            LOGGER.error(f"set {control} volume failed: {e}")
             return None
-
-    # 返回调整后的音量百分比
-    return get_volume_percent()
+        if result is None:
+            return None
+        if first is None:
+            first = result
+    return first
 
 def toggle_mute():
     """
@@ -175,7 +627,7 @@ def toggle_mute():
     Returns:
         bool: 当前静音状态 (True=静音, False=取消静音)，失败返回 None
     """
-    if not PCM_CONTROLS:
+    if not PCM_CONTROLS or BACKEND is None:
         LOGGER.warning("No PCM controls detected")
         return None
 
@@ -183,30 +635,373 @@ def toggle_mute():
     mute_status = None
     for control in PCM_CONTROLS:
         try:
-            if DEVICE_TYPE == "pulse":
-                result = subprocess.run(["amixer", "-D", "pulse", "set", control, "toggle"],
-                                      capture_output=True, text=True)
-            elif CARD == "default":
-                result = subprocess.run(["amixer", "set", control, "toggle"],
-                                      capture_output=True, text=True)
-            else:
-                result = subprocess.run(["amixer", "-c", CARD, "set", control, "toggle"],
-                                      capture_output=True, text=True)
-
-            # 解析静音状态 [on] 或 [off]
-            if mute_status is None and result.stdout:
-                # 查找 [on] 或 [off] 标记
-                if "[off]" in result.stdout:
-                    mute_status = True  # off = 静音
-                elif "[on]" in result.stdout:
-                    mute_status = False  # on = 取消静音
-
+            status = BACKEND.toggle_mute(control)
         except Exception as e:
             LOGGER.error(f"Toggle mute for {control} failed: {e}")
             return None
-
-    # if mute_status is not None:
-    #     LOGGER.info(f"🔇 Mute: {mute_status}")
+        if mute_status is None:
+            mute_status = status
 
     return mute_status
 
+
+def use_backend(name):
+    """
+    强制使用指定后端并重新检测（基准测试和排查问题时使用）
+
+    Args:
+        name: "alsa" 或 "amixer"
+
+    Returns:
+        bool: 是否检测到控制器
+    """
+    global PCM_CONTROLS, DEVICE_TYPE, BACKEND
+    if name == "alsa" and not ALSA_AVAILABLE:
+        LOGGER.error("pyalsaaudio >= 0.10 is not installed")
+        return False
+    backend = AlsaMixerBackend() if name == "alsa" else AmixerBackend()
+    try:
+        DEVICE_TYPE, PCM_CONTROLS = backend.detect()
+    except Exception as e:
+        LOGGER.error(f"detect PCM controller with {backend.name} failed: {e}")
+        PCM_CONTROLS = []
+    BACKEND = backend if PCM_CONTROLS else None
+    return BACKEND is not None
+
+
+def _db_range():
+    """第一个控制器的 dB 范围（预测音量时使用），未知时返回 None"""
+    if BACKEND is None or not PCM_CONTROLS:
+        return None
+    return BACKEND.db_range(PCM_CONTROLS[0])
+
+
+def predict(result, steps, db_range=None):
+    """
+    预测调节 steps 步（负数为调低）后的音量
+
+    Args:
+        result: 当前 (value, is_db)
+        steps: 步数
+        db_range: 控制器的 (min_db, max_db)，与 step() 一样限制在范围内；
+                  未知时只限制下限 MIN_DB（很多控制器可以高于 0 dB）
+
+    Returns:
+        tuple: (value, is_db)
+    """
+    value, is_db = result
+    if is_db:
+        if steps < 0 and value <= MIN_DB:
+            return result
+        value += steps * STEP_DB
+        if db_range is None:
+            return (max(MIN_DB, value), True)
+        low, high = db_range
+        return (max(max(low, MIN_DB), min(high, value)), True)
+    return (max(0, min(100, value + steps * STEP_PERCENT)), False)
+
+
+class VolumeController:
+    """
+    合并音量调节的异步控制器
+
+    step() 在调用线程中只累加待调节的步数并立即返回预测的音量，
+    工作线程按 min_interval 限速把净变化一次写入混音器，写入后用真实值校正，
+    连续快速按键时每个间隔只写一次混音器。
+
+    watch() 开启后监听混音器事件，其他程序（shairport、Roon 等）修改的音量和静音状态
+    立即更新缓存并通过回调发布，读取音量不再访问混音器
+    """
+
+    def __init__(self, min_interval=0.05, stale_after=2.0, on_change=None, on_mute=None):
+        """
+        Args:
+            min_interval: 两次写入混音器的最小间隔（秒）
+            stale_after: 未监听事件时，缓存的音量超过该时间未更新则下次调节前重新读取
+            on_change: 音量变化回调 on_change(percent)，在工作线程或监听线程中调用
+            on_mute: 外部静音状态变化回调 on_mute(muted)，在监听线程中调用
+        """
+        self.min_interval = min_interval
+        self.stale_after = stale_after
+        self.on_change = on_change
+        self.on_mute = on_mute
+        self.watching = False  # 是否正在监听混音器事件
+        self.muted = None  # 缓存的静音状态，未监听时为 None
+        self._watcher = None
+        self._pending = 0  # 尚未写入的净步数
+        self._known = None  # 最近一次从混音器得到的 (value, is_db)
+        self._known_time = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.writes = 0  # 已写入混音器的次数
+
+    def step(self, direction):
+        """
+        调节一步音量（不阻塞）
+
+        Args:
+            direction: "up" 或 "down"
+
+        Returns:
+            int: 预测的音量百分比，无可用控制器时返回 None
+        """
+        with self._cond:
+            known = self._known
+            fresh = known is not None and (
+                self.watching or time.monotonic() - self._known_time < self.stale_after)
+        if not fresh:
+            # 首次调节或缓存过期时读取一次当前音量
+            known = get_current_volume(PCM_CONTROLS[0]) if PCM_CONTROLS else None
+            if known is None:
+                return None
+
+        with self._cond:
+            if not fresh:
+                self._known = known
+                self._known_time = time.monotonic()
+            self._pending += 1 if direction == "up" else -1
+            predicted = predict(self._known, self._pending, _db_range())
+            self._start()
+            self._cond.notify()
+        return _to_percent(predicted)
+
+    def level(self):
+        """
+        当前音量百分比（含尚未写入的调节），没有缓存时返回 None
+        """
+        with self._cond:
+            if self._known is None:
+                return None
+            return _to_percent(predict(self._known, self._pending, _db_range()))
+
+    def invalidate(self):
+        """音量被其他途径修改（静音切换、外部程序）后调用，下次调节前重新读取"""
+        with self._cond:
+            self._known_time = 0.0
+
+    def watch(self):
+        """
+        开始监听混音器事件（需要原生 ALSA 后端）
+
+        Returns:
+            bool: 是否开始监听
+        """
+        if self._watcher is not None:
+            return True
+        if not PCM_CONTROLS or not hasattr(BACKEND, "polldescriptors"):
+            LOGGER.info("mixer events unavailable, volume is read on demand")
+            return False
+        self._watcher = MixerWatcher(self)
+        if not self._watcher.start():
+            self._watcher = None
+            return False
+        return True
+
+    def reload(self):
+        """
+        控制器或后端变化后调用（detect_pcm_controls 的 on_ready）：
+        丢弃缓存的音量和静音状态，在新的后端上重新开始监听
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        with self._cond:
+            self._known = None
+            self._known_time = 0.0
+            self.muted = None
+        return self.watch()
+
+    def external_update(self, result, muted):
+        """
+        混音器事件：用最新的音量和静音状态更新缓存，有变化时发布（监听线程调用）
+
+        Args:
+            result: (value, is_db)，读取失败为 None
+            muted: 是否静音，没有静音开关为 None
+        """
+        percent = None
+        with self._cond:
+            if result is not None and result != self._known:
+                self._known = result
+                self._known_time = time.monotonic()
+                # 还有未写入的步数时由工作线程写入后统一校正
+                if self._pending == 0:
+                    percent = _to_percent(result)
+            # 首次读取只建立缓存，不发布
+            mute_changed = muted is not None and self.muted is not None and muted != self.muted
+            if muted is not None:
+                self.muted = muted
+
+        if mute_changed and self.on_mute is not None:
+            try:
+                self.on_mute(muted)
+            except Exception as e:
+                LOGGER.error(f"volume on_mute callback failed: {e}")
+        elif percent is not None and self.on_change is not None:
+            try:
+                self.on_change(percent)
+            except Exception as e:
+                LOGGER.error(f"volume on_change callback failed: {e}")
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="volume", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        last_write = 0.0
+        while True:
+            with self._cond:
+                while self._running and self._pending == 0:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                # 限速：距上次写入不足 min_interval 时继续累加
+                delay = last_write + self.min_interval - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                steps, self._pending = self._pending, 0
+
+            last_write = time.monotonic()
+            result = _step_all("up" if steps > 0 else "down", abs(steps))
+            self.writes += 1
+
+            with self._cond:
+                if result is not None:
+                    # 用混音器的真实值校正，期间新增的步数继续叠加在上面
+                    self._known = result
+                    self._known_time = time.monotonic()
+                percent = _to_percent(predict(self._known, self._pending, _db_range())) if self._known is not None else None
+
+            if percent is not None and self.on_change is not None:
+                try:
+                    self.on_change(percent)
+                except Exception as e:
+                    LOGGER.error(f"volume on_change callback failed: {e}")
+
+
+class MixerWatcher:
+    """
+    混音器事件监听线程
+
+    poll 混音器的 polldescriptors()，事件到达时读取第一个控制器的音量和静音状态，
+    交给 VolumeController.external_update()
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self._thread = None
+        self._wake_r, self._wake_w = os.pipe()  # 停止时唤醒 poll
+
+    def start(self):
+        try:
+            descriptors = BACKEND.polldescriptors()
+        except Exception as e:
+            LOGGER.error(f"get mixer poll descriptors failed: {e}")
+            self._close()
+            return False
+        if not descriptors:
+            self._close()
+            return False
+
+        # 先同步一次当前状态
+        self._refresh()
+        self.controller.watching = True
+        self._thread = threading.Thread(target=self._run, args=(descriptors,), name="mixer-watch", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._wake_w is None:
+            return  # 已经停止
+        self.controller.watching = False
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            if self._thread.is_alive():
+                # 线程仍在 poll 唤醒管道，关闭后描述符可能被复用，留给进程退出时回收
+                LOGGER.warning("mixer watcher did not exit, leave its wake pipe open")
+                self._wake_w = None
+                return
+            self._thread = None
+        self._close()
+
+    def _close(self):
+        """关闭唤醒管道（reload() 每次新建监听线程，不关闭会泄漏描述符）"""
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._wake_r = self._wake_w = None
+
+    def _refresh(self):
+        control = PCM_CONTROLS[0]
+        try:
+            result = BACKEND.get(control)
+            muted = BACKEND.get_mute(control)
+        except Exception as e:
+            LOGGER.error(f"read mixer state failed: {e}")
+            return
+        self.controller.external_update(result, muted)
+
+    def _run(self, descriptors):
+        poller = select.poll()
+        controls = {}
+        for fd, mask, control in descriptors:
+            poller.register(fd, mask)
+            controls[fd] = control
+        poller.register(self._wake_r, select.POLLIN)
+
+        while self.controller.watching:
+            try:
+                events = poller.poll()
+            except InterruptedError:
+                continue
+            changed = False
+            for fd, mask in events:
+                if fd == self._wake_r:
+                    return
+                if mask & (select.POLLERR | select.POLLHUP | select.POLLNVAL):
+                    # 声卡被移除，退回按需读取
+                    LOGGER.error(f"mixer {controls.get(fd)} lost, stop watching")
+                    self.controller.watching = False
+                    return
+                BACKEND.handle_events(controls[fd])
+                changed = True
+            if changed:
+                self._refresh()
+
+
+_controller_instance = None
+
+
+def get_volume_controller():
+    """
+    获取全局音量控制器单例
+
+    Returns:
+        VolumeController: 音量控制器实例
+    """
+    global _controller_instance
+    if _controller_instance is None:
+        _controller_instance = VolumeController()
+    return _controller_instance
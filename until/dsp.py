@@ -0,0 +1,645 @@
+"""
+音频信号处理工具
+
+SampleRing: 固定容量的 float32 环形缓冲区。
+捕获线程写入 int16 交错 PCM，原地混音为单声道（或保留各声道）并缩放到 [-1, 1)，
+数据在缓冲区中存两份（镜像），任意位置的窗口都是连续的视图，取窗口不复制；
+稳态下写入和取窗口都不分配数组。
+
+FFT 后端: 加窗、实数 FFT 和取幅度，窗口和输出都在预分配数组中原地计算。
+numpy 的 rfft 总是以 float64 计算；scipy.fft 对 float32 输入以单精度计算，并缓存 pocketfft 的计划。
+get_fft(size, "auto") 在首次使用时做一次简短的测速，选择当前 CPU 上最快的后端。
+
+频带: BandReducer 按对数频带取最大值（reduceat）；FilterBank 把 1/3 倍频程、mel、
+线性/对数混合等频带预先计算为权重矩阵（可叠加 A 计权），每次分析只做一次矩阵乘法。
+make_band_reducer() 按名称创建。多声道时输入为 (channels, bins)，输出为 (channels, count)。
+
+VUMeter: 按 VU 表和峰值表弹道平滑各声道的 RMS 和峰值电平。
+"""
+
+import math
+import time
+
+import numpy as np
+
+from until.log import LOGGER
+
+try:
+    import scipy.fft as scipy_fft
+
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    scipy_fft = None
+
+INT16_SCALE = 1.0 / 32768.0
+SQRT2 = math.sqrt(2.0)
+
+
+class SampleRing:
+    """float32 环形缓冲区（单写者）"""
+
+    def __init__(self, capacity, channels=2, chunk=1024, downmix=True):
+        """
+        Args:
+            capacity: 保留的最近样本数，决定可取窗口的最大长度
+            channels: 输入 PCM 的声道数
+            chunk: 每次混音的最大帧数，超过时分段处理
+            downmix: 是否混音为单声道；False 时保留各声道，窗口形状为 (size, channels)
+        """
+        self.capacity = int(capacity)
+        self.channels = int(channels)
+        self.downmix = downmix or self.channels == 1
+        shape = (self.capacity * 2,) if self.downmix else (self.capacity * 2, self.channels)
+        self._buf = np.zeros(shape, dtype=np.float32)  # 后半部分是前半部分的镜像
+        chunk = max(1, int(chunk))
+        self._frames = np.zeros((chunk, self.channels), dtype=np.float32)  # int16 转换暂存
+        self._mix = np.zeros(chunk, dtype=np.float32)  # 混音暂存
+        self._scale = np.float32(INT16_SCALE / self.channels if self.downmix else INT16_SCALE)
+        self._remainder = b""  # 上次不足一帧的尾部字节
+        self.written = 0  # 累计写入的样本数（单调递增，作为样本的绝对位置）
+
+    def clear(self):
+        """清空数据；written 继续递增，读取方记录的位置不会与新数据混淆"""
+        self._buf.fill(0.0)
+        self._remainder = b""
+
+    def write_pcm(self, raw):
+        """
+        写入 int16 小端交错 PCM
+
+        Args:
+            raw: bytes，alsaaudio PCM.read() 的数据
+
+        Returns:
+            int: 写入的样本（帧）数
+        """
+        frame_bytes = 2 * self.channels
+        if self._remainder:
+            raw = self._remainder + raw
+            self._remainder = b""
+        usable = len(raw) - len(raw) % frame_bytes
+        if usable != len(raw):
+            self._remainder = bytes(raw[usable:])
+        if usable == 0:
+            return 0
+
+        frames = np.frombuffer(raw, dtype=np.int16, count=usable // 2).reshape(-1, self.channels)
+        total = frames.shape[0]
+        step = self._mix.size
+        for start in range(0, total, step):
+            block = frames[start:start + step]
+            n = block.shape[0]
+            # 先转换到预分配的 float32 暂存再混音，避免 ufunc 混合类型运算时分配类型转换缓冲
+            converted = self._frames[:n]
+            np.copyto(converted, block, casting="unsafe")
+            if not self.downmix:
+                converted *= self._scale
+                self._store(converted)
+                continue
+            mix = self._mix[:n]
+            if self.channels == 1:
+                np.multiply(converted[:, 0], self._scale, out=mix)
+            elif self.channels == 2:
+                np.add(converted[:, 0], converted[:, 1], out=mix)
+                mix *= self._scale
+            else:
+                np.sum(converted, axis=1, out=mix)
+                mix *= self._scale
+            self._store(mix)
+        return total
+
+    def write(self, samples):
+        """写入 float32 样本，形状与窗口相同（单声道为一维，否则为 (n, channels)）"""
+        samples = np.asarray(samples, dtype=np.float32)
+        for start in range(0, len(samples), self.capacity):
+            self._store(samples[start:start + self.capacity])
+
+    def _store(self, samples):
+        n = len(samples)
+        cap = self.capacity
+        if n > cap:
+            samples = samples[-cap:]
+            self.written += n - cap
+            n = cap
+        pos = self.written % cap
+        first = min(n, cap - pos)
+        buf = self._buf
+        buf[pos:pos + first] = samples[:first]
+        buf[pos + cap:pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            buf[:rest] = samples[first:]
+            buf[cap:cap + rest] = samples[first:]
+        self.written += n
+
+    def available(self, end=None):
+        """截止到 end（绝对位置，默认最新）仍保留在缓冲区中的样本数"""
+        end = self.written if end is None else end
+        return max(0, min(end, self.capacity - (self.written - end)))
+
+    def window(self, size, end=None):
+        """
+        取长度为 size、截止到绝对位置 end 的窗口（只读视图，不复制）
+
+        视图在下一次写入覆盖对应位置前有效，需要跨写入保留时调用方自行复制。
+
+        Args:
+            size: 窗口长度，不超过 capacity
+            end: 窗口结束的绝对位置，默认最新样本
+
+        Returns:
+            np.ndarray: float32 视图，未混音时形状为 (size, channels)，数据不足时返回 None
+        """
+        end = self.written if end is None else end
+        if size > self.capacity or end > self.written or self.available(end) < size:
+            return None
+        stop = (end - 1) % self.capacity + 1 + self.capacity
+        view = self._buf[stop - size:stop]
+        view.flags.writeable = False
+        return view
+
+
+def log_band_edges(freq_axis, count, min_frequency, max_frequency=None):
+    """
+    对数分布的频带边界（FFT 频点下标）
+
+    Args:
+        freq_axis: rfftfreq 频率轴
+        count: 频带数
+        min_frequency: 最低频率
+        max_frequency: 最高频率，默认奈奎斯特频率
+
+    Returns:
+        np.ndarray: count + 1 个单调不减的下标，相邻频带至少相差一个频点（到达末尾时除外）
+    """
+    last = len(freq_axis) - 1
+    nyquist = float(freq_axis[-1])
+    start_freq = max(10.0, min(min_frequency, nyquist))
+    end_freq = max(start_freq + 10, nyquist if max_frequency is None else min(max_frequency, nyquist))
+
+    try:
+        freq_edges = np.geomspace(start_freq, end_freq, count + 1)
+    except ValueError:
+        freq_edges = np.linspace(start_freq, end_freq, count + 1)
+
+    freq_edges = np.clip(freq_edges, 0, nyquist)
+    indices = np.clip(np.searchsorted(freq_axis, freq_edges), 0, last)
+
+    edges = indices.tolist()
+    for i in range(1, len(edges)):
+        if edges[i] <= edges[i - 1]:
+            edges[i] = min(last, edges[i - 1] + 1)
+    return np.asarray(edges, dtype=np.intp)
+
+
+class BandReducer:
+    """
+    频带聚合
+
+    一次 np.maximum.reduceat 求出每个频带的最大幅度，
+    只对聚合后的频带取对数并映射到 [0, 1]，输出写入预分配数组
+    """
+
+    def __init__(self, edges, db_floor, db_ceiling, gain_db=0.0, reference=1.0, weights=None, channels=1):
+        """
+        Args:
+            edges: 频带边界下标（log_band_edges 的结果），频带 i 为 [edges[i], edges[i + 1])，至少包含一个频点
+            db_floor: 映射为 0 的电平
+            db_ceiling: 映射为 1 的电平
+            gain_db: 增益
+            reference: 幅度参考值（满幅正弦的 FFT 幅度），幅度先除以它再取 dB
+            weights: 每个频点的幅度计权（如 A 计权），None 表示不计权
+            channels: 声道数，大于 1 时输入为 (channels, bins)
+        """
+        edges = np.asarray(edges, dtype=np.intp)
+        self.count = len(edges) - 1
+        self.channels = int(channels)
+        self._starts = edges[:-1].copy()
+        self._stop = int(max(edges[-1], edges[-2] + 1)) if self.count else 0
+        self._weights = None if weights is None else np.asarray(weights, dtype=np.float32)[:self._stop]
+        self._floor_amp = 1e-7 * reference  # 对应 -140 dB
+        # level = 20*log10(m / reference) + gain；norm = (level - floor) / (ceiling - floor)
+        span = db_ceiling - db_floor
+        self._scale = np.float32(20.0 / span)
+        self._offset = np.float32((gain_db - db_floor - 20.0 * np.log10(reference)) / span)
+        shape = () if self.channels == 1 else (self.channels,)
+        self._bands = np.zeros(shape + (self.count,), dtype=np.float32)
+        self._weighted = None if weights is None else np.zeros(shape + (self._stop,), dtype=np.float32)
+
+    def __call__(self, magnitude, out=None):
+        """
+        Args:
+            magnitude: FFT 幅度谱，多声道时为 (channels, bins)
+            out: 输出数组，默认使用内部缓冲区（下次调用会覆盖）
+
+        Returns:
+            np.ndarray: 每个频带 0~1 的电平，多声道时为 (channels, count)
+        """
+        out = self._bands if out is None else out
+        if self.count == 0:
+            return out
+        magnitude = magnitude[..., :self._stop]
+        if self._weights is not None:
+            magnitude = np.multiply(magnitude, self._weights, out=self._weighted)
+        np.maximum.reduceat(magnitude, self._starts, axis=-1, out=out)
+        np.maximum(out, self._floor_amp, out=out)
+        np.log10(out, out=out)
+        out *= self._scale
+        out += self._offset
+        np.clip(out, 0.0, 1.0, out=out)
+        return out
+
+
+class NumpyFFT:
+    """np.fft.rfft（float64）"""
+
+    name = "numpy"
+
+    def __init__(self, size, window=None, channels=1):
+        """
+        Args:
+            size: FFT 长度
+            window: 窗函数，默认 Hann 窗
+            channels: 声道数，多声道时一次调用批量计算
+        """
+        self.size = int(size)
+        self.channels = int(channels)
+        self.window = (np.hanning(self.size) if window is None else np.asarray(window)).astype(np.float32)
+        shape = () if self.channels == 1 else (self.channels,)
+        self._windowed = np.zeros(shape + (self.size,), dtype=np.float32)
+        self._magnitude = np.zeros(shape + (self.size // 2 + 1,), dtype=np.float32)
+
+    def _rfft(self, samples):
+        return np.fft.rfft(samples, axis=-1)
+
+    def magnitude(self, frame):
+        """
+        加窗后的幅度谱
+
+        Args:
+            frame: float32 样本（不会被修改），单声道长度为 size，多声道形状为 (size, channels)
+
+        Returns:
+            np.ndarray: 幅度，单声道 size // 2 + 1 个，多声道形状为 (channels, size // 2 + 1)；
+                        内部缓冲区，下次调用会覆盖
+        """
+        np.multiply(frame.T, self.window, out=self._windowed)
+        np.abs(self._rfft(self._windowed), out=self._magnitude, casting="same_kind")
+        return self._magnitude
+
+
+class ScipyFFT(NumpyFFT):
+    """scipy.fft.rfft（float32 输入以单精度计算，计划由 scipy 缓存）"""
+
+    name = "scipy"
+
+    def __init__(self, size, window=None, channels=1, workers=1):
+        """
+        Args:
+            workers: 并行线程数，-1 为全部 CPU；小尺寸 FFT 多线程通常更慢
+        """
+        if not SCIPY_AVAILABLE:
+            raise RuntimeError("scipy is not installed")
+        super().__init__(size, window, channels)
+        self.workers = workers
+
+    def _rfft(self, samples):
+        # 加窗缓冲区每次都会重新写入，允许 scipy 覆盖输入
+        return scipy_fft.rfft(samples, axis=-1, workers=self.workers, overwrite_x=True)
+
+
+FFT_BACKENDS = {
+    "numpy": NumpyFFT,
+    "scipy": ScipyFFT,
+}
+
+_calibrated = {}  # size -> 测速选出的后端名称
+
+
+def available_fft_backends():
+    """当前环境可用的 FFT 后端名称"""
+    return [name for name in FFT_BACKENDS if name != "scipy" or SCIPY_AVAILABLE]
+
+
+def calibrate_fft(size, duration=0.05, **options):
+    """
+    测量各后端在当前 CPU 上的耗时
+
+    Args:
+        size: FFT 长度
+        duration: 每个后端大约测量的时间（秒）
+
+    Returns:
+        dict: {name: 每次耗时（秒）}
+    """
+    frame = np.random.default_rng(0).standard_normal(size).astype(np.float32)
+    timings = {}
+    for name in available_fft_backends():
+        backend = FFT_BACKENDS[name](size, **options)
+        backend.magnitude(frame)  # 预热，建立计划
+        rounds = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < duration or rounds < 8:
+            backend.magnitude(frame)
+            rounds += 1
+            elapsed = time.perf_counter() - start
+        timings[name] = elapsed / rounds
+    return timings
+
+
+def get_fft(size, backend="auto", window=None, channels=1, workers=1):
+    """
+    创建 FFT 后端
+
+    Args:
+        size: FFT 长度
+        backend: "auto"、"numpy" 或 "scipy"；auto 按测速结果选择，同一长度只测一次
+        window: 窗函数，默认 Hann 窗
+        channels: 声道数
+        workers: scipy 的并行线程数
+
+    Returns:
+        NumpyFFT: FFT 后端实例
+    """
+    if backend not in FFT_BACKENDS or backend not in available_fft_backends():
+        if backend != "auto":
+            LOGGER.warning(f"FFT backend {backend} unavailable, choose automatically")
+        backend = _calibrated.get(size)
+        if backend is None:
+            timings = calibrate_fft(size)
+            backend = min(timings, key=timings.get)
+            _calibrated[size] = backend
+            LOGGER.info(
+                f"FFT backend for size {size}: {backend} ("
+                + ", ".join(f"{name} {t * 1e6:.0f}us" for name, t in timings.items()) + ")"
+            )
+    if backend == "scipy":
+        return ScipyFFT(size, window, channels, workers=workers)
+    return FFT_BACKENDS[backend](size, window, channels)
+
+
+BANDINGS = ("log", "octave", "mel", "hybrid")
+
+HYBRID_CORNER = 500.0  # 线性/对数混合频带的转折频率（Hz），以下线性分布，以上对数分布
+
+
+def a_weighting(freqs):
+    """
+    IEC 61672 A 计权（幅度增益，1 kHz 处为 1）
+
+    Args:
+        freqs: 频率（Hz）
+
+    Returns:
+        np.ndarray: 幅度增益
+    """
+    f2 = np.asarray(freqs, dtype=np.float64) ** 2
+    num = (12194.0 ** 2) * f2 ** 2
+    den = (f2 + 20.6 ** 2) * np.sqrt((f2 + 107.7 ** 2) * (f2 + 737.9 ** 2)) * (f2 + 12194.0 ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gain = np.where(den > 0, num / den, 0.0)
+    return gain * 10 ** (2.0 / 20)  # 归一化到 1 kHz 处 0 dB（+2.0 dB）
+
+
+def hz_to_mel(freq):
+    return 2595.0 * np.log10(1.0 + np.asarray(freq, dtype=np.float64) / 700.0)
+
+
+def mel_to_hz(mel):
+    return 700.0 * (10 ** (np.asarray(mel, dtype=np.float64) / 2595.0) - 1.0)
+
+
+def octave_band_edges(min_frequency, max_frequency, fraction=3):
+    """
+    ISO 266 / IEC 61260 分数倍频程频带（以 1 kHz 为基准，以 2 为底）
+
+    Args:
+        min_frequency: 最低中心频率
+        max_frequency: 最高中心频率
+        fraction: 每倍频程的频带数，3 为 1/3 倍频程
+
+    Returns:
+        np.ndarray: (count, 2) 的频带上下限（Hz）
+    """
+    # 标称频率是取整后的值（如 20 kHz 实际为 20.16 kHz），留一点余量
+    lowest = int(np.ceil(fraction * np.log2(min_frequency / 1000.0) - 0.05))
+    highest = int(np.floor(fraction * np.log2(max_frequency / 1000.0) + 0.05))
+    centers = 1000.0 * 2.0 ** (np.arange(lowest, highest + 1) / fraction)
+    half = 2.0 ** (1.0 / (2 * fraction))
+    return np.stack((centers / half, centers * half), axis=1)
+
+
+def hybrid_band_edges(count, min_frequency, max_frequency, corner=HYBRID_CORNER):
+    """
+    线性/对数混合频带：转折频率以下按线性、以上按对数等分（在连续的弯曲频率轴上均分）
+
+    Returns:
+        np.ndarray: count + 1 个频带边界（Hz）
+    """
+    def warp(f):
+        f = np.asarray(f, dtype=np.float64)
+        return np.where(f < corner, f / corner, 1.0 + np.log(np.maximum(f, 1e-9) / corner))
+
+    def unwarp(w):
+        return np.where(w < 1.0, w * corner, corner * np.exp(w - 1.0))
+
+    return unwarp(np.linspace(warp(min_frequency), warp(max_frequency), count + 1))
+
+
+def rectangular_filterbank(freq_axis, bands):
+    """
+    矩形频带矩阵：频带内的频点权重为 1；比频点间隔还窄的频带取最近的频点
+
+    Args:
+        freq_axis: rfftfreq 频率轴
+        bands: (count, 2) 频带上下限（Hz）
+
+    Returns:
+        np.ndarray: (count, bins) float32 权重矩阵
+    """
+    freq_axis = np.asarray(freq_axis)
+    matrix = np.zeros((len(bands), len(freq_axis)), dtype=np.float32)
+    for i, (low, high) in enumerate(bands):
+        inside = (freq_axis >= low) & (freq_axis < high)
+        if inside.any():
+            matrix[i, inside] = 1.0
+        else:
+            matrix[i, np.argmin(np.abs(freq_axis - np.sqrt(low * high)))] = 1.0
+    return matrix
+
+
+def mel_filterbank(freq_axis, count, min_frequency, max_frequency):
+    """
+    三角形 mel 滤波器组，每个三角形峰值为 1；比频点间隔还窄的滤波器取最近的频点
+
+    Returns:
+        np.ndarray: (count, bins) float32 权重矩阵
+    """
+    freq_axis = np.asarray(freq_axis, dtype=np.float64)
+    points = mel_to_hz(np.linspace(hz_to_mel(min_frequency), hz_to_mel(max_frequency), count + 2))
+    matrix = np.zeros((count, len(freq_axis)), dtype=np.float32)
+    for i in range(count):
+        low, center, high = points[i:i + 3]
+        rising = (freq_axis - low) / (center - low)
+        falling = (high - freq_axis) / (high - center)
+        weights = np.maximum(0.0, np.minimum(rising, falling))
+        if weights.any():
+            matrix[i] = weights
+        else:
+            matrix[i, np.argmin(np.abs(freq_axis - center))] = 1.0
+    return matrix
+
+
+class FilterBank:
+    """
+    频带滤波器组
+
+    频带权重（以及可选的计权）预先合成为一个 (count, bins) 矩阵，
+    每次分析对功率谱做一次矩阵乘法得到各频带能量，只对频带取 dB 并映射到 [0, 1]
+    """
+
+    def __init__(self, matrix, db_floor, db_ceiling, gain_db=0.0, reference=1.0, weights=None, channels=1):
+        """
+        Args:
+            matrix: (count, bins) 频带权重
+            db_floor: 映射为 0 的电平
+            db_ceiling: 映射为 1 的电平
+            gain_db: 增益
+            reference: 幅度参考值，功率参考值为其平方
+            weights: 每个频点的幅度计权，合并进矩阵（功率乘以其平方）
+            channels: 声道数，大于 1 时输入为 (channels, bins)
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if weights is not None:
+            matrix = matrix * (np.asarray(weights, dtype=np.float32) ** 2)
+        self._matrix_t = np.ascontiguousarray(matrix.T)  # (bins, count)，功率谱右乘
+        self.count = matrix.shape[0]
+        self.channels = int(channels)
+        self._floor_power = (1e-7 * reference) ** 2
+        # level = 10*log10(p / reference^2) + gain
+        span = db_ceiling - db_floor
+        self._scale = np.float32(10.0 / span)
+        self._offset = np.float32((gain_db - db_floor - 20.0 * np.log10(reference)) / span)
+        shape = () if self.channels == 1 else (self.channels,)
+        self._power = np.zeros(shape + (matrix.shape[1],), dtype=np.float32)
+        self._bands = np.zeros(shape + (self.count,), dtype=np.float32)
+
+    def __call__(self, magnitude, out=None):
+        out = self._bands if out is None else out
+        np.square(magnitude, out=self._power)
+        np.matmul(self._power, self._matrix_t, out=out)
+        np.maximum(out, self._floor_power, out=out)
+        np.log10(out, out=out)
+        out *= self._scale
+        out += self._offset
+        np.clip(out, 0.0, 1.0, out=out)
+        return out
+
+
+def make_band_reducer(banding, freq_axis, count, min_frequency, db_floor, db_ceiling,
+                      gain_db=0.0, reference=1.0, weighting=False, channels=1, max_frequency=None):
+    """
+    按名称创建频带聚合
+
+    Args:
+        banding: "log"（对数频带取最大值）、"octave"（ISO 1/3 倍频程）、"mel"、"hybrid"（线性/对数混合）
+        freq_axis: rfftfreq 频率轴
+        count: 期望的频带数；octave 的频带数由频率范围决定，超过 count 时改用整倍频程
+        min_frequency: 最低频率
+        db_floor, db_ceiling, gain_db, reference: 见 BandReducer
+        weighting: 是否叠加 A 计权
+        channels: 声道数
+        max_frequency: 最高频率，默认奈奎斯特频率（octave 最高到 20 kHz）
+
+    Returns:
+        BandReducer 或 FilterBank，count 属性为实际频带数
+    """
+    nyquist = float(freq_axis[-1])
+    low = max(10.0, min(min_frequency, nyquist))
+    high = nyquist if max_frequency is None else min(max_frequency, nyquist)
+    weights = a_weighting(freq_axis) if weighting else None
+    options = dict(db_floor=db_floor, db_ceiling=db_ceiling, gain_db=gain_db,
+                   reference=reference, weights=weights, channels=channels)
+
+    if banding == "octave":
+        bands = octave_band_edges(low, min(high, 20000.0), 3)
+        if len(bands) > count:
+            bands = octave_band_edges(low, min(high, 20000.0), 1)
+        matrix = rectangular_filterbank(freq_axis, bands)
+    elif banding == "mel":
+        matrix = mel_filterbank(freq_axis, count, low, high)
+    elif banding == "hybrid":
+        edges = hybrid_band_edges(count, low, high)
+        matrix = rectangular_filterbank(freq_axis, np.stack((edges[:-1], edges[1:]), axis=1))
+    else:
+        if banding != "log":
+            LOGGER.warning(f"unknown banding {banding}, use log")
+        return BandReducer(log_band_edges(freq_axis, count, min_frequency, max_frequency), **options)
+    return FilterBank(matrix, **options)
+
+
+class VUMeter:
+    """
+    VU 表弹道
+
+    VU: RMS 电平经一阶平滑，阶跃输入约 300 ms 达到 99%（IEC 60268-17），上升和回落对称；
+    峰值: 瞬时上升，按固定速率回落（IEC 60268-10 I 型：1.7 s 回落 20 dB）。
+    电平以 dBFS 计算，映射到 [floor_db, 0] -> [0, 1] 供显示。
+    状态在预分配数组中原地更新，采集线程每个 period 调用也不分配数组。
+    """
+
+    def __init__(self, channels=2, integration=0.3, peak_fallback=20.0 / 1.7, floor_db=-48.0):
+        """
+        Args:
+            channels: 声道数
+            integration: VU 积分时间（秒），阶跃达到 99% 的时间
+            peak_fallback: 峰值回落速率（dB/s）
+            floor_db: 显示下限
+        """
+        self.channels = channels
+        self.tau = integration / math.log(100.0)
+        self.peak_fallback = peak_fallback
+        self.floor_db = floor_db
+        self._rms = np.zeros(channels, dtype=np.float64)  # 平滑后的 RMS（线性）
+        self.vu_db = np.full(channels, floor_db)
+        self.peak_db = np.full(channels, floor_db)
+        self._tmp = np.zeros(channels, dtype=np.float64)
+
+    def reset(self):
+        self._rms.fill(0.0)
+        self.vu_db.fill(self.floor_db)
+        self.peak_db.fill(self.floor_db)
+
+    def update(self, rms, peak, dt):
+        """
+        输入一段音频的电平
+
+        Args:
+            rms: 各声道 RMS（线性，满幅为 1）
+            peak: 各声道峰值（线性）
+            dt: 这段音频的时长（秒）
+        """
+        alpha = 1.0 - math.exp(-dt / self.tau)
+        tmp = self._tmp
+        np.subtract(rms, self._rms, out=tmp)
+        tmp *= alpha
+        self._rms += tmp
+        # 正弦波 RMS 比峰值低 3 dB，按 VU 表惯例补偿，满幅正弦读数为 0 dB
+        np.multiply(self._rms, SQRT2, out=tmp)
+        self._to_db(tmp, self.vu_db)
+        self.peak_db -= self.peak_fallback * dt
+        self._to_db(peak, tmp)
+        np.maximum(self.peak_db, tmp, out=self.peak_db)
+
+    def _to_db(self, value, out):
+        np.maximum(value, 1e-9, out=out)
+        np.log10(out, out=out)
+        out *= 20.0
+        np.maximum(out, self.floor_db, out=out)
+        return out
+
+    def unit(self, db):
+        """dBFS 映射到 [0, 1]"""
+        return np.clip((np.asarray(db) - self.floor_db) / -self.floor_db, 0.0, 1.0)
@@ -0,0 +1,330 @@
+"""
+按键手势引擎
+
+由输入事件流和定时调度器共同驱动，识别按键手势：
+
+    press       按下
+    release     松开（带按住时长）
+    longpress   按住超过阈值，由定时器触发，不依赖内核自动重复（value == 2）
+    repeat      按住后按递减间隔重复触发（加速），同样由定时器驱动
+    double_tap  短时间内连续按下两次
+    chord       多个功能键同时按下
+
+手势以功能键 (category, action) 为单位，同一功能绑定的多个按键（键盘、手柄、HAT）等价。
+feed() 由 KeyListener 在主线程中调用，定时器由主循环的 Scheduler 执行，无需加锁。
+
+Examples:
+    gestures = get_gesture_engine()
+    gestures.on("repeat", keymap.nav_up, lambda g: scroll(-1), owner=self)
+    gestures.on("chord", [keymap.action_select, keymap.action_cancel], self.exit, owner=self)
+    gestures.off(owner=self)
+"""
+
+from evdev import ecodes
+
+from until.clock import now as clock_now
+from until.keymap import get_keymap
+from until.log import LOGGER
+from until.scheduler import get_scheduler
+
+PRESS = "press"
+RELEASE = "release"
+LONGPRESS = "longpress"
+REPEAT = "repeat"
+DOUBLE_TAP = "double_tap"
+CHORD = "chord"
+
+GESTURES = (PRESS, RELEASE, LONGPRESS, REPEAT, DOUBLE_TAP, CHORD)
+
+
+class Gesture:
+    """识别出的手势"""
+
+    __slots__ = ("type", "action", "time", "duration", "count")
+
+    def __init__(self, type, action, time, duration=0.0, count=0):
+        self.type = type  # 手势类型
+        self.action = action  # (category, action)，chord 为 frozenset
+        self.time = time  # 触发时间（帧时钟）
+        self.duration = duration  # 距按下的时长
+        self.count = count  # repeat 的次数
+
+    def __repr__(self):
+        return f"Gesture({self.type}, {self.action}, duration={self.duration:.3f}, count={self.count})"
+
+
+class Subscription:
+    """手势订阅"""
+
+    __slots__ = ("gesture", "actions", "callback", "owner", "options", "active")
+
+    def __init__(self, gesture, actions, callback, owner, options):
+        self.gesture = gesture
+        self.actions = actions  # frozenset((category, action), ...)
+        self.callback = callback
+        self.owner = owner
+        self.options = options
+        self.active = False  # chord 是否已触发，松开任意一个键后复位
+
+
+def _action_of(target):
+    """KeyList（keymap.nav_up 等）或 (category, action) 转换为功能键"""
+    if isinstance(target, tuple):
+        return target
+    action = getattr(target, "action", None)
+    if action is None:
+        raise ValueError(f"gesture target must be a keymap key or (category, action): {target!r}")
+    return action
+
+
+class GestureEngine:
+    """按键手势引擎"""
+
+    def __init__(self, keymap=None, scheduler=None, clock=clock_now,
+                 longpress=None, repeat_delay=0.4, repeat_interval=0.15,
+                 repeat_min_interval=0.03, repeat_accel=0.8, double_tap=0.3, chord_window=None):
+        """
+        Args:
+            keymap: 按键映射，默认全局单例
+            scheduler: 定时调度器，默认全局单例
+            clock: 时间函数，默认取帧时钟
+            longpress: 长按阈值（秒），默认取 keymap 配置
+            repeat_delay: 按下后开始重复的延迟
+            repeat_interval: 首次重复间隔
+            repeat_min_interval: 加速后的最小重复间隔
+            repeat_accel: 每次重复后间隔乘以该系数
+            double_tap: 双击的最大间隔
+            chord_window: 组合键所有键按下的最大时间跨度，None 表示只要求同时按住
+        """
+        self.keymap = get_keymap() if keymap is None else keymap
+        self.scheduler = get_scheduler() if scheduler is None else scheduler
+        self.clock = clock
+        self.defaults = {
+            "threshold": longpress,
+            "delay": repeat_delay,
+            "interval": repeat_interval,
+            "min_interval": repeat_min_interval,
+            "accel": repeat_accel,
+            "window": double_tap,
+            "chord_window": chord_window,
+        }
+        self._subscriptions = {gesture: {} for gesture in GESTURES}  # gesture -> {action: [Subscription]}
+        self._chords = []  # chord 订阅
+        self._held = {}  # action -> 按下时间
+        self._sources = {}  # (type, code) -> 该按键按住的功能键
+        self._timers = {}  # action -> [TimerHandle]
+        self._last_press = {}  # action -> 上次按下时间，用于双击
+
+    # ------------------------------------------------------------------ #
+    # 订阅
+
+    def on(self, gesture, target, callback, owner=None, **options):
+        """
+        订阅手势
+
+        Args:
+            gesture: 手势类型（press/release/longpress/repeat/double_tap/chord）
+            target: keymap 按键（如 keymap.nav_up）或 (category, action)；
+                    chord 为它们的列表
+            callback: callback(gesture: Gesture)
+            owner: 订阅者，用于 off(owner=...) 批量取消；
+                   同一 owner 对同一手势和按键重复订阅时替换旧的订阅
+            **options: 覆盖默认参数
+                longpress: threshold
+                repeat: delay, interval, min_interval, accel
+                double_tap: window
+                chord: chord_window
+
+        Returns:
+            Subscription
+        """
+        if gesture not in self._subscriptions:
+            raise ValueError(f"unknown gesture: {gesture}")
+
+        if gesture == CHORD:
+            actions = frozenset(_action_of(t) for t in target)
+        else:
+            actions = frozenset((_action_of(target),))
+
+        def replaced(old):
+            return owner is not None and old.owner is owner and old.actions == actions
+
+        sub = Subscription(gesture, actions, callback, owner, {**self.defaults, **options})
+        if gesture == CHORD:
+            self._chords = [old for old in self._chords if not replaced(old)]
+            self._chords.append(sub)
+        else:
+            action, = actions
+            by_action = self._subscriptions[gesture]
+            by_action[action] = [old for old in by_action.get(action, ()) if not replaced(old)]
+            by_action[action].append(sub)
+        return sub
+
+    def off(self, callback=None, owner=None):
+        """
+        取消订阅
+
+        Args:
+            callback: 取消该回调（或 Subscription）的全部订阅
+            owner: 取消该订阅者的全部订阅
+        """
+        def keep(sub):
+            return not (sub is callback or sub.callback == callback or
+                        (owner is not None and sub.owner is owner))
+
+        for by_action in self._subscriptions.values():
+            for action, subs in list(by_action.items()):
+                subs = [sub for sub in subs if keep(sub)]
+                if subs:
+                    by_action[action] = subs
+                else:
+                    del by_action[action]
+        self._chords = [sub for sub in self._chords if keep(sub)]
+
+    # ------------------------------------------------------------------ #
+    # 输入
+
+    def feed(self, evt):
+        """
+        输入一个按键事件（注册为 KeyListener 的主线程回调）
+
+        Args:
+            evt: evdev.InputEvent
+        """
+        if evt.type == ecodes.EV_KEY:
+            if evt.value == 2:
+                return  # 长按和重复由定时器驱动，忽略内核自动重复
+            pressed = evt.value == 1
+        elif evt.type == ecodes.EV_ABS:
+            pressed = evt.value != 0
+        else:
+            return
+
+        source = (evt.type, evt.code)
+        now = self.clock()
+        held = self._sources.pop(source, None)
+        if held:
+            # 松开，或者轴从一侧直接拨到另一侧
+            self._release(held, now)
+        if pressed:
+            actions = self.keymap.actions(evt)
+            if actions:
+                self._sources[source] = actions
+                self._press(actions, now)
+
+    def is_held(self, target):
+        """功能键当前是否按住"""
+        return _action_of(target) in self._held
+
+    def reset(self):
+        """松开所有按键并取消定时器（切换屏幕、设备断开时调用）"""
+        for handles in self._timers.values():
+            for handle in handles:
+                handle.cancel()
+        self._timers.clear()
+        self._held.clear()
+        self._sources.clear()
+        for sub in self._chords:
+            sub.active = False
+
+    # ------------------------------------------------------------------ #
+
+    def _press(self, actions, now):
+        for action in actions:
+            if action in self._held:
+                continue  # 同一功能的另一个按键已按住
+            self._held[action] = now
+            self._emit(PRESS, action, Gesture(PRESS, action, now))
+
+            last = self._last_press.get(action)
+            tapped = False
+            for sub in self._subscriptions[DOUBLE_TAP].get(action, ()):
+                if last is not None and now - last <= sub.options["window"]:
+                    tapped = True
+                    self._call(sub, Gesture(DOUBLE_TAP, action, now, now - last))
+            if tapped:
+                # 双击后重新计数，连按三次只触发一次
+                self._last_press.pop(action, None)
+            else:
+                self._last_press[action] = now
+
+            timers = []
+            for sub in self._subscriptions[LONGPRESS].get(action, ()):
+                threshold = sub.options["threshold"]
+                if threshold is None:
+                    threshold = self.keymap.longpress_threshold
+                timers.append(self.scheduler.call_at(now + threshold, self._on_longpress, sub, action, now))
+            for sub in self._subscriptions[REPEAT].get(action, ()):
+                timers.append(self.scheduler.call_at(
+                    now + sub.options["delay"], self._on_repeat, sub, action, now, 1, sub.options["interval"]))
+            if timers:
+                self._timers[action] = timers
+
+        for sub in self._chords:
+            if sub.active or not sub.actions <= self._held.keys():
+                continue
+            window = sub.options["chord_window"]
+            first = min(self._held[action] for action in sub.actions)
+            if window is None or now - first <= window:
+                sub.active = True
+                self._call(sub, Gesture(CHORD, sub.actions, now, now - first))
+
+    def _release(self, actions, now):
+        for action in actions:
+            pressed_at = self._held.pop(action, None)
+            if pressed_at is None:
+                continue
+            for handle in self._timers.pop(action, ()):
+                handle.cancel()
+            self._emit(RELEASE, action, Gesture(RELEASE, action, now, now - pressed_at))
+            for sub in self._chords:
+                if action in sub.actions:
+                    sub.active = False
+
+    def _on_longpress(self, sub, action, pressed_at):
+        if self._held.get(action) != pressed_at:
+            return
+        now = self.clock()
+        self._call(sub, Gesture(LONGPRESS, action, now, now - pressed_at))
+
+    def _on_repeat(self, sub, action, pressed_at, count, interval):
+        if self._held.get(action) != pressed_at:
+            return
+        now = self.clock()
+        self._call(sub, Gesture(REPEAT, action, now, now - pressed_at, count))
+
+        # 回调中可能已经松开或取消订阅
+        timers = self._timers.get(action)
+        if timers is None or self._held.get(action) != pressed_at:
+            return
+        timers[:] = [handle for handle in timers if not handle.cancelled]  # 丢弃已执行的句柄
+        options = sub.options
+        next_interval = max(options["min_interval"], interval * options["accel"])
+        timers.append(self.scheduler.call_at(
+            now + interval, self._on_repeat, sub, action, pressed_at, count + 1, next_interval))
+
+    def _emit(self, gesture, action, event):
+        for sub in self._subscriptions[gesture].get(action, ()):
+            self._call(sub, event)
+
+    def _call(self, sub, event):
+        try:
+            sub.callback(event)
+        except Exception as e:
+            LOGGER.error(f"gesture: {event.type} callback {sub.callback!r} failed: {e}")
+
+
+_gesture_instance = None
+
+
+def get_gesture_engine():
+    """
+    获取全局手势引擎单例
+
+    Returns:
+        GestureEngine: 手势引擎实例
+    """
+    global _gesture_instance
+    if _gesture_instance is None:
+        _gesture_instance = GestureEngine()
+    return _gesture_instance
@@ -5,10 +5,86 @@
 
 import os
 import json
+import time
 from evdev import ecodes
 from until.log import LOGGER
 from until.resource import get_resource_path
 
+_NO_ACTIONS = frozenset()
+
+
+class KeyList(list):
+    """
+    某个功能键对应的按键代码列表
+
+    与普通 list 行为一致，额外记录 (category, action)，
+    match() 据此在编译好的查找表中做 O(1) 匹配
+    """
+    __slots__ = ("action",)
+
+    def __init__(self, codes=(), action=None):
+        super().__init__(codes)
+        self.action = action
+
+
+_EMPTY_KEYS = KeyList()
+
+
+class KeyTable:
+    """
+    编译后的按键映射表（只读，重新加载时整体替换）
+
+    keys: {(category, action): KeyList}
+    bindings: {(type, code, value): frozenset((category, action), ...)}
+              EV_KEY 与按下/释放无关，value 固定为 None
+    axis_bindings: {(code, value): [(category, action), ...]}
+    codes: frozenset((type, code), ...) 所有被绑定的事件，KeyListener 据此在读取时丢弃其余事件
+    """
+    __slots__ = ("keys", "bindings", "axis_bindings", "codes")
+
+    def __init__(self, keys, bindings, axis_bindings):
+        self.keys = keys
+        self.bindings = bindings
+        self.axis_bindings = axis_bindings
+        self.codes = frozenset((etype, code) for etype, code, _ in bindings)
+
+
+class KeyEvent:
+    """
+    绑定了事件的按键映射视图，显式传递 evt，避免从调用栈中查找
+
+    Examples:
+        k = keymap.event(evt)
+        if k.down(k.nav_up):
+            ...
+    """
+    __slots__ = ("keymap", "evt")
+
+    def __init__(self, keymap, evt):
+        self.keymap = keymap
+        self.evt = evt
+
+    def down(self, *args):
+        return self.keymap.down(*args, evt=self.evt)
+
+    def up(self, *args):
+        return self.keymap.up(*args, evt=self.evt)
+
+    def longpress(self, *args, **kwargs):
+        return self.keymap.longpress(*args, evt=self.evt, **kwargs)
+
+    def match(self, *args):
+        return self.keymap.match(*args, evt=self.evt)
+
+    def actions(self):
+        """事件对应的全部 (category, action)"""
+        return self.keymap.actions(self.evt)
+
+    def __getattr__(self, name):
+        # nav_up 等便捷属性直接取自 keymap
+        return getattr(self.keymap, name)
+
+
 class KeyMap:
     """全局按键映射管理器类"""
 
@@ -24,36 +100,108 @@ class KeyMap:
         self.config_path = config_path
         self.config = {}
         self.keycode_cache = {}  # 缓存字符串到 keycode 的映射
-        self.axis_bindings = {}  # 缓存轴事件绑定 {(code, value): [(category, action), ...]}
+        self._table = KeyTable({}, {}, {})  # 编译后的查找表
         self._key_press_times = {}  # 记录按键按下的时间戳 {keycode: timestamp}
         self._longpress_triggered = {}  # 记录长按是否已触发 {keycode: bool}
         self._last_repeat_times = {}  # 记录上次重复触发的时间戳 {keycode: timestamp}
         self.load_config()
 
     def load_config(self):
-        """加载按键配置文件"""
+        """加载按键配置文件并编译查找表"""
         try:
             if not os.path.exists(self.config_path):
                 LOGGER.error(f"keymap config file not found: {self.config_path}")
-                self.config = self._get_default_config()
-                return
-
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
-
-            LOGGER.info(f"keymap config loaded: {self.config_path}")
+                config = self._get_default_config()
+            else:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                LOGGER.info(f"keymap config loaded: {self.config_path}")
 
         except Exception as e:
             LOGGER.error(f"load keymap config failed: {e}")
-            self.config = self._get_default_config()
+            config = self._get_default_config()
+
+        table = self._compile(config)
+        # 配置和查找表一起替换，其他线程不会看到编译到一半的状态
+        self.config, self._table = config, table
 
     def reload_config(self):
         """重新加载配置文件 (支持热更新)"""
         LOGGER.info("reload keymap config...")
-        self.keycode_cache.clear()
-        self.axis_bindings.clear()
         self.load_config()
 
+    @property
+    def codes(self):
+        """所有被绑定的 (type, code)，重新加载配置后返回新的对象"""
+        return self._table.codes
+
+    @property
+    def axis_bindings(self):
+        """轴事件绑定 {(code, value): [(category, action), ...]}"""
+        return self._table.axis_bindings
+
+    def _compile(self, config):
+        """
+        将配置编译为查找表
+
+        Args:
+            config: 按键配置 dict
+
+        Returns:
+            KeyTable: 编译结果
+        """
+        keys = {}
+        bindings = {}
+        axis_bindings = {}
+
+        def bind(binding, action):
+            actions = bindings.setdefault(binding, set())
+            actions.add(action)
+
+        for category, actions in config.get("keymap", {}).items():
+            if category.startswith("_") or not isinstance(actions, dict):
+                continue
+            for action, key_items in actions.items():
+                if action.startswith("_"):
+                    continue
+                if not isinstance(key_items, list):
+                    key_items = [key_items]
+
+                name = (category, action)
+                codes = []
+                for key_item in key_items:
+                    # 跳过注释字段
+                    if isinstance(key_item, str) and key_item.startswith("_"):
+                        continue
+
+                    # 处理字符串格式的按键名称
+                    if isinstance(key_item, str):
+                        keycode = self._keyname_to_code(key_item)
+                        if keycode is not None:
+                            codes.append(keycode)
+                            bind((ecodes.EV_KEY, keycode, None), name)
+
+                    # 处理字典格式的轴事件
+                    elif isinstance(key_item, dict):
+                        axis_type = key_item.get("type")
+                        axis_code_name = key_item.get("code")
+                        axis_value = key_item.get("value")
+
+                        if axis_type == "ABS" and axis_code_name and axis_value is not None:
+                            axis_code = self._keyname_to_code(axis_code_name)
+                            if axis_code is not None:
+                                # 按下时的值和释放/回中值
+                                for value in (axis_value, 0):
+                                    bind((ecodes.EV_ABS, axis_code, value), name)
+                                    axis_actions = axis_bindings.setdefault((axis_code, value), [])
+                                    if name not in axis_actions:
+                                        axis_actions.append(name)
+
+                keys[name] = KeyList(codes, name)
+
+        frozen = {binding: frozenset(actions) for binding, actions in bindings.items()}
+        return KeyTable(keys, frozen, axis_bindings)
+
     def save_config(self):
         """保存当前配置到文件"""
         try:
@@ -67,7 +215,9 @@ class KeyMap:
         """获取默认配置 (如果配置文件不存在)"""
         return {
             "settings": {
-                "longpress_threshold": 0.5
+                "longpress_threshold": 0.5,
+                "axis_deadzone": 0.25,
+                "axis_hysteresis": 0.1
             },
             "keymap": {
                 "navigation": {
@@ -126,57 +276,46 @@ class KeyMap:
             action: 动作名称 (如 "select", "menu", "play_pause", "up")
 
         Returns:
-            list[int]: 按键代码列表，如果不存在返回空列表
+            KeyList: 按键代码列表，如果不存在返回空列表
 
         Note:
             此方法只返回按钮事件(KEY_*, BTN_*)的代码
             轴事件(ABS_*)需要使用 match_axis() 方法
         """
-        keymap = self.config.get("keymap", {})
-        category_keys = keymap.get(category, {})
-        key_names = category_keys.get(action)
+        return self._table.keys.get((category, action), _EMPTY_KEYS)
 
-        if key_names is None:
-            return []
+    def actions(self, evt):
+        """
+        获取事件对应的全部功能键
 
-        if not isinstance(key_names, list):
-            key_names = [key_names]
+        Args:
+            evt: evdev.InputEvent 对象
 
-        keycodes = []
-        for key_item in key_names:
-            # 跳过注释字段
-            if isinstance(key_item, str) and key_item.startswith("_"):
-                continue
+        Returns:
+            frozenset: {(category, action), ...}
+        """
+        if evt.type == ecodes.EV_KEY:
+            return self._table.bindings.get((ecodes.EV_KEY, evt.code, None), _NO_ACTIONS)
+        if evt.type == ecodes.EV_ABS:
+            return self._table.bindings.get((ecodes.EV_ABS, evt.code, evt.value), _NO_ACTIONS)
+        return _NO_ACTIONS
+
+    def event(self, evt):
+        """
+        获取绑定了事件的视图，之后的 down/up/longpress/match 无需再传 evt
 
-            # 处理字符串格式的按键名称
-            if isinstance(key_item, str):
-                keycode = self._keyname_to_code(key_item)
-                if keycode is not None:
-                    keycodes.append(keycode)
-
-            # 处理字典格式的轴事件 - 缓存到 axis_bindings
-            elif isinstance(key_item, dict):
-                axis_type = key_item.get("type")
-                axis_code_name = key_item.get("code")
-                axis_value = key_item.get("value")
-
-                if axis_type == "ABS" and axis_code_name and axis_value is not None:
-                    axis_code = self._keyname_to_code(axis_code_name)
-                    if axis_code is not None:
-                        # 缓存轴事件绑定 (按下时的值和释放/回中值)
-                        for value in (axis_value, 0):
-                            key = (axis_code, value)
-                            if key not in self.axis_bindings:
-                                self.axis_bindings[key] = []
-                            # 避免重复添加
-                            if (category, action) not in self.axis_bindings[key]:
-                                self.axis_bindings[key].append((category, action))
-
-        return keycodes
+        Args:
+            evt: evdev.InputEvent 对象
+
+        Returns:
+            KeyEvent
+        """
+        return KeyEvent(self, evt)
 
     def _get_event_from_context(self, evt):
         """
         从调用栈上下文中获取事件对象
+        兼容旧写法，开销较大，推荐显式传入 evt 或使用 event(evt)
 
         Args:
             evt: 传入的事件对象,如果不为 None 则直接返回
@@ -221,10 +360,9 @@ class KeyMap:
             return False
 
         if abs(evt.value) == 1:  # 按下 (value=1 或 -1,兼容手柄)
-            import time
             # 仅在首次按下时记录时间戳和初始化状态
             if evt.code not in self._key_press_times:
-                self._key_press_times[evt.code] = time.time()
+                self._key_press_times[evt.code] = time.monotonic()
                 self._longpress_triggered[evt.code] = False
                 self._last_repeat_times[evt.code] = 0
 
@@ -288,8 +426,6 @@ class KeyMap:
                 # 每 100ms 触发一次
                 scroll_up()
         """
-        import time
-
         evt = self._get_event_from_context(evt)
         if evt is None:
             return False
@@ -300,13 +436,13 @@ class KeyMap:
 
         # 如果是首次按下事件,记录时间戳并初始化状态
         if evt.value != 0 and evt.code not in self._key_press_times:
-            self._key_press_times[evt.code] = time.time()
+            self._key_press_times[evt.code] = time.monotonic()
             self._longpress_triggered[evt.code] = False
             return False
 
         # 如果是持续按住 (value == 2) 或其他非零值,检查是否达到阈值
         if evt.value != 0 and evt.code in self._key_press_times:
-            press_duration = time.time() - self._key_press_times[evt.code]
+            press_duration = time.monotonic() - self._key_press_times[evt.code]
 
             # 达到长按阈值
             if press_duration >= threshold:
@@ -326,7 +462,7 @@ class KeyMap:
                     return False
 
                 # 重复模式：检查是否到了下次触发时间
-                current_time = time.time()
+                current_time = time.monotonic()
                 last_repeat_time = self._last_repeat_times.get(evt.code, 0)
 
                 # 首次触发或距离上次触发超过 repeat_interval
@@ -362,50 +498,26 @@ class KeyMap:
                 # 匹配 KEY_UP 或 ABS_HAT0Y=-1
                 ...
         """
-        from evdev import ecodes
-
         evt = self._get_event_from_context(evt)
         if evt is None:
             return False
 
+        actions = self.actions(evt)
+
         # 模式 1: 虚拟功能键模式 - match(category, action)
         if len(args) == 2 and isinstance(args[0], str) and isinstance(args[1], str):
-            category, action = args
-
-            # 处理按钮事件 (EV_KEY)
-            if evt.type == ecodes.EV_KEY:
-                key_buttons = self._get_key(category, action)
-                return evt.code in key_buttons
-
-            # 处理轴事件 (EV_ABS)
-            elif evt.type == ecodes.EV_ABS:
-                return self.match_axis(evt.code, evt.value, category, action)
-
-            return False
+            return args in actions
 
         # 模式 2: 传统模式 - match(key_list1, key_list2, ...)
-        else:
-            # 检查按钮事件 (EV_KEY)
-            if evt.type == ecodes.EV_KEY:
-                for key_list in args:
-                    if key_list and evt.code in key_list:
-                        return True
-                return False
-
-            # 检查轴事件 (EV_ABS)
-            elif evt.type == ecodes.EV_ABS:
-                # 获取所有轴事件绑定的动作
-                actions = self.get_axis_action(evt.code, evt.value)
-                # LOGGER.info(f"Axis {evt.code} value {evt.value} actions: {actions}")
-                for category, action in actions:
-                    action_keys = self._get_key(category, action)
-                    # 检查是否匹配任意一个传入的 key_list
-                    for key_list in args:
-                        if action_keys == key_list:
-                            return True
-                return False
-
-            return False
+        for key_list in args:
+            action = getattr(key_list, "action", None)
+            if action is not None:
+                if action in actions:
+                    return True
+            # 手动拼接的普通列表只能按按键代码匹配
+            elif evt.type == ecodes.EV_KEY and key_list and evt.code in key_list:
+                return True
+        return False
 
     def match_axis(self, axis_code, axis_value, category, action):
         """
@@ -425,20 +537,7 @@ class KeyMap:
             if keymap.match_axis(evt.code, evt.value, "navigation", "up"):
                 handle_up()
         """
-        # 确保轴绑定已加载
-        if not self.axis_bindings:
-            # 触发一次 _get_key 来构建缓存
-            keymap = self.config.get("keymap", {})
-            for cat in keymap:
-                if not cat.startswith("_"):
-                    for act in keymap[cat]:
-                        if not act.startswith("_"):
-                            self._get_key(cat, act)
-
-        # 检查是否匹配
-        key = (axis_code, axis_value)
-        bindings = self.axis_bindings.get(key, [])
-        return (category, action) in bindings
+        return (category, action) in self._table.bindings.get((ecodes.EV_ABS, axis_code, axis_value), _NO_ACTIONS)
 
     def get_axis_action(self, axis_code, axis_value):
         """
@@ -455,17 +554,7 @@ class KeyMap:
             actions = keymap.get_axis_action(evt.code, evt.value)
             # 返回: [("navigation", "up"), ("gamepad", "up")]
         """
-        # 确保轴绑定已加载
-        if not self.axis_bindings:
-            keymap = self.config.get("keymap", {})
-            for cat in keymap:
-                if not cat.startswith("_"):
-                    for act in keymap[cat]:
-                        if not act.startswith("_"):
-                            self._get_key(cat, act)
-
-        key = (axis_code, axis_value)
-        return self.axis_bindings.get(key, [])
+        return self._table.axis_bindings.get((axis_code, axis_value), [])
 
     def _get_longpress_threshold(self):
         """
@@ -476,6 +565,21 @@ class KeyMap:
         """
         return self.config.get("settings", {}).get("longpress_threshold", 0.5)
 
+    @property
+    def longpress_threshold(self):
+        """长按阈值 (秒)"""
+        return self._get_longpress_threshold()
+
+    @property
+    def axis_deadzone(self):
+        """模拟轴死区，占半量程的比例"""
+        return self.config.get("settings", {}).get("axis_deadzone", 0.25)
+
+    @property
+    def axis_hysteresis(self):
+        """模拟轴滞回宽度，离开死区需要额外越过的比例"""
+        return self.config.get("settings", {}).get("axis_hysteresis", 0.1)
+
     # ===== 便捷访问方法 =====
 
     # 导航键
@@ -0,0 +1,192 @@
+"""
+输入到画面的延迟探针
+
+测量 evdev 事件时间戳（event.sec/usec）到反映该事件的帧被 disp.display() 刷新的时间：
+
+    KeyListener 读到事件时 tag()  ->  key_callback 中可 label() 标注操作  ->  最后一个回调后 done()
+    -> 下一帧开始 begin_frame() 认领已处理的事件 -> display() 后 flush() 记录延迟
+
+帧开始前已处理完的事件才算被这一帧反映，帧内到达的事件留给下一帧。
+通过环境变量 MUSPI_LATENCY=1 开启，关闭时各调用点只有一次属性判断。
+"""
+
+import os
+import threading
+import time
+
+from until.log import LOGGER
+
+# 直方图桶上界（毫秒）
+BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 200, 500, float("inf"))
+
+
+class LatencyTag:
+    """单个输入事件的延迟标记"""
+
+    __slots__ = ("event_time", "dispatch_time", "label")
+
+    def __init__(self, event_time, dispatch_time, label=None):
+        self.event_time = event_time
+        self.dispatch_time = dispatch_time
+        self.label = label
+
+
+class LatencyHistogram:
+    """延迟直方图（毫秒）"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.samples = []
+
+    def add(self, latency_ms):
+        self.samples.append(latency_ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if latency_ms <= bound:
+                self.counts[i] += 1
+                break
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def summary(self):
+        n = len(self.samples)
+        if not n:
+            return "no samples"
+        return (f"n={n} mean={sum(self.samples) / n:.1f}ms p50={self.percentile(50):.1f}ms "
+                f"p95={self.percentile(95):.1f}ms p99={self.percentile(99):.1f}ms max={max(self.samples):.1f}ms")
+
+    def format(self):
+        """文本直方图"""
+        lines = []
+        total = max(1, len(self.samples))
+        lower = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            upper = "inf" if bound == float("inf") else f"{bound}"
+            bar = "#" * round(40 * count / total)
+            lines.append(f"{lower:>4}-{upper:<4}ms {count:>6} {bar}")
+            lower = bound
+        return "\n".join(lines)
+
+
+class LatencyProbe:
+    """输入到画面的延迟探针（线程安全）"""
+
+    def __init__(self, enabled=False, clock=time.time, report_every=100):
+        """
+        Args:
+            enabled: 是否开启
+            clock: 与 evdev 事件时间戳同一基准的时间函数（CLOCK_REALTIME）
+            report_every: 每记录多少个样本输出一次汇总，0 表示不输出
+        """
+        self.enabled = enabled
+        self.clock = clock
+        self.report_every = report_every
+        self.histograms = {}  # label -> LatencyHistogram，"*" 为全部
+        self.dispatch = LatencyHistogram()  # 事件到回调处理完成
+        self._pending = []  # 已处理、等待下一帧的标记
+        self._in_frame = []  # 当前帧认领的标记
+        self._current = threading.local()
+        self._lock = threading.Lock()
+        self._recorded = 0
+
+    def tag(self, event):
+        """监听线程读到事件时标记一次，返回标记，随后的回调执行期间可通过 label() 标注"""
+        tag = LatencyTag(event.timestamp(), None)
+        self._current.tag = tag
+        return tag
+
+    def enter(self, tag):
+        """在另一个线程（主线程 drain()）继续处理已标记的事件，回调中的 label() 标注该事件"""
+        self._current.tag = tag
+
+    def label(self, name):
+        """标注当前正在处理的事件（在 key_callback 中调用）"""
+        tag = getattr(self._current, "tag", None)
+        if tag is not None and tag.label is None:
+            tag.label = name
+
+    def done(self, tag, merged=()):
+        """
+        事件的所有回调处理完成，每个事件只调用一次
+
+        Args:
+            tag: 事件的标记
+            merged: 合并到该事件的更早事件的标记（回调未单独执行），一并记录并沿用 tag 的标注
+        """
+        self._current.tag = None
+        tag.dispatch_time = now = self.clock()
+        with self._lock:
+            for other in merged:
+                other.dispatch_time = now
+                if other.label is None:
+                    other.label = tag.label
+                self.dispatch.add((now - other.event_time) * 1000)
+                self._pending.append(other)
+            self.dispatch.add((now - tag.event_time) * 1000)
+            self._pending.append(tag)
+
+    def begin_frame(self):
+        """帧开始：认领此前处理完成的事件"""
+        if self._pending:
+            with self._lock:
+                self._in_frame.extend(self._pending)
+                self._pending.clear()
+
+    def flush(self):
+        """帧已刷新到屏幕：记录本帧认领事件的延迟"""
+        if not self._in_frame:
+            return
+        now = self.clock()
+        with self._lock:
+            tags, self._in_frame = self._in_frame, []
+            for tag in tags:
+                latency_ms = (now - tag.event_time) * 1000
+                self._histogram("*").add(latency_ms)
+                if tag.label:
+                    self._histogram(tag.label).add(latency_ms)
+                self._recorded += 1
+                if self.report_every and self._recorded % self.report_every == 0:
+                    LOGGER.info(f"input latency: {self.histograms['*'].summary()}")
+
+    def _histogram(self, label):
+        histogram = self.histograms.get(label)
+        if histogram is None:
+            histogram = self.histograms[label] = LatencyHistogram()
+        return histogram
+
+    def report(self):
+        """返回完整的延迟报告文本"""
+        lines = [f"dispatch: {self.dispatch.summary()}"]
+        for label in sorted(self.histograms):
+            histogram = self.histograms[label]
+            lines.append(f"[{label}] input-to-photon: {histogram.summary()}")
+            if label == "*":
+                lines.append(histogram.format())
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.dispatch = LatencyHistogram()
+            self._pending.clear()
+            self._in_frame.clear()
+            self._recorded = 0
+
+
+_probe_instance = None
+
+
+def get_latency_probe():
+    """
+    获取全局延迟探针单例，环境变量 MUSPI_LATENCY=1 时开启
+
+    Returns:
+        LatencyProbe: 延迟探针实例
+    """
+    global _probe_instance
+    if _probe_instance is None:
+        _probe_instance = LatencyProbe(enabled=os.environ.get("MUSPI_LATENCY") == "1")
+    return _probe_instance
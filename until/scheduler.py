@@ -0,0 +1,156 @@
+"""
+定时任务调度器
+
+用一个最小堆代替零散的 threading.Timer：不为每个延迟调用创建线程，
+回调统一在驱动方（主循环）线程中执行，时间可注入，便于测试
+"""
+
+import heapq
+import itertools
+import threading
+
+from until.clock import now as clock_now
+from until.log import LOGGER
+
+
+class TimerHandle:
+    """定时任务句柄，可用于取消"""
+
+    __slots__ = ("when", "callback", "args", "group", "cancelled")
+
+    def __init__(self, when, callback, args, group=None):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.group = group
+        self.cancelled = False
+
+    def cancel(self):
+        """取消任务，已执行或已取消时无效果"""
+        self.cancelled = True
+
+
+class Scheduler:
+    """基于最小堆的定时任务调度器（线程安全）"""
+
+    def __init__(self, clock=clock_now):
+        """
+        Args:
+            clock: 时间函数，默认取帧时钟，测试时可替换
+        """
+        self.clock = clock
+        self._heap = []  # (when, seq, handle)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def call_at(self, when, callback, *args, group=None):
+        """
+        在指定时间执行回调
+
+        Args:
+            when: 执行时间（与 clock 同一时间基准）
+            callback: 回调函数
+            group: 分组名，可按组取消
+
+        Returns:
+            TimerHandle
+        """
+        handle = TimerHandle(when, callback, args, group)
+        with self._lock:
+            heapq.heappush(self._heap, (when, next(self._seq), handle))
+        return handle
+
+    def call_later(self, delay, callback, *args, group=None):
+        """延迟 delay 秒后执行回调"""
+        return self.call_at(self.clock() + delay, callback, *args, group=group)
+
+    def cancel(self, handle):
+        """取消任务"""
+        if handle is not None:
+            handle.cancel()
+
+    def cancel_group(self, group):
+        """取消指定分组中的所有任务"""
+        with self._lock:
+            for _, _, handle in self._heap:
+                if handle.group == group:
+                    handle.cancelled = True
+
+    def clear(self, keep=()):
+        """
+        取消所有任务
+
+        Args:
+            keep: 需要保留的分组
+        """
+        with self._lock:
+            for _, _, handle in self._heap:
+                if handle.group not in keep:
+                    handle.cancelled = True
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+
+    def next_deadline(self):
+        """最近一个待执行任务的时间，没有任务时返回 None"""
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][2].cancelled:
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def run_pending(self, now=None):
+        """
+        执行所有到期的任务
+
+        回调在锁外执行，回调中可以继续调度新任务；
+        新任务即使已到期也留到下一次 run_pending 执行
+
+        Args:
+            now: 当前时间，默认取 clock()
+
+        Returns:
+            int: 执行的任务数
+        """
+        if not self._heap:
+            return 0
+        if now is None:
+            now = self.clock()
+
+        due = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                handle = heapq.heappop(heap)[2]
+                if not handle.cancelled:
+                    due.append(handle)
+
+        for handle in due:
+            # 可能被同一批中更早执行的回调取消
+            if handle.cancelled:
+                continue
+            handle.cancelled = True
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                LOGGER.error(f"scheduler: callback {handle.callback!r} failed: {e}")
+        return len(due)
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+
+_scheduler_instance = None
+
+
+def get_scheduler():
+    """
+    获取全局调度器单例，由 DisplayManager 每帧驱动
+
+    Returns:
+        Scheduler: 调度器实例
+    """
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        _scheduler_instance = Scheduler()
+    return _scheduler_instance
@@ -0,0 +1,70 @@
+"""
+三缓冲帧交换（单写者、单读者）
+
+写者（模拟器线程）把新帧复制到空闲缓冲区后发布；读者（渲染线程）取最新发布的缓冲区。
+两边都不持锁：发布和占用都是一次属性赋值（GIL 下原子），写者总是跳过已发布和读者占用的缓冲区，
+读者占用后再确认发布未变化，因此读者读取期间该缓冲区不会被写入。
+序号随每次发布递增，读者据此判断是否有新帧。
+
+Examples:
+    frames = TripleBuffer()
+    frames.publish(frame)           # 写者
+    seq, frame = frames.acquire()   # 读者，seq 未变时不必重新处理
+"""
+
+import numpy as np
+
+
+class TripleBuffer:
+    """numpy 帧的三缓冲交换"""
+
+    def __init__(self):
+        self._buffers = [None, None, None]
+        self._published = (-1, 0)  # (缓冲区下标, 序号)
+        self._reading = -1  # 读者占用的缓冲区
+
+    @property
+    def seq(self):
+        """最新发布的序号，每次发布递增，reset() 后继续递增"""
+        return self._published[1]
+
+    def publish(self, frame):
+        """
+        写者：复制一帧并发布（不分配，除非帧的形状变化）
+
+        Args:
+            frame: np.ndarray
+        """
+        index, seq = self._published
+        reading = self._reading
+        target = next(i for i in (0, 1, 2) if i != index and i != reading)
+
+        buffer = self._buffers[target]
+        if buffer is None or buffer.shape != frame.shape or buffer.dtype != frame.dtype:
+            buffer = np.empty_like(frame)
+            self._buffers[target] = buffer
+        np.copyto(buffer, frame)
+        self._published = (target, seq + 1)
+
+    def acquire(self):
+        """
+        读者：占用最新发布的帧，直到下次 acquire() 或 reset()
+
+        Returns:
+            tuple: (序号, np.ndarray)，还没有帧时帧为 None
+        """
+        while True:
+            published = self._published
+            index, seq = published
+            if index < 0:
+                return seq, None
+            self._reading = index
+            # 占用前写者可能已发布新帧并选中该缓冲区，确认发布未变化
+            if self._published is published:
+                return seq, self._buffers[index]
+
+    def reset(self):
+        """丢弃所有帧，只在写者停止后调用；序号不归零，读者缓存的结果不会被误认为最新"""
+        self._buffers = [None, None, None]
+        self._published = (-1, self._published[1])
+        self._reading = -1